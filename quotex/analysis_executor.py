@@ -0,0 +1,73 @@
+# analysis_executor.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from candles import CandleFrame, as_frame
+from batch import WINDOW, empty_result, analyze_batch
+from scoring import score_features
+from latency import latency
+
+BACKENDS = ("inline", "thread", "process")
+
+def _analyze_stacked(assets, frame, scorer, gaps):
+    # Worker entry point: one stacked (asset x time) frame back into per-asset rows
+    return analyze_batch({asset: frame.row(i) for i, asset in enumerate(assets)}, scorer, gaps)
+
+class AnalysisExecutor:
+    """
+    Runs analyze_batch off the event loop.
+    Candle windows are stacked into one (asset x WINDOW) frame on the loop
+    thread before submission: feed windows that keep changing are copied
+    exactly once, and process workers receive five float64 arrays instead
+    of lists of dicts.
+    """
+
+    def __init__(self, backend="thread", workers=None, chunk_size=256):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown analysis backend: {backend} (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            pool_class = ThreadPoolExecutor if self.backend == "thread" else ProcessPoolExecutor
+            self._pool = pool_class(self.workers)
+        return self._pool
+
+    async def analyze(self, candles_by_asset, scorer=score_features, gaps=None):
+        """
+        Analyze many assets without blocking the event loop.
+        Args:
+            candles_by_asset: Dict of asset -> CandleFrame or list of candle dicts
+            scorer: scoring.Scorer to apply; picklable, so it also reaches process workers
+            gaps: Optional dict of asset -> (gap_above, gap_below) from gap_index.GapIndex.levels
+        Returns:
+            Dict of asset -> result dict, identical to analyze_batch's
+        """
+        with latency.stage("analysis"):
+            return await self._analyze(candles_by_asset, scorer, gaps)
+
+    async def _analyze(self, candles_by_asset, scorer, gaps):
+        if self.backend == "inline":
+            return analyze_batch(candles_by_asset, scorer, gaps)
+
+        results = {asset: empty_result() for asset in candles_by_asset}
+        frames = {asset: as_frame(candles) for asset, candles in candles_by_asset.items() if candles is not None and len(candles) >= WINDOW}
+        if not frames:
+            return results
+        assets = list(frames)
+        stacked = CandleFrame.stack(frames.values(), WINDOW)
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor()
+        chunks = [loop.run_in_executor(executor, _analyze_stacked, assets[start:start + self.chunk_size], stacked.row(slice(start, start + self.chunk_size)), scorer, gaps)
+                  for start in range(0, len(assets), self.chunk_size)]
+        for chunk in await asyncio.gather(*chunks):
+            results.update(chunk)
+        return results
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,110 @@
+# asset_cache.py
+import asyncio
+from asset_discovery import probe_asset, discover_assets
+
+def _now():
+    # Event-loop time: monotonic when live, virtual when a session is replayed
+    return asyncio.get_running_loop().time()
+
+class AssetCache:
+    """
+    In-memory open status and turbo payout per asset, refreshed by a
+    background task once an entry is older than `ttl` seconds. Reads never
+    block; listeners are told when an asset opens, closes or changes payout.
+    """
+
+    def __init__(self, client, ttl=60.0, concurrency=8, timeout=5.0):
+        self.client = client
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.entries = {}  # asset -> {"is_open": bool, "payout": % or None, "updated": event-loop time}
+        self._listeners = []
+        self._task = None
+
+    def seed(self, ranked):
+        """Fill the cache from a discover_assets ranking without notifying."""
+        now = _now()
+        for asset, payout in ranked.items():
+            self.entries[asset] = {"is_open": True, "payout": payout, "updated": now}
+
+    def add_listener(self, callback):
+        """Register callback(asset, old entry or None, new entry), called on every change."""
+        self._listeners.append(callback)
+
+    def is_open(self, asset):
+        entry = self.entries.get(asset)
+        return bool(entry and entry["is_open"] and entry["payout"] is not None)
+
+    def payout(self, asset):
+        entry = self.entries.get(asset)
+        return entry["payout"] if entry else None
+
+    def ranked(self, limit=None, min_payout=0):
+        """Open assets with payout >= min_payout, highest payout first."""
+        open_assets = sorted(((asset, entry["payout"]) for asset, entry in self.entries.items()
+                              if self.is_open(asset) and entry["payout"] >= min_payout), key=lambda x: x[1], reverse=True)
+        return dict(open_assets[:limit])
+
+    def _set(self, asset, is_open, payout):
+        old = self.entries.get(asset)
+        new = self.entries[asset] = {"is_open": is_open, "payout": payout, "updated": _now()}
+        if old is None or (old["is_open"], old["payout"]) != (is_open, payout):
+            for callback in self._listeners:
+                callback(asset, old, new)
+
+    async def refresh(self, assets=None):
+        """
+        Re-probe assets concurrently.
+        Args:
+            assets: Assets to refresh (default: every entry older than ttl)
+        Returns:
+            Int: Number of assets refreshed successfully
+        """
+        if assets is None:
+            stale = _now() - self.ttl
+            assets = [asset for asset, entry in self.entries.items() if entry["updated"] <= stale]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe(asset):
+            async with semaphore:
+                try:
+                    self._set(asset, *await probe_asset(self.client, asset, self.timeout))
+                    return True
+                except Exception:  # Keep the last known values until the next attempt
+                    return False
+
+        return sum(await asyncio.gather(*(probe(asset) for asset in assets)))
+
+    async def rescan(self):
+        """Run a full discovery, picking up assets that opened since the last scan."""
+        ranked, _ = await discover_assets(self.client, self.concurrency, self.timeout)
+        for asset, payout in ranked.items():
+            self._set(asset, True, payout)
+        for asset in self.entries.keys() - ranked.keys():
+            if self.entries[asset]["is_open"]:
+                await self.refresh([asset])
+
+    async def run(self, rescan_interval=900.0):
+        """Refresh stale entries forever, with a full rescan every `rescan_interval` seconds."""
+        last_rescan = _now()
+        while True:
+            if _now() - last_rescan >= rescan_interval:
+                try:
+                    await self.rescan()
+                except Exception:  # Asset list unavailable; keep refreshing known entries
+                    pass
+                last_rescan = _now()
+            else:
+                await self.refresh()
+            oldest = min((entry["updated"] for entry in self.entries.values()), default=_now())
+            await asyncio.sleep(max(1.0, oldest + self.ttl - _now()))
+
+    def start(self, rescan_interval=900.0):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(rescan_interval))
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,57 @@
+# asset_discovery.py
+import asyncio
+
+async def probe_asset(client, asset, timeout=5.0):
+    """
+    Fetch the open status and turbo payout of one asset.
+    Args:
+        client: Quotex client
+        asset: Asset code
+        timeout: Seconds allowed per request
+    Returns:
+        Tuple: (is_open, payout %) where payout is None when closed or not offered as turbo
+    """
+    asset_info = await asyncio.wait_for(client.get_asset(asset), timeout)
+    if not asset_info or not asset_info.get("is_open", False):
+        return False, None
+    payout = await asyncio.wait_for(client.get_payout_by_asset(asset), timeout)
+    if payout and "turbo" in payout:
+        return True, payout["turbo"]["profit"]
+    return True, None
+
+async def discover_assets(client, concurrency=8, timeout=5.0, on_progress=None):
+    """
+    Probe every asset concurrently and rank the open ones by payout.
+    Args:
+        client: Quotex client
+        concurrency: Maximum number of assets probed at once
+        timeout: Seconds allowed per request; a timed-out asset counts as failed
+        on_progress: Optional callback(done, total, failed) after each asset
+    Returns:
+        Tuple: (dict of open asset -> payout %, highest payout first;
+                dict of failed asset -> "timeout" or the error message)
+    """
+    all_assets = list(await asyncio.wait_for(client.get_all_assets(), timeout) or [])
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = {}
+    done = 0
+
+    async def probe(asset):
+        nonlocal done
+        async with semaphore:
+            try:
+                return await probe_asset(client, asset, timeout)
+            except asyncio.TimeoutError:
+                failed[asset] = "timeout"
+                return False, None
+            except Exception as e:
+                failed[asset] = str(e)
+                return False, None
+            finally:
+                done += 1
+                if on_progress:
+                    on_progress(done, len(all_assets), len(failed))
+
+    results = await asyncio.gather(*(probe(asset) for asset in all_assets))
+    open_assets = [(asset, payout) for asset, (is_open, payout) in zip(all_assets, results) if is_open and payout is not None]
+    return dict(sorted(open_assets, key=lambda x: x[1], reverse=True)), failed
@@ -0,0 +1,279 @@
+# backtest.py
+import sys
+import json
+import time
+from collections import deque
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from candles import CandleFrame, as_frame
+from candle_store import CandleStore
+from batch import WINDOW, indicator_features, analyzer_features
+from gap_index import gap_levels
+from positions import PositionManager
+from scoring import SCORING_CONFIG, Scorer, load_rules, load_scorer, score_features
+
+console = Console()
+
+LEDGER_DTYPE = np.dtype([
+    ("time", np.float64),  # Open time of the signal candle
+    ("direction", np.int8),  # 1 call, -1 put
+    ("confidence", np.float64),
+    ("amount", np.float64),
+    ("entry", np.float64),
+    ("exit", np.float64),
+    ("outcome", np.int8),  # 1 win, -1 loss, 0 draw (stake refunded)
+    ("profit", np.float64),
+    ("balance", np.float64)
+])
+
+def load_candles(path):
+    """
+    Load stored 1-minute candles.
+    Args:
+        path: .json file holding a get_candle style list of dicts, .csv with
+              a header row naming time, open, high, low, close columns, or an
+              asset code to read from the local CandleStore
+    Returns:
+        CandleFrame sorted by time
+    """
+    if not path.endswith((".json", ".csv")):
+        return CandleStore().read(path, 60)
+    if path.endswith(".json"):
+        with open(path) as f:
+            frame = CandleFrame.from_candles(json.load(f))
+    else:
+        data = np.genfromtxt(path, delimiter=",", names=True)
+        frame = CandleFrame(data["open"], data["high"], data["low"], data["close"], data["time"])
+    order = np.argsort(frame.time, kind="stable")
+    return frame[order] if np.any(order != np.arange(len(order))) else frame
+
+def history_features(candles, window=WINDOW, chunk=4096):
+    """
+    Evaluate every input of the confidence model at every bar.
+    Indicators are computed once as full-history series; the window-based
+    analyzers run over rolling windows, `chunk` bars per vectorized pass.
+    Gap levels come from one GapBook built over the whole history.
+    Args:
+        candles: CandleFrame or list of dicts with OHLC and 'time' keys, oldest first
+        window: Candles visible to the model at each bar (default WINDOW)
+        chunk: Bars evaluated per pass, bounds temporary memory (default 4096)
+    Returns:
+        Dict of feature name -> array with one entry per bar from index window-1 on
+    """
+    frame = as_frame(candles)
+    if len(frame) < window:
+        return {}
+    features = {name: values[window - 1:] for name, values in indicator_features(frame, history=True).items()}
+    windows = frame.rolling(window)
+    parts = [analyzer_features(windows.row(slice(start, start + chunk))) for start in range(0, windows.shape[0], chunk)]
+    for name in parts[0]:
+        features[name] = np.concatenate([part[name] for part in parts])
+    above, below = gap_levels(frame)
+    features["gap_above"], features["gap_below"] = above[window - 1:], below[window - 1:]
+    return features
+
+def settle_trades(frame, signal_times, direction, confidence, payout=80, threshold=90, base_bet=1.0,
+                  martingale=1.0, max_steps=3, expiry=60, balance=0.0, spacing=0):
+    """
+    Turn one asset's per-bar signals into settled binary trades, one
+    position at a time with its own martingale sequence. A trade enters at
+    the close of its signal candle and settles at the close of the candle
+    opening `expiry` seconds later. The live session's rules (shared stake,
+    several positions, stop limits) are settle_portfolio's; this is the
+    single-sequence view of one asset.
+    Args:
+        frame: CandleFrame the signals were computed on
+        signal_times: Open time of the candle behind each signal
+        direction: Per-signal direction (1 call, -1 put, 0 none)
+        confidence: Per-signal confidence (0-100)
+        payout: Payout percentage, scalar or one value per candle of `frame`
+        threshold: Minimum confidence to trade (default 90)
+        base_bet: Stake of the first trade in a martingale sequence
+        martingale: Stake multiplier after a loss (1.0 = flat stakes)
+        max_steps: Trades per martingale sequence before the stake resets
+        expiry: Option duration in seconds (default 60)
+        balance: Starting balance
+        spacing: Minimum seconds between two entries, if longer than expiry
+    Returns:
+        Structured array with LEDGER_DTYPE, one row per trade
+    """
+    times = frame.time
+    closes = frame.close
+    payouts = np.broadcast_to(np.asarray(payout, dtype=np.float64), times.shape)
+    candidates = np.flatnonzero((direction != 0) & (confidence >= threshold))
+    entry_index = np.searchsorted(times, signal_times[candidates])
+    exit_index = np.searchsorted(times, signal_times[candidates] + expiry)
+    settled = (exit_index < len(times)) & (times[np.minimum(exit_index, len(times) - 1)] == signal_times[candidates] + expiry)
+
+    ledger = np.zeros(int(settled.sum()), dtype=LEDGER_DTYPE)
+    count = 0
+    amount = base_bet
+    step = 0
+    busy_until = -np.inf
+    for k, entry_i, exit_i in zip(candidates[settled], entry_index[settled], exit_index[settled]):
+        signal_time = signal_times[k]
+        if signal_time < busy_until:
+            continue
+        busy_until = signal_time + max(expiry, spacing)
+        move = (closes[exit_i] - closes[entry_i]) * direction[k]
+        outcome = 1 if move > 0 else -1 if move < 0 else 0
+        profit = amount * payouts[entry_i] / 100 if outcome > 0 else -amount if outcome < 0 else 0.0
+        balance += profit
+        ledger[count] = (signal_time, direction[k], confidence[k], amount, closes[entry_i], closes[exit_i], outcome, profit, balance)
+        count += 1
+        if outcome < 0 and step + 1 < max_steps:
+            amount *= martingale
+            step += 1
+        elif outcome != 0:
+            amount = base_bet
+            step = 0
+    return ledger[:count]
+
+def settle_portfolio(signals, payout=80, threshold=90, max_positions=3, base_bet=1.0, martingale=1.0, max_steps=3,
+                     stop_loss=None, stop_profit=None, expiry=60, balance=None):
+    """
+    Settle the signals of several assets as one account, the way the live
+    session trades them. At each candle close the strongest signals at or
+    above `threshold` open positions at the current stake, on assets not
+    already held, up to `max_positions` at once. A position is still open
+    at the next close's scan and settles just after it. Its result moves
+    the shared stake and stop limits through PositionManager.book. As with
+    the broker, a position is only opened while its stake fits in the
+    balance left after the stakes already open.
+    Args:
+        signals: Dict of asset -> (frame, signal_times, direction, confidence)
+        payout: Payout percentage, scalar or dict of asset -> scalar or one value per candle of its frame
+        max_positions: Positions open at the same time
+        stop_loss, stop_profit: Realized loss/profit that stops new positions (None: no limit)
+        balance: Starting balance (None: no limit on stakes, ledger balances start at 0)
+        Remaining arguments as in settle_trades
+    Returns:
+        Structured array with LEDGER_DTYPE, one row per trade in settlement order
+    """
+    columns = []
+    for index, (name, (frame, signal_times, direction, confidence)) in enumerate(signals.items()):
+        times = frame.time
+        payouts = np.broadcast_to(np.asarray(payout[name] if isinstance(payout, dict) else payout, dtype=np.float64), times.shape)
+        candidates = np.flatnonzero((direction != 0) & (confidence >= threshold))
+        entry_index = np.searchsorted(times, signal_times[candidates])
+        exit_index = np.searchsorted(times, signal_times[candidates] + expiry)
+        settled = (exit_index < len(times)) & (times[np.minimum(exit_index, len(times) - 1)] == signal_times[candidates] + expiry)
+        candidates = candidates[settled]
+        columns.append((signal_times[candidates], np.full(len(candidates), index), direction[candidates], confidence[candidates],
+                        frame.close[entry_index[settled]], frame.close[exit_index[settled]], payouts[entry_index[settled]]))
+    if not columns:
+        return np.zeros(0, dtype=LEDGER_DTYPE)
+    signal_time, asset, direction, confidence, entry, exit, payouts = (np.concatenate(column) for column in zip(*columns))
+    order = np.lexsort((-confidence, signal_time))  # Per close, strongest signal first
+
+    manager = PositionManager(max_positions, base_bet, martingale, max_steps, stop_loss, stop_profit)
+    ledger = np.zeros(len(order), dtype=LEDGER_DTYPE)
+    count = 0
+    positions = deque()  # (signal time, asset, ledger row) in entry order, which is also settlement order
+    limited = balance is not None
+    balance = balance if limited else 0.0
+    open_stakes = 0.0
+
+    def settle(before):
+        nonlocal balance, open_stakes
+        while positions and positions[0][0] + expiry < before:
+            _, held, row = positions.popleft()
+            open_stakes -= ledger["amount"][row]
+            balance += ledger["profit"][row]
+            ledger["balance"][row] = balance
+            manager.book(ledger["profit"][row])
+
+    for k in order:
+        settle(signal_time[k])
+        if manager.stopped or len(positions) == max_positions or any(held == asset[k] for _, held, _ in positions):
+            continue
+        amount = manager.amount
+        if limited and amount > balance - open_stakes:
+            if not positions:
+                break  # Nothing left to settle, so the stake can never fit again
+            continue
+        move = (exit[k] - entry[k]) * direction[k]
+        outcome = 1 if move > 0 else -1 if move < 0 else 0
+        profit = amount * payouts[k] / 100 if outcome > 0 else -amount if outcome < 0 else 0.0
+        ledger[count] = (signal_time[k], direction[k], confidence[k], amount, entry[k], exit[k], outcome, profit, 0.0)
+        positions.append((signal_time[k], asset[k], count))
+        open_stakes += amount
+        count += 1
+    settle(np.inf)
+    return ledger[:count]
+
+def summarize(ledger, balance=0.0):
+    """
+    Aggregate statistics of a trade ledger.
+    Args:
+        ledger: Structured array from settle_trades
+        balance: Starting balance the ledger was settled from
+    Returns:
+        Dict with trade counts, win rate, profit, expected value and drawdown
+    """
+    wins = int(np.sum(ledger["outcome"] > 0))
+    losses = int(np.sum(ledger["outcome"] < 0))
+    equity = np.concatenate([[balance], ledger["balance"]])
+    drawdown = np.maximum.accumulate(equity) - equity
+    net_profit = float(ledger["profit"].sum())
+    return {
+        "trades": len(ledger),
+        "wins": wins,
+        "losses": losses,
+        "draws": len(ledger) - wins - losses,
+        "win_rate": wins / (wins + losses) * 100 if wins + losses else 0,
+        "net_profit": net_profit,
+        "ev_per_trade": net_profit / len(ledger) if len(ledger) else 0,
+        "max_drawdown": float(drawdown.max()),
+        "final_balance": float(equity[-1])
+    }
+
+def run_backtest(candles, payout=80, threshold=90, max_positions=3, base_bet=1.0, martingale=1.0, max_steps=3,
+                 stop_loss=None, stop_profit=None, expiry=60, balance=None, window=WINDOW, features=None, scorer=score_features):
+    """
+    Replay the live signal pipeline over stored candles and settle the
+    signals with the live session's position rules (settle_portfolio).
+    Args:
+        candles: CandleFrame or list of dicts, oldest first, or a dict of asset -> either, traded as one account
+        features: Precomputed history_features(candles, window) to reuse, if any (a dict per asset for several assets)
+        scorer: scoring.Scorer to apply (default: the built-in rule table)
+        Remaining arguments as in settle_portfolio
+    Returns:
+        Tuple: (ledger, summary) where summary also reports bars and bars_per_second
+    """
+    started = time.perf_counter()
+    several = isinstance(candles, dict)
+    frames = {asset: as_frame(frame) for asset, frame in candles.items()} if several else {"asset": as_frame(candles)}
+    if features is None:
+        features = {asset: history_features(frame, window) for asset, frame in frames.items()}
+    elif not several:
+        features = {"asset": features}
+    if not several and not isinstance(payout, (int, float)):
+        payout = {"asset": payout}
+    signals = {asset: (frames[asset], asset_features["time"], *scorer(asset_features))
+               for asset, asset_features in features.items() if asset_features}
+    ledger = settle_portfolio(signals, payout, threshold, max_positions, base_bet, martingale, max_steps,
+                              stop_loss, stop_profit, expiry, balance)
+    elapsed = time.perf_counter() - started
+    summary = summarize(ledger, 0.0 if balance is None else balance)
+    bars = sum(len(asset_features["time"]) for asset_features in features.values() if asset_features)
+    summary.update(bars=bars, seconds=elapsed, bars_per_second=bars / elapsed if elapsed else 0)
+    return ledger, summary
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        console.print(f"[yellow]Usage: python backtest.py <candles.json|candles.csv|asset> [payout %] [rules.json, default {SCORING_CONFIG}][/yellow]")
+        return
+    payout = float(sys.argv[2]) if len(sys.argv) >= 3 else 80
+    scorer = Scorer(load_rules(sys.argv[3])) if len(sys.argv) == 4 else load_scorer()
+    _, summary = run_backtest(load_candles(sys.argv[1]), payout=payout, scorer=scorer)
+    table = Table(title="Backtest Summary")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="magenta", justify="right")
+    for key, value in summary.items():
+        table.add_row(key, f"{value:,.2f}" if isinstance(value, float) else f"{value:,}")
+    console.print(table)
+
+if __name__ == "__main__":
+    main()
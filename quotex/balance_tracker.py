@@ -0,0 +1,125 @@
+# balance_tracker.py
+import time
+import asyncio
+
+class BalanceTracker:
+    """
+    Account balance and session P&L kept in memory.
+    Orders move the balance directly, as the broker does: the stake leaves
+    the balance when an order is sent and comes back with the payout when
+    it settles. The API is only queried every `reconcile_interval` seconds
+    to correct any drift; its balance excludes open stakes too, so the two
+    agree while positions are open. Once an order's expiry has passed the
+    broker may have paid it before its result is booked here, so a
+    reconciliation is skipped until every expired order is booked.
+    """
+
+    def __init__(self, client, reconcile_interval=60.0, clock=time.time):
+        """
+        Args:
+            client: Quotex client of the account
+            reconcile_interval: Seconds between balance checks against the API
+            clock: Wall-clock source that order expiry times are given in
+        """
+        self.client = client
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+        self.balance = 0.0
+        self.initial_balance = None
+        self.realized_profit = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.open_stakes = 0.0  # Stakes of orders not yet settled
+        self.expiries = {}  # Order key -> expiry time, for orders with a known expiry
+        self.bookings = 0  # Orders settled or cancelled so far
+        self.drift = 0.0  # Correction applied by the last reconciliation
+        self.reconciled_at = None
+        self._task = None
+
+    @property
+    def pnl(self):
+        """Settled balance change since the session started; open stakes are not counted as lost."""
+        return self.balance + self.open_stakes - self.initial_balance if self.initial_balance is not None else 0.0
+
+    @property
+    def trades(self):
+        return self.wins + self.losses
+
+    def open_order(self, amount, key=None, expires_at=None):
+        """
+        Take the stake of a sent order out of the balance.
+        Args:
+            amount: Stake
+            key: Identifies the order in record_trade or cancel_order
+            expires_at: Expiry time of the option on `clock`, if known
+        """
+        self.balance -= amount
+        self.open_stakes += amount
+        if key is not None and expires_at is not None:
+            self.expiries[key] = expires_at
+
+    def cancel_order(self, amount, key=None):
+        """Return the stake of an order the broker did not accept."""
+        self.balance += amount
+        self.open_stakes -= amount
+        self.expiries.pop(key, None)
+        self.bookings += 1
+
+    def record_trade(self, profit, amount=0.0, key=None):
+        """
+        Apply a settled trade.
+        Args:
+            profit: Net result from buy_and_check_win, negative for a loss
+            amount: Stake taken out by open_order, returned with the profit
+            key: The order's key in open_order
+        """
+        self.balance += amount + profit
+        self.open_stakes -= amount
+        self.expiries.pop(key, None)
+        self.bookings += 1
+        self.realized_profit += profit
+        if profit > 0:
+            self.wins += 1
+        elif profit < 0:
+            self.losses += 1
+
+    async def reconcile(self):
+        """
+        Replace the tracked balance with the API's value and record the drift.
+        Skipped, keeping the tracked balance, while an expired order is not
+        yet booked or when an order was booked during the request: the API's
+        value may then count a payout that is, or is about to be, counted here.
+        Returns:
+            Float: The balance now tracked
+        """
+        bookings = self.bookings
+        balance = float(await self.client.get_balance())
+        if self.initial_balance is None:
+            self.initial_balance = balance
+        else:
+            now = self.clock()
+            if self.bookings != bookings or any(expires_at <= now for expires_at in self.expiries.values()):
+                return self.balance
+            self.drift = balance - self.balance
+        self.balance = balance
+        self.reconciled_at = time.time()
+        return balance
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except Exception:  # Keep the tracked balance until the next attempt
+                pass
+
+    async def start(self):
+        """Fetch the starting balance once, then reconcile in the background."""
+        await self.reconcile()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self.balance
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,120 @@
+# batch.py
+import numpy as np
+from candles import CandleFrame, as_frame
+from indicators import ema_series, rsi_series, macd_series, bollinger_series, atr_series, adx_series
+from patterns import PATTERN_NAMES, detect_patterns_batch
+from candle_psychology import analyze_candle_psychology_batch
+from smc import analyze_smc_batch
+from ict import KILL_ZONES, POWER_OF_THREE, analyze_ict_batch
+from price_action import analyze_price_action_batch
+from scoring import score_features
+from latency import latency
+
+WINDOW = 50  # Longest lookback of any analyzer; older candles never affect the score
+DIRECTIONS = {1: "call", -1: "put", 0: None}
+
+def empty_result():
+    return {"direction": None, "confidence": 0, "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"}
+
+def indicator_features(frame, history=False):
+    """
+    Indicator inputs of the confidence model.
+    Args:
+        frame: CandleFrame, single-asset or stacked
+        history: Return full series along the time axis instead of only the latest value
+    Returns:
+        Dict of feature name -> array
+    """
+    def window(size):
+        return frame if history else frame[-size:]
+
+    def latest(values):
+        return values if history else values[..., -1]
+
+    macd_line, signal_line, histogram = macd_series(window(34))
+    upper_bb, sma_bb, lower_bb, bandwidth = bollinger_series(window(20))
+    return {
+        "close": latest(frame.close),
+        "time": latest(frame.time),
+        "ema_short": latest(ema_series(window(10), 10)),
+        "ema_long": latest(ema_series(window(50), 50)),
+        "rsi": latest(rsi_series(window(15))),
+        "atr": latest(atr_series(window(15))),
+        "adx": latest(adx_series(window(15))),
+        "macd_line": latest(macd_line),
+        "signal_line": latest(signal_line),
+        "histogram": latest(histogram),
+        "upper_bb": latest(upper_bb),
+        "sma_bb": latest(sma_bb),
+        "lower_bb": latest(lower_bb),
+        "bandwidth": latest(bandwidth)
+    }
+
+def analyzer_features(frame):
+    """
+    Psychology, SMC, ICT, price action and pattern inputs of the confidence model.
+    Args:
+        frame: 2-D CandleFrame with at least WINDOW candles per row
+    Returns:
+        Dict of feature name -> per-row array
+    """
+    features = {}
+    with latency.stage("psychology"):
+        features.update(analyze_candle_psychology_batch(frame))
+    with latency.stage("smc"):
+        features.update(analyze_smc_batch(frame))
+    with latency.stage("ict"):
+        features.update(analyze_ict_batch(frame, frame.time[:, -1]))
+    with latency.stage("price_action"):
+        features.update(analyze_price_action_batch(frame))
+    with latency.stage("patterns"):
+        features["pattern"], features["pattern_confidence"] = detect_patterns_batch(frame)
+    return features
+
+def compute_features(frame, gaps=None):
+    """
+    Run every indicator and analyzer over a stacked (asset x time) frame.
+    Args:
+        frame: 2-D CandleFrame with at least WINDOW candles per row
+        gaps: Per-row (gap_above, gap_below) levels from gap_index.GapIndex.levels, or None
+              when no gap index is kept (the gap rule then never fires)
+    Returns:
+        Dict of feature name -> per-row array
+    """
+    with latency.stage("indicators"):
+        features = indicator_features(frame)
+    features.update(analyzer_features(frame))
+    levels = np.full((frame.shape[0], 2), np.nan) if gaps is None else np.asarray(gaps, dtype=np.float64).reshape(-1, 2)
+    features["gap_above"], features["gap_below"] = levels[:, 0], levels[:, 1]
+    return features
+
+def analyze_batch(candles_by_asset, scorer=score_features, gaps=None):
+    """
+    Analyze many assets in one vectorized pass.
+    Args:
+        candles_by_asset: Dict of asset -> CandleFrame or list of candle dicts
+        scorer: scoring.Scorer to apply (default: the built-in rule table)
+        gaps: Optional dict of asset -> (gap_above, gap_below) from gap_index.GapIndex.levels
+    Returns:
+        Dict of asset -> result dict, identical to analyze_single_asset's
+    """
+    results = {asset: empty_result() for asset in candles_by_asset}
+    frames = {asset: as_frame(candles) for asset, candles in candles_by_asset.items() if candles is not None and len(candles) >= WINDOW}
+    if not frames:
+        return results
+
+    levels = None if gaps is None else [gaps.get(asset, (np.nan, np.nan)) for asset in frames]
+    features = compute_features(CandleFrame.stack(frames.values(), WINDOW), levels)
+    with latency.stage("scoring"):
+        direction, confidence = scorer(features)
+    for i, asset in enumerate(frames):
+        kill_zone = KILL_ZONES[int(features["kill_zone"][i])]
+        pot = POWER_OF_THREE[int(features["pot_pattern"][i])]
+        results[asset] = {
+            "direction": DIRECTIONS[int(direction[i])],
+            "confidence": confidence[i],
+            "pattern": str(PATTERN_NAMES[features["pattern"][i]]),
+            "kill_zone": kill_zone if kill_zone else "No Kill Zone",
+            "pot": pot if pot else "No POT"
+        }
+    return results
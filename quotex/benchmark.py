@@ -0,0 +1,192 @@
+# benchmark.py
+import os
+import sys
+import json
+import time
+import asyncio
+import inspect
+import platform
+import argparse
+import tempfile
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from rich.markup import escape
+from candles import CandleFrame
+from synthetic import synthetic_frame
+from batch import WINDOW, analyze_batch
+import indicators
+import patterns
+import smc
+import ict
+import candle_psychology
+import price_action
+
+console = Console()
+
+# Benchmarked entry points, timed on one series of each of LENGTHS
+SINGLE = (
+    indicators.ema_series, indicators.rsi_series, indicators.macd_series, indicators.bollinger_series,
+    indicators.atr_series, indicators.adx_series, indicators.calculate_ema, indicators.calculate_rsi,
+    indicators.calculate_macd, indicators.calculate_bollinger_bands, indicators.calculate_atr, indicators.calculate_adx,
+    patterns.scan_patterns, patterns.detect_patterns, patterns.pattern_hit_rates,
+    smc.analyze_smc, ict.analyze_ict, candle_psychology.analyze_candle_psychology, price_action.analyze_price_action
+)
+# ... and on a stacked frame of each of ASSET_COUNTS
+BATCH = (
+    patterns.detect_patterns_batch, smc.analyze_smc_batch, ict.analyze_ict_batch,
+    candle_psychology.analyze_candle_psychology_batch, price_action.analyze_price_action_batch
+)
+LENGTHS = (50, 120, 500)  # Candles per series for single-asset functions
+ASSET_COUNTS = (1, 10, 100)  # Rows of a stacked frame for *_batch functions
+def time_call(fn, repeat=5, min_time=0.05):
+    """
+    Seconds per call of fn(): calls are grouped so one timed run lasts at
+    least `min_time`, then the run is repeated `repeat` times.
+    Returns:
+        Dict with median and min seconds per call, and calls per run
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - started) / number)
+    return {"median": float(np.median(runs)), "min": float(min(runs)), "number": number}
+
+def _call(function, frame):
+    # Required arguments after the candles: current_time from the frame, period as main.py's long EMA
+    required = [p.name for p in list(inspect.signature(function).parameters.values())[1:] if p.default is inspect.Parameter.empty]
+    values = {"current_time": frame.time[..., -1], "period": 50}
+    kwargs = {name: values[name] for name in required}
+    return lambda: function(frame, **kwargs)
+
+def cases():
+    """Yield (name, zero-argument callable) for every benchmark."""
+    for function in SINGLE:
+        for length in LENGTHS:
+            yield f"{function.__module__}.{function.__name__}[n={length}]", _call(function, synthetic_frame(length))
+    for function in BATCH:
+        for count in ASSET_COUNTS:
+            frame = CandleFrame.stack([synthetic_frame(WINDOW, seed) for seed in range(count)], WINDOW)
+            yield f"{function.__module__}.{function.__name__}[assets={count}]", _call(function, frame)
+
+    for count in ASSET_COUNTS:
+        frames = {f"A{seed}": synthetic_frame(120, seed) for seed in range(count)}
+        yield f"batch.analyze_batch[assets={count}]", lambda frames=frames: analyze_batch(frames)
+
+    single = _single_asset_case()
+    if single is not None:
+        yield "main.analyze_single_asset[n=120]", single
+
+def _single_asset_case():
+    # End to end through fetch_candles and the candle store; needs the Quotex API package
+    try:
+        import main
+        from candle_store import CandleStore
+        from analysis_executor import AnalysisExecutor
+        from event_log import EventLog
+    except ImportError as e:
+        console.print(f"[yellow]Skipping main.analyze_single_asset: {e}[/yellow]")
+        return None
+
+    candles = synthetic_frame(120).to_candles()
+
+    class ReplayClient:
+        async def get_candle(self, asset, period, count):
+            return candles[-count:]
+
+    scratch = tempfile.mkdtemp()
+    runtime = main.Runtime(CandleStore(scratch), EventLog(os.path.join(scratch, "events.jsonl")), AnalysisExecutor("inline"))
+    loop = asyncio.new_event_loop()
+    client = ReplayClient()
+    return lambda: loop.run_until_complete(main.analyze_single_asset(runtime, client, "BENCH", main.DashboardState()))
+
+def run(name_filter=None, repeat=5, min_time=0.05):
+    results = {}
+    for name, fn in cases():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = time_call(fn, repeat, min_time)
+    return results
+
+def metadata():
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor()
+    }
+
+def compare(results, baseline, tolerance=0.15):
+    """
+    Compare median times against a baseline.
+    Returns:
+        List of (name, current, baseline or None, ratio or None, regressed)
+    """
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            rows.append((name, result["median"], None, None, False))
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        rows.append((name, result["median"], previous["median"], ratio, ratio > 1 + tolerance))
+    return rows
+
+def _format_time(seconds):
+    return f"{seconds * 1e6:,.1f} µs" if seconds < 1e-3 else f"{seconds * 1e3:,.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analyzers on deterministic synthetic candles.")
+    parser.add_argument("--save", help="Write results as a baseline JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before a regression is reported (default 0.15)")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default 5)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed run (default 0.05)")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.repeat, args.min_time)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    table = Table(title="Benchmarks")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Median", justify="right")
+    table.add_column("Min", justify="right")
+    if baseline:
+        table.add_column("Baseline", justify="right")
+        table.add_column("Change", justify="right")
+    regressions = 0
+    for name, current, previous, ratio, regressed in compare(results, baseline, args.tolerance):
+        row = [escape(name), _format_time(current), _format_time(results[name]["min"])]
+        if baseline:
+            regressions += regressed
+            style = "red" if regressed else "green" if ratio is not None and ratio < 1 - args.tolerance else "white"
+            row += [_format_time(previous) if previous is not None else "-",
+                    f"[{style}]{(ratio - 1) * 100:+.1f}%[/{style}]" if ratio is not None else "new"]
+        table.add_row(*row)
+    console.print(table)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    if regressions:
+        console.print(f"[red]{regressions} benchmark(s) slower than baseline by more than {args.tolerance:.0%}[/red]")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
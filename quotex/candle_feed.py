@@ -0,0 +1,179 @@
+# candle_feed.py
+import math
+import asyncio
+import numpy as np
+from candles import FIELDS, CandleFrame, as_frame
+
+class CandleWindow:
+    """
+    Rolling window of the newest `size` candles for one asset, stored as
+    (field x time) rows in FIELDS order. Appending is amortized O(1).
+    """
+    __slots__ = ("data", "size", "start", "end")
+
+    def __init__(self, size):
+        self.data = np.zeros((len(FIELDS), 2 * size))
+        self.size = size
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def append(self, open, high, low, close, time):
+        if self.end == self.data.shape[1]:
+            keep = self.size - 1
+            self.data[:, :keep] = self.data[:, self.end - keep:self.end]
+            self.start, self.end = 0, keep
+        self.data[:, self.end] = (open, high, low, close, time)
+        self.end += 1
+        if self.end - self.start > self.size:
+            self.start += 1
+
+    def update_last(self, price):
+        last = self.data[:, self.end - 1]
+        last[1] = max(last[1], price)
+        last[2] = min(last[2], price)
+        last[3] = price
+
+    def set_last(self, open, high, low, close, time):
+        self.data[:, self.end - 1] = (open, high, low, close, time)
+
+    def last(self):
+        return dict(zip(FIELDS, self.data[:, self.end - 1].tolist())) if len(self) else None
+
+    def frame(self):
+        """CandleFrame view of the window; copy it before handing it to another thread."""
+        return CandleFrame(*self.data[:, self.start:self.end])
+
+class QuotexSource:
+    """
+    Realtime prices from a Quotex client. Ticks are pushed into the client's
+    in-memory buffer by its websocket; this source only reads that buffer,
+    so no request goes out per poll.
+    """
+
+    def __init__(self, client, poll_interval=0.05):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.last_tick = {}
+
+    async def history(self, asset, period, count):
+        return await self.client.get_candle(asset, period, count)
+
+    async def subscribe(self, asset, period):
+        await self.client.start_realtime_price(asset, period)
+        self.last_tick.setdefault(asset, 0)
+
+    async def ticks(self):
+        while True:
+            for asset, last in list(self.last_tick.items()):
+                prices = await self.client.get_realtime_price(asset) or []
+                if isinstance(prices, dict):
+                    prices = [prices]
+                for tick in prices:
+                    if tick["time"] > last:
+                        last = tick["time"]
+                        yield asset, tick["time"], tick["price"]
+                self.last_tick[asset] = last
+            await asyncio.sleep(self.poll_interval)
+
+class ReplaySource:
+    """
+    Local stand-in for the realtime channel: replays stored candles as
+    open/high/low/close ticks, `speed` times faster than real time
+    (math.inf to replay without waiting).
+    """
+
+    def __init__(self, candles_by_asset, start_index=120, speed=1.0):
+        self.frames = {asset: as_frame(candles) for asset, candles in candles_by_asset.items()}
+        self.start_index = start_index
+        self.speed = speed
+        self.subscribed = set()
+
+    async def history(self, asset, period, count):
+        frame = self.frames[asset]
+        return frame[max(0, self.start_index - count):self.start_index].to_candles()
+
+    async def subscribe(self, asset, period):
+        self.subscribed.add(asset)
+
+    async def ticks(self):
+        ticks = []
+        for asset in self.subscribed:
+            frame = self.frames[asset][self.start_index:]
+            # Tick order inside a candle: open, nearer extreme, farther extreme, close
+            bullish = frame.close >= frame.open
+            first = np.where(bullish, frame.low, frame.high)
+            second = np.where(bullish, frame.high, frame.low)
+            for offset, prices in ((0, frame.open), (15, first), (30, second), (59, frame.close)):
+                ticks.extend(zip(frame.time + offset, [asset] * len(frame), prices))
+        ticks.sort(key=lambda tick: tick[0])
+        previous = ticks[0][0] if ticks else 0
+        for timestamp, asset, price in ticks:
+            await asyncio.sleep(0 if math.isinf(self.speed) else (timestamp - previous) / self.speed)
+            previous = timestamp
+            yield asset, float(timestamp), float(price)
+
+class CandleFeed:
+    """
+    Push-based candle windows per asset.
+    Subscribes once per asset, builds candles from realtime ticks and notifies
+    consumers when a candle updates or closes, replacing per-second get_candle
+    polling.
+    """
+
+    def __init__(self, source, period=60, window=120, store=None):
+        self.source = source
+        self.period = period
+        self.window = window
+        self.store = store
+        self.windows = {}
+        self._listeners = []
+
+    async def subscribe(self, asset):
+        """Seed the window with one history fetch, then start realtime updates."""
+        if asset in self.windows:
+            return
+        window = self.windows[asset] = CandleWindow(self.window)
+        for candle in await self.source.history(asset, self.period, self.window) or []:
+            window.append(candle["open"], candle["high"], candle["low"], candle["close"], candle["time"])
+        if self.store is not None and len(window) > 1:
+            self.store.append(asset, self.period, window.frame()[:-1])
+        await self.source.subscribe(asset, self.period)
+
+    def add_listener(self, callback):
+        """Register callback(asset, candle, closed), called on every candle update."""
+        self._listeners.append(callback)
+
+    def on_tick(self, asset, timestamp, price):
+        window = self.windows.get(asset)
+        if window is None:
+            return
+        bucket = timestamp - timestamp % self.period
+        last = window.last()
+        if last is not None and bucket < last["time"]:
+            return  # Late tick for a candle that already closed
+        if last is not None and bucket == last["time"]:
+            window.update_last(price)
+        else:
+            if last is not None:
+                # Persisted before listeners hear of it, so they can read it back from the store
+                if self.store is not None:
+                    self.store.append(asset, self.period, [last])
+                self._notify(asset, last, True)
+            window.append(price, price, price, price, bucket)
+        self._notify(asset, window.last(), False)
+
+    def _notify(self, asset, candle, closed):
+        for callback in self._listeners:
+            callback(asset, candle, closed)
+
+    def frame(self, asset):
+        """Current window of an asset, oldest first; the last candle may still be forming."""
+        window = self.windows.get(asset)
+        return window.frame() if window is not None else None
+
+    async def run(self):
+        async for asset, timestamp, price in self.source.ticks():
+            self.on_tick(asset, timestamp, price)
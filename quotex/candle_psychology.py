@@ -1,77 +1,101 @@
 import numpy as np
+from candles import CandleFrame, as_frame, period_closes
 
-def analyze_candle_psychology(candles, lookback=50):
+SENTIMENTS = {1: "bullish", -1: "bearish", 0: "neutral"}
+
+def _histogram_rows(values, bins):
     """
-    Ultimate candle psychology calculations focusing on price action behavior.
+    Row-wise np.histogram(values, bins) with per-row auto ranges.
+    Mirrors NumPy's equal-width bin assignment so counts match exactly.
+    """
+    first_edge = values.min(axis=-1)
+    last_edge = values.max(axis=-1)
+    flat = first_edge == last_edge
+    first_edge = np.where(flat, first_edge - 0.5, first_edge)
+    last_edge = np.where(flat, last_edge + 0.5, last_edge)
+    bin_edges = np.linspace(first_edge, last_edge, bins + 1, axis=-1)
+    indices = ((values - first_edge[:, None]) / (last_edge - first_edge)[:, None] * bins).astype(np.intp)
+    indices[indices == bins] -= 1
+    indices[values < np.take_along_axis(bin_edges, indices, axis=-1)] -= 1
+    increment = (values >= np.take_along_axis(bin_edges, indices + 1, axis=-1)) & (indices != bins - 1)
+    indices[increment] += 1
+    return (indices[..., None] == np.arange(bins)).sum(axis=-2)
+
+def analyze_candle_psychology_batch(frame, lookback=50):
+    """
+    Vectorized candle psychology over a stacked (asset x time) frame.
     Args:
-        candles: List of dicts with 'open', 'high', 'low', 'close'
+        frame: 2-D CandleFrame with at least `lookback` candles per row
         lookback: Number of candles to analyze (default 50)
     Returns:
-        Dict with psychology metrics
+        Dict of per-row arrays; 'sentiment' is coded 1 bullish, -1 bearish, 0 neutral
     """
-    if len(candles) < lookback:
-        return {
-            "trend_persistence": 0,
-            "reversal_strength": 0,
-            "volatility_clustering": 0,
-            "exhaustion_signal": 0,
-            "sentiment": "neutral",
-            "sentiment_polarity": 0,
-            "fractal_momentum": 0,
-            "mtf_correlation": 0,
-            "psychological_pressure": 0,
-            "candle_entropy": 0
-        }
+    frame = frame[-lookback:]
+    opens = frame.open
+    highs = frame.high
+    lows = frame.low
+    closes = frame.close
 
-    # Extract OHLC data
-    opens = np.array([c["open"] for c in candles[-lookback:]])
-    highs = np.array([c["high"] for c in candles[-lookback:]])
-    lows = np.array([c["low"] for c in candles[-lookback:]])
-    closes = np.array([c["close"] for c in candles[-lookback:]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 1. Trend Persistence (directional consistency)
+        returns = np.diff(closes, axis=-1) / closes[:, :-1] * 100  # Percentage returns
+        bullish_count = np.sum(returns > 0, axis=-1)
+        bearish_count = np.sum(returns < 0, axis=-1)
+        trend_persistence = (bullish_count - bearish_count) / lookback * 100  # -100 to +100
 
-    # 1. Trend Persistence (directional consistency)
-    returns = np.diff(closes) / closes[:-1] * 100  # Percentage returns
-    bullish_count = np.sum(returns > 0)
-    bearish_count = np.sum(returns < 0)
-    trend_persistence = (bullish_count - bearish_count) / lookback * 100  # -100 to +100
+        # 2. Reversal Strength (size of reversal candles)
+        body_sizes = np.abs(closes - opens)
+        reversals = np.sign(returns[:, :-1]) != np.sign(returns[:, 1:])
+        reversal_count = reversals.sum(axis=-1)
+        reversal_bodies = np.where(reversals, body_sizes[:, :-2], 0).sum(axis=-1) / reversal_count
+        reversal_strength = np.where(reversal_count > 0, reversal_bodies / np.mean(body_sizes, axis=-1) * 100, 0)
 
-    # 2. Reversal Strength (size of reversal candles)
-    body_sizes = np.abs(closes - opens)
-    reversal_indices = np.where(np.sign(returns[:-1]) != np.sign(returns[1:]))[0]
-    reversal_strength = np.mean(body_sizes[reversal_indices]) / np.mean(body_sizes) * 100 if reversal_indices.size > 0 else 0
+        # 3. Volatility Clustering (grouping of large moves)
+        volatility = np.std(returns, axis=-1) * np.sqrt(lookback)
+        large_moves = np.abs(returns) > volatility[:, None]
+        clustering = np.where(large_moves.any(axis=-1), np.sum(large_moves[:, 1:] & large_moves[:, :-1], axis=-1) / lookback * 100, 0)
 
-    # 3. Volatility Clustering (grouping of large moves)
-    volatility = np.std(returns) * np.sqrt(lookback)
-    large_moves = np.abs(returns) > volatility
-    clustering = np.sum(np.diff(np.where(large_moves)[0]) == 1) / lookback * 100 if large_moves.any() else 0
+        # 4. Exhaustion Signal (long wicks after trends)
+        wick_sizes = highs - np.maximum(opens, closes)
+        lower_wick_sizes = np.minimum(opens, closes) - lows
+        exhaustion = np.mean(wick_sizes[:, -5:] + lower_wick_sizes[:, -5:], axis=-1) / np.mean(body_sizes[:, -5:], axis=-1) * 100
+        exhaustion_signal = np.where(trend_persistence > 50, exhaustion, 0)
 
-    # 4. Exhaustion Signal (long wicks after trends)
-    wick_sizes = highs - np.maximum(opens, closes)
-    lower_wick_sizes = np.minimum(opens, closes) - lows
-    exhaustion_signal = np.mean(wick_sizes[-5:] + lower_wick_sizes[-5:]) / np.mean(body_sizes[-5:]) * 100 if trend_persistence > 50 else 0
+        # 5. Sentiment and Polarity
+        sentiment = np.where(trend_persistence > 20, 1, np.where(trend_persistence < -20, -1, 0))
+        sentiment_polarity = trend_persistence  # -100 to +100
 
-    # 5. Sentiment and Polarity
-    sentiment = "bullish" if trend_persistence > 20 else "bearish" if trend_persistence < -20 else "neutral"
-    sentiment_polarity = trend_persistence  # -100 to +100
+        # 6. Fractal Momentum (self-similar momentum across scales)
+        short_momentum = np.mean(returns[:, -5:], axis=-1) * 100
+        long_momentum = np.mean(returns[:, -20:], axis=-1) * 100
+        fractal_momentum = np.where(long_momentum != 0, short_momentum / long_momentum, 0)  # Ratio > 1 = acceleration
 
-    # 6. Fractal Momentum (self-similar momentum across scales)
-    short_momentum = np.mean(returns[-5:]) * 100
-    long_momentum = np.mean(returns[-20:]) * 100
-    fractal_momentum = short_momentum / long_momentum if long_momentum != 0 else 0  # Ratio > 1 = acceleration
+        # 7. MTF Correlation (alignment with the wall-clock 5-min timeframe)
+        mtf_closes = period_closes(frame, 300)
+        mtf_returns = np.diff(mtf_closes, axis=-1) / mtf_closes[:, :-1] * 100
+        if mtf_returns.shape[-1] > 1:
+            # Rows with missing candles have fewer bars; their NaN padding is left out
+            valid = ~np.isnan(mtf_returns)
+            count = valid.sum(axis=-1, keepdims=True)
+            x = np.where(valid, returns[:, -mtf_returns.shape[-1]:], 0)
+            x = np.where(valid, x - x.sum(axis=-1, keepdims=True) / count, 0)
+            y = np.where(valid, mtf_returns, 0)
+            y = np.where(valid, y - y.sum(axis=-1, keepdims=True) / count, 0)
+            dof = count[:, 0] - 1
+            correlation = np.sum(x * y, axis=-1) / dof / np.sqrt(np.sum(x * x, axis=-1) / dof) / np.sqrt(np.sum(y * y, axis=-1) / dof)
+            mtf_correlation = np.where(dof > 0, np.clip(correlation, -1, 1) * 100, 0)
+        else:
+            mtf_correlation = np.zeros(closes.shape[0])
 
-    # 7. MTF Correlation (alignment with higher timeframe)
-    mtf_returns = np.diff(closes[::5]) / closes[:-5:5] * 100  # Simulated 5-min timeframe
-    mtf_correlation = np.corrcoef(returns[-len(mtf_returns):], mtf_returns)[0, 1] * 100 if len(mtf_returns) > 1 else 0
+        # 8. Psychological Pressure (wick rejection intensity)
+        recent_ranges = highs[:, -10:] - lows[:, -10:]
+        rejection_pressure = np.where(np.mean(recent_ranges, axis=-1) != 0, np.mean(wick_sizes[:, -10:] / recent_ranges, axis=-1) * 100, 0)
+        psychological_pressure = np.fmin(100, rejection_pressure * 2)  # Cap at 100
 
-    # 8. Psychological Pressure (wick rejection intensity)
-    rejection_pressure = np.mean(wick_sizes[-10:] / (highs[-10:] - lows[-10:])) * 100 if np.mean(highs[-10:] - lows[-10:]) != 0 else 0
-    psychological_pressure = min(100, rejection_pressure * 2)  # Cap at 100
-
-    # 9. Candle Entropy (unpredictability of price action)
-    bin_counts, _ = np.histogram(returns, bins=10)
-    probs = bin_counts / bin_counts.sum()
-    entropy = -np.sum(probs * np.log2(probs + 1e-10)) / np.log2(10) * 100  # Normalized to 0-100
-    candle_entropy = entropy
+        # 9. Candle Entropy (unpredictability of price action)
+        bin_counts = _histogram_rows(returns, 10)
+        probs = bin_counts / bin_counts.sum(axis=-1, keepdims=True)
+        candle_entropy = -np.sum(probs * np.log2(probs + 1e-10), axis=-1) / np.log2(10) * 100  # Normalized to 0-100
 
     return {
         "trend_persistence": trend_persistence,
@@ -84,4 +108,32 @@ def analyze_candle_psychology(candles, lookback=50):
         "mtf_correlation": mtf_correlation,
         "psychological_pressure": psychological_pressure,
         "candle_entropy": candle_entropy
-    }
\ No newline at end of file
+    }
+
+def analyze_candle_psychology(candles, lookback=50):
+    """
+    Ultimate candle psychology calculations focusing on price action behavior.
+    Args:
+        candles: CandleFrame or list of dicts with 'open', 'high', 'low', 'close'
+        lookback: Number of candles to analyze (default 50)
+    Returns:
+        Dict with psychology metrics
+    """
+    if len(candles) < lookback:
+        return {
+            "trend_persistence": 0,
+            "reversal_strength": 0,
+            "volatility_clustering": 0,
+            "exhaustion_signal": 0,
+            "sentiment": "neutral",
+            "sentiment_polarity": 0,
+            "fractal_momentum": 0,
+            "mtf_correlation": 0,
+            "psychological_pressure": 0,
+            "candle_entropy": 0
+        }
+
+    psych = analyze_candle_psychology_batch(CandleFrame.stack([as_frame(candles)], lookback), lookback)
+    result = {key: values[0] for key, values in psych.items()}
+    result["sentiment"] = SENTIMENTS[int(result["sentiment"])]
+    return result
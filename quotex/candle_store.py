@@ -0,0 +1,137 @@
+# candle_store.py
+import os
+import numpy as np
+from candles import CandleFrame, as_frame
+
+RECORD_DTYPE = np.dtype([("time", "<f8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8")])
+CANDLE_DIR = "candle_data"
+
+class CandleStore:
+    """
+    Local candle history: one file of fixed-width RECORD_DTYPE records per
+    asset and timeframe, strictly increasing in time. Files only grow at the
+    end, and reads are zero-copy views into a read-only np.memmap.
+    """
+
+    def __init__(self, root=CANDLE_DIR):
+        self.root = root
+        self._maps = {}  # path -> memmap covering the records present when it was opened
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, asset, timeframe):
+        safe_asset = asset.replace(os.sep, "_").replace("/", "_")
+        return os.path.join(self.root, f"{safe_asset}_{timeframe}.bin")
+
+    def _records(self, asset, timeframe):
+        path = self.path(asset, timeframe)
+        count = os.path.getsize(path) // RECORD_DTYPE.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        records = self._maps.get(path)
+        if records is None or len(records) != count:
+            records = self._maps[path] = np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+        return records
+
+    def count(self, asset, timeframe):
+        """Number of candles stored for an asset and timeframe."""
+        return len(self._records(asset, timeframe))
+
+    def last_time(self, asset, timeframe):
+        """Open time of the newest stored candle, or None if nothing is stored."""
+        records = self._records(asset, timeframe)
+        return float(records["time"][-1]) if len(records) else None
+
+    def append(self, asset, timeframe, candles):
+        """
+        Store candles, ignoring ones that are already on disk.
+        A candle with the same time as the newest stored record replaces it, so
+        a candle first seen while still forming ends up with its final values.
+        Args:
+            asset: Asset code
+            timeframe: Candle period in seconds
+            candles: CandleFrame or list of dicts with OHLC and 'time' keys
+        Returns:
+            Int: Number of candles added (replacements not counted)
+        """
+        frame = as_frame(candles)
+        if not len(frame):
+            return 0
+        path = self.path(asset, timeframe)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size % RECORD_DTYPE.itemsize:  # Drop a record torn by an interrupted write
+            with open(path, "r+b") as f:
+                f.truncate(size - size % RECORD_DTYPE.itemsize)
+
+        # Last occurrence wins for duplicate times within the batch
+        times = frame.time
+        order = np.argsort(times, kind="stable")
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = times[order][1:] != times[order][:-1]
+        order = order[keep]
+
+        records = np.empty(len(order), dtype=RECORD_DTYPE)
+        for field in RECORD_DTYPE.names:
+            records[field] = getattr(frame, field)[order]
+
+        last = self.last_time(asset, timeframe)
+        if last is not None:
+            if records["time"][0] <= last:
+                replace = records[records["time"] == last]
+                if len(replace):
+                    with open(path, "r+b") as f:
+                        f.seek(-RECORD_DTYPE.itemsize, os.SEEK_END)
+                        f.write(replace[-1:].tobytes())
+            records = records[records["time"] > last]
+        if len(records):
+            with open(path, "ab") as f:
+                f.write(records.tobytes())
+        return len(records)
+
+    def read(self, asset, timeframe, start=None, end=None):
+        """
+        Candles with start <= time < end, as zero-copy views of the file.
+        Args:
+            asset: Asset code
+            timeframe: Candle period in seconds
+            start: Earliest candle open time (default: oldest stored)
+            end: Exclusive upper bound on open time (default: newest stored)
+        Returns:
+            CandleFrame
+        """
+        records = self._records(asset, timeframe)
+        times = records["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(records) if end is None else int(np.searchsorted(times, end, side="left"))
+        return self._frame(records[lo:hi])
+
+    def tail(self, asset, timeframe, count, contiguous=False):
+        """
+        The newest `count` candles.
+        Args:
+            asset: Asset code
+            timeframe: Candle period in seconds
+            count: Maximum number of candles
+            contiguous: Drop candles before the most recent gap in the series
+        Returns:
+            CandleFrame
+        """
+        records = self._records(asset, timeframe)[-count:]
+        if contiguous and len(records) > 1:
+            gaps = np.flatnonzero(np.diff(records["time"]) != timeframe)
+            if len(gaps):
+                records = records[gaps[-1] + 1:]
+        return self._frame(records)
+
+    def fetch_count(self, asset, timeframe, now, count):
+        """
+        How many candles a fetch must request to bring the store up to `now`,
+        re-fetching the newest stored candle in case it was still forming.
+        """
+        last = self.last_time(asset, timeframe)
+        if last is None:
+            return count
+        return int(min(count, max(2, (now - last) // timeframe + 2)))
+
+    @staticmethod
+    def _frame(records):
+        return CandleFrame(records["open"], records["high"], records["low"], records["close"], records["time"])
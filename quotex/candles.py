@@ -0,0 +1,116 @@
+# candles.py
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FIELDS = ("open", "high", "low", "close", "time")
+
+class CandleFrame:
+    """
+    Struct-of-arrays candle buffer shared by every analyzer.
+    Each field is a float64 array indexed by time on its last axis:
+    1-D for a single asset, 2-D (asset x time) for a stacked batch.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, open, high, low, close, time):
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.time = np.asarray(time, dtype=np.float64)
+
+    @classmethod
+    def from_candles(cls, candles):
+        """
+        Build a frame from the list of dicts returned by client.get_candle.
+        Args:
+            candles: List of dicts with 'open', 'high', 'low', 'close', 'time' keys
+        Returns:
+            CandleFrame with one contiguous array per field
+        """
+        if not candles:
+            return cls(*np.empty((len(FIELDS), 0)))
+        rows = np.array([(c["open"], c["high"], c["low"], c["close"], c.get("time", 0)) for c in candles], dtype=np.float64)
+        return cls(*rows.T.copy())
+
+    @classmethod
+    def stack(cls, frames, window):
+        """
+        Stack the last `window` candles of several frames into one 2-D frame.
+        Args:
+            frames: Iterable of 1-D CandleFrames, each with at least `window` candles
+            window: Number of trailing candles to keep per frame
+        Returns:
+            CandleFrame with (len(frames), window) arrays
+        """
+        frames = list(frames)
+        data = np.empty((len(FIELDS), len(frames), window))
+        for i, frame in enumerate(frames):
+            for j, field in enumerate(FIELDS):
+                data[j, i] = getattr(frame, field)[-window:]
+        return cls(*data)
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def __len__(self):
+        return self.close.shape[-1]
+
+    def __getitem__(self, key):
+        # Integer index on a single-asset frame keeps the list-of-dicts contract (candles[-1]["close"])
+        if isinstance(key, (int, np.integer)):
+            return {field: getattr(self, field)[key] for field in FIELDS}
+        return CandleFrame(*(getattr(self, field)[..., key] for field in FIELDS))
+
+    def rolling(self, window):
+        """
+        Stacked frame whose row i holds the `window` candles ending at candle
+        i + window - 1 of this 1-D frame. Rows are strided views, not copies.
+        """
+        return CandleFrame(*(sliding_window_view(getattr(self, field), window) for field in FIELDS))
+
+    def row(self, i):
+        """Return asset `i` (1-D frame), or a slice of assets, from a stacked frame."""
+        return CandleFrame(*(getattr(self, field)[i] for field in FIELDS))
+
+    def to_candles(self):
+        """Convert a 1-D frame back to the list-of-dicts representation."""
+        return [dict(zip(FIELDS, values)) for values in zip(*(getattr(self, field).tolist() for field in FIELDS))]
+
+def as_frame(candles):
+    """
+    Return `candles` as a CandleFrame, converting a list of dicts if needed.
+    Args:
+        candles: CandleFrame or list of dicts with OHLC keys
+    Returns:
+        CandleFrame
+    """
+    if isinstance(candles, CandleFrame):
+        return candles
+    return CandleFrame.from_candles(candles)
+
+def period_closes(frame, timeframe, period=60):
+    """
+    Closes of the wall-clock aligned `timeframe` bars in a stacked frame of
+    `period` candles. Candles are grouped by time // timeframe, so missing
+    candles shorten a row instead of shifting its bars. A bar's close is the
+    close of its last candle; the last bar counts only once its final
+    candle is in.
+    Args:
+        frame: 2-D CandleFrame (asset x time)
+        timeframe: Bar length in seconds, a multiple of `period`
+        period: Candle length in seconds
+    Returns:
+        (assets x bars) array, right-aligned; rows with fewer bars are NaN on the left
+    """
+    bucket = frame.time // timeframe
+    ends = np.ones(bucket.shape, dtype=bool)
+    ends[:, :-1] = bucket[:, 1:] != bucket[:, :-1]
+    ends[:, -1] = frame.time[:, -1] % timeframe == timeframe - period
+    counts = ends.sum(axis=-1)
+    closes = np.full((bucket.shape[0], counts.max(initial=0)), np.nan)
+    rows, _ = np.nonzero(ends)
+    columns = np.cumsum(ends, axis=-1)[ends] - 1 + (closes.shape[-1] - counts)[rows]
+    closes[rows, columns] = frame.close[ends]
+    return closes
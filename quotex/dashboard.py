@@ -0,0 +1,124 @@
+# dashboard.py
+import asyncio
+from rich import box
+from rich.console import Group
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+# Named colors of the original theme; rich only understands them as hex
+NEON_GREEN = "#39ff14"
+ELECTRIC_BLUE = "#7df9ff"
+HOT_PINK = "#ff69b4"
+BACKGROUND = "#0a0a23"
+STATUS_COLORS = {"Idle": NEON_GREEN, "Trading": ELECTRIC_BLUE, "Scanning": "yellow", "Waiting": "cyan", "Analyzed": "magenta", "Stopped": HOT_PINK, "Failed": "red"}
+NO_ANALYSIS = {"direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"}
+
+class DashboardState:
+    """
+    Everything the dashboard shows. Trading code only calls set(); the
+    render task redraws when `version` has moved since its last frame.
+    """
+
+    def __init__(self, status="Idle", log_entry=""):
+        self.status = status
+        self.assets_data = {}
+        self.selected_asset = None
+        self.log_entry = log_entry
+        self.spinner = ""
+        self.balance = 0.0
+        self.latency = None  # latency.LatencyTracker.summary(), shown when set
+        self.version = 0
+
+    def set(self, status, assets_data, selected_asset, log_entry, spinner="", balance=None):
+        """Same arguments as the old update_ui; an omitted balance keeps the last one shown."""
+        changes = {"status": status, "assets_data": assets_data, "selected_asset": selected_asset, "log_entry": log_entry, "spinner": spinner}
+        if balance is not None:
+            changes["balance"] = balance
+        for name, value in changes.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                self.version += 1
+
+    def set_latency(self, summary):
+        if summary != self.latency:
+            self.latency = summary
+            self.version += 1
+
+def render(state):
+    """Build the dashboard renderable from a DashboardState."""
+    table = Table.grid(expand=True)
+    table.add_column(style=f"bold white on {BACKGROUND}")
+    table.add_column(style=f"bold white on {BACKGROUND}")
+
+    header = Text("✨ Quantum SMC/ICT Trading Matrix ✨", style=f"bold {NEON_GREEN}", justify="center")
+    table.add_row("", header)
+
+    status_color = STATUS_COLORS.get(state.status, "white")
+    status_display = f"[bold {status_color} underline]{state.status.upper()}[/]"
+    table.add_row(Panel(f"⚡ Status: {status_display}", border_style=f"bold {status_color}", box=box.MINIMAL, padding=(0, 1)))
+
+    asset_signals = ""
+    for asset, data in state.assets_data.items():
+        confidence = data["confidence"]
+        signal_bar = "█" * int(confidence / 5) + " " * (20 - int(confidence / 5))
+        signal_color = NEON_GREEN if confidence >= 90 else ELECTRIC_BLUE if confidence >= 70 else HOT_PINK
+        asset_signals += f"[bold magenta]{asset}[/]: [{signal_color}]{signal_bar}[/] {confidence:.1f}%\n"
+    signal_panel = Panel(Text.from_markup(f"📡 Signals:\n{asset_signals.strip()}", style=f"white on {BACKGROUND}"), border_style=f"bold {NEON_GREEN}", box=box.MINIMAL, padding=(0, 1))
+    table.add_row(signal_panel)
+
+    asset_panel = Panel(Text.from_markup(f"🎯 Selected: [bold magenta]{state.selected_asset or 'None'}[/]", style=f"white on {BACKGROUND}"), border_style="bold magenta", box=box.MINIMAL, padding=(0, 1))
+    balance_panel = Panel(Text.from_markup(f"💸 Balance: [bold cyan]${state.balance:.2f}[/]", style=f"white on {BACKGROUND}"), border_style="bold cyan", box=box.MINIMAL, padding=(0, 1))
+    table.add_row(asset_panel, balance_panel)
+
+    selected_data = state.assets_data.get(state.selected_asset, NO_ANALYSIS)
+    analysis = f"{selected_data['direction']} | {selected_data['pattern']} | {selected_data['kill_zone']} | {selected_data['pot']}"
+    analysis_panel = Panel(Text(f"🔮 Analysis: {analysis}", style=f"yellow on {BACKGROUND}"), border_style="bold yellow", box=box.MINIMAL, padding=(0, 1))
+    log_panel = Panel(Text(f"🔔 Log: {state.log_entry} {state.spinner}", style=f"white on {BACKGROUND}"), border_style=f"bold {ELECTRIC_BLUE}", box=box.MINIMAL, padding=(0, 1))
+    table.add_row(analysis_panel, log_panel)
+
+    body = table
+    if state.latency:
+        latency_table = Table(box=box.SIMPLE, expand=True, style=f"white on {BACKGROUND}")
+        latency_table.add_column("⏱ Stage")
+        for column in ("p50 ms", "p95 ms", "p99 ms", "n"):
+            latency_table.add_column(column, justify="right")
+        for stage, stats in state.latency.items():
+            if stats:
+                latency_table.add_row(stage, f"{stats['p50']:.2f}", f"{stats['p95']:.2f}", f"{stats['p99']:.2f}", str(stats["count"]))
+        body = Group(table, Panel(latency_table, border_style="bold cyan", box=box.MINIMAL, padding=(0, 1)))
+
+    return Panel(body, border_style=f"bold {NEON_GREEN}", box=box.DOUBLE, padding=(1, 2), title=f"[bold {ELECTRIC_BLUE}]Quantum Matrix[/]", title_align="left", subtitle="[bold magenta]v1.0[/]", subtitle_align="right", style=f"on {BACKGROUND}", width=90)
+
+class Dashboard:
+    """
+    Render task for a rich Live display created with auto_refresh=False.
+    Redraws at most `max_fps` times a second, and only after the state changed.
+    """
+
+    def __init__(self, live, state, max_fps=4):
+        self.live = live
+        self.state = state
+        self.max_fps = max_fps
+        self._rendered = -1
+        self._task = None
+
+    def draw(self):
+        if self.state.version != self._rendered:
+            self._rendered = self.state.version
+            self.live.update(render(self.state), refresh=True)
+
+    async def run(self):
+        while True:
+            self.draw()
+            await asyncio.sleep(1 / self.max_fps)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.draw()  # Final frame, so the last status is left on screen
@@ -0,0 +1,103 @@
+# event_log.py
+import os
+import json
+import time
+import asyncio
+
+EVENT_KINDS = ("scan", "signal", "order", "settlement", "error")
+
+def _json_default(value):
+    # NumPy scalars (confidence, prices) serialize as plain numbers
+    return value.item() if hasattr(value, "item") else str(value)
+
+class EventLog:
+    """
+    Structured session events written as JSON lines.
+    emit() only enqueues; a background task writes batches from a worker
+    thread so the event loop never waits on disk, and rotates the file
+    once it exceeds `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5, batch_size=256, flush_interval=1.0, max_pending=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0  # Events discarded because the writer fell behind
+        self._queue = asyncio.Queue(max_pending)
+        self._pending = []  # Taken off the queue, not yet written
+        self._task = None
+        self._writing = None  # Batch being written by the worker thread
+
+    def emit(self, kind, **fields):
+        """Queue one event; never blocks."""
+        event = {"ts": time.time(), "kind": kind}
+        event.update(fields)
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _write(self, events):
+        lines = "".join(json.dumps(event, default=_json_default) + "\n" for event in events)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(lines) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _rotate(self):
+        # events.jsonl -> events.jsonl.1 -> ... -> events.jsonl.<backups>, oldest dropped
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _drain(self):
+        events = []
+        while len(events) < self.batch_size and not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+    async def _flush(self, events):
+        try:
+            await asyncio.to_thread(self._write, events)
+        except OSError:
+            self.dropped += len(events)
+
+    async def run(self):
+        while True:
+            self._pending.append(await self._queue.get())
+            await asyncio.sleep(self.flush_interval)  # Let a batch accumulate
+            self._pending.extend(self._drain())
+            events, self._pending = self._pending, []
+            # Shielded: cancelling the writer must not abandon a batch halfway to disk
+            self._writing = asyncio.ensure_future(self._flush(events))
+            await asyncio.shield(self._writing)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        """Cancel the writer, wait for a batch it is writing, then flush whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._writing is not None:
+            await self._writing
+            self._writing = None
+        while self._pending or not self._queue.empty():
+            self._pending.extend(self._drain())
+            events, self._pending = self._pending, []
+            await self._flush(events)
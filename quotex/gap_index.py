@@ -0,0 +1,227 @@
+# gap_index.py
+import math
+import itertools
+from bisect import bisect_left, bisect_right
+from collections import deque
+import numpy as np
+from candles import as_frame
+
+class Gap:
+    __slots__ = ("id", "direction", "bottom", "top", "size", "time", "fvg", "filled_time")
+
+    def __init__(self, id, direction, bottom, top, time, fvg):
+        self.id = id
+        self.direction = direction  # 1 bullish (gap up, below price), -1 bearish (gap down, above price)
+        self.bottom = bottom  # Unfilled range; shrinks as price trades into it
+        self.top = top
+        self.size = top - bottom  # Range when formed
+        self.time = time  # Open time of the candle that completed the gap
+        self.fvg = fvg  # Also a fair value gap: the third candle closed beyond the first
+        self.filled_time = None
+
+    @property
+    def level(self):
+        return (self.bottom + self.top) / 2
+
+    @property
+    def filled(self):
+        """Fraction of the original range price has traded through, 0-1."""
+        return 1.0 - (self.top - self.bottom) / self.size
+
+    def as_dict(self):
+        return {"direction": self.direction, "bottom": self.bottom, "top": self.top, "level": self.level,
+                "filled": self.filled, "time": self.time, "fvg": self.fvg}
+
+class GapBook:
+    """
+    Every three-candle gap (SMC imbalance; ICT fair value gap when the third
+    candle also closes beyond the first) of one asset, built candle by
+    candle. A gap stays in the book until price trades through all of it.
+
+    A bullish gap is filled from its top down, a bearish one from its bottom
+    up. So unfilled bullish gaps always sit below every later low, and
+    unfilled bearish gaps above every later high. Each side is kept sorted
+    by the edge facing price. Nearest-gap lookups are a bisection, and a
+    candle only touches the gaps it trades into.
+    """
+
+    def __init__(self, keep=200):
+        """
+        Args:
+            keep: Filled gaps remembered in `filled`
+        """
+        self.bullish = []  # Unfilled bullish gaps, ascending top
+        self.bullish_tops = []
+        self.bearish = []  # Unfilled bearish gaps, ascending bottom
+        self.bearish_bottoms = []
+        self.filled = deque(maxlen=keep)
+        self.recent = deque(maxlen=2)  # (high, low, close, time) of the previous two candles
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self.bullish) + len(self.bearish)
+
+    def add(self, high, low, close, time):
+        """
+        Apply a closed candle: fill the gaps it trades into, then record the gap it completes, if any.
+        Returns:
+            The new Gap or None
+        """
+        if self.recent and 0 < time <= self.recent[-1][3]:
+            return None  # Already applied (untimed candles are always new)
+
+        # Bullish gaps with top above the low are entered from above
+        i = bisect_right(self.bullish_tops, low)
+        touched = self.bullish[i:]
+        del self.bullish[i:], self.bullish_tops[i:]
+        for gap in touched:
+            gap.top = max(gap.bottom, low)
+            self._keep(gap, time, self.bullish, self.bullish_tops, gap.top, len(self.bullish))
+
+        # Bearish gaps with bottom below the high are entered from below
+        i = bisect_left(self.bearish_bottoms, high)
+        touched = self.bearish[:i]
+        del self.bearish[:i], self.bearish_bottoms[:i]
+        for gap in reversed(touched):
+            gap.bottom = min(gap.top, high)
+            self._keep(gap, time, self.bearish, self.bearish_bottoms, gap.bottom, 0)
+
+        gap = None
+        if len(self.recent) == 2:
+            first_high, first_low, first_close, _ = self.recent[0]
+            if first_high < low:
+                gap = Gap(next(self._ids), 1, first_high, low, time, close > first_close)
+                index = bisect_right(self.bullish_tops, gap.top)
+                self.bullish.insert(index, gap)
+                self.bullish_tops.insert(index, gap.top)
+            elif first_low > high:
+                gap = Gap(next(self._ids), -1, high, first_low, time, close < first_close)
+                index = bisect_right(self.bearish_bottoms, gap.bottom)
+                self.bearish.insert(index, gap)
+                self.bearish_bottoms.insert(index, gap.bottom)
+        self.recent.append((high, low, close, time))
+        return gap
+
+    def _keep(self, gap, time, gaps, keys, key, index):
+        # Put a partly filled gap back at `index`, or retire it once nothing is left
+        if gap.top <= gap.bottom:
+            gap.filled_time = time
+            self.filled.append(gap)
+        else:
+            gaps.insert(index, gap)
+            keys.insert(index, key)
+
+    def nearest_above(self, price):
+        """Unfilled bearish gap with the lowest bottom at or above `price`, or None."""
+        i = bisect_left(self.bearish_bottoms, price)
+        return self.bearish[i] if i < len(self.bearish) else None
+
+    def nearest_below(self, price):
+        """Unfilled bullish gap with the highest top at or below `price`, or None."""
+        i = bisect_right(self.bullish_tops, price)
+        return self.bullish[i - 1] if i else None
+
+    def unfilled(self):
+        """Unfilled gaps, bullish by ascending top then bearish by ascending bottom."""
+        return self.bullish + self.bearish
+
+class GapIndex:
+    """
+    A GapBook per asset, fed with closed candles. Register on_candle as a
+    CandleFeed listener. An asset's book is built from the candle store,
+    or the feed window, the first time the asset closes a candle.
+    """
+
+    def __init__(self, store=None, feed=None, history=1440, period=60, keep=200):
+        """
+        Args:
+            store: Optional CandleStore to seed books from
+            feed: Optional CandleFeed to seed from when the store has nothing
+            history: Closed candles replayed into a new book
+            period: Candle period in seconds
+            keep: Filled gaps remembered per asset
+        """
+        self.store = store
+        self.feed = feed
+        self.history = history
+        self.period = period
+        self.keep = keep
+        self.books = {}  # asset -> GapBook
+
+    def seed(self, asset, candles):
+        """Build an asset's book from closed candles, oldest first, replacing what it had."""
+        frame = as_frame(candles)
+        book = self.books[asset] = GapBook(self.keep)
+        for candle in zip(frame.high.tolist(), frame.low.tolist(), frame.close.tolist(), frame.time.tolist()):
+            book.add(*candle)
+        return book
+
+    def _history(self, asset):
+        if self.store is not None:
+            frame = self.store.tail(asset, self.period, self.history)
+            if len(frame):
+                return frame
+        if self.feed is not None:
+            frame = self.feed.frame(asset)
+            if frame is not None:
+                return frame[:-1]
+        return []
+
+    def on_candle(self, asset, candle, closed):
+        """CandleFeed listener; forming updates are ignored."""
+        if not closed:
+            return
+        book = self.books.get(asset)
+        if book is None:
+            book = self.seed(asset, self._history(asset))
+        book.add(candle["high"], candle["low"], candle["close"], candle["time"])
+
+    def nearest(self, asset, price):
+        """
+        Nearest unfilled gaps around a price.
+        Returns:
+            Tuple: (gap above or None, gap below or None)
+        """
+        book = self.books.get(asset)
+        if book is None:
+            return None, None
+        return book.nearest_above(price), book.nearest_below(price)
+
+    def levels(self, prices):
+        """
+        The scorer's gap_above/gap_below inputs for each asset.
+        Args:
+            prices: Dict of asset -> current price
+        Returns:
+            Dict of asset -> (bottom of the nearest unfilled gap above, top of the
+            nearest one below), NaN where there is none
+        """
+        levels = {}
+        for asset, price in prices.items():
+            above, below = self.nearest(asset, price)
+            levels[asset] = (above.bottom if above else math.nan, below.top if below else math.nan)
+        return levels
+
+def gap_levels(candles, keep=200):
+    """
+    GapIndex.levels at every bar of a history: each close against the gaps
+    of the candles before it, as a live scan sees the forming candle.
+    Args:
+        candles: CandleFrame or list of dicts with OHLC and 'time' keys, oldest first
+        keep: Filled gaps remembered
+    Returns:
+        Tuple of arrays: (gap_above, gap_below), one entry per candle
+    """
+    frame = as_frame(candles)
+    book = GapBook(keep)
+    above = np.full(len(frame), np.nan)
+    below = np.full(len(frame), np.nan)
+    for i, (high, low, close, time) in enumerate(zip(frame.high.tolist(), frame.low.tolist(), frame.close.tolist(), frame.time.tolist())):
+        gap = book.nearest_above(close)
+        if gap is not None:
+            above[i] = gap.bottom
+        gap = book.nearest_below(close)
+        if gap is not None:
+            below[i] = gap.top
+        book.add(high, low, close, time)
+    return above, below
@@ -1,12 +1,73 @@
 import numpy as np
-from datetime import datetime
-import pytz
+from candles import CandleFrame, as_frame
+
+KILL_ZONES = {1: "London Kill Zone", 2: "NY Kill Zone", 0: None}
+POWER_OF_THREE = {1: "Bullish Power of Three", -1: "Bearish Power of Three", 0: None}
+
+def analyze_ict_batch(frame, current_time, lookback=50):
+    """
+    Vectorized ICT metrics over a stacked (asset x time) frame.
+    Args:
+        frame: 2-D CandleFrame with at least `lookback` candles per row
+        current_time: Timestamp (seconds since epoch), scalar or one per row
+        lookback: Number of candles to analyze (default 50)
+    Returns:
+        Dict of per-row arrays; 'fvg_direction' and 'pot_pattern' are coded
+        1 bullish, -1 bearish, 0 none, 'kill_zone' is a KILL_ZONES key and
+        missing levels are NaN
+    """
+    frame = frame[-lookback:]
+    highs = frame.high
+    lows = frame.low
+    closes = frame.close
+    rows = np.arange(closes.shape[0])
+
+    # 1. Fair Value Gap (price inefficiency zones)
+    fvg_highs = highs[:, -10:]
+    fvg_lows = lows[:, -10:]
+    fvg_closes = closes[:, -10:]
+    count = fvg_highs.shape[-1] - 3
+    bullish_fvg = (fvg_highs[:, :count] < fvg_lows[:, 2:count + 2]) & (fvg_closes[:, 2:count + 2] > fvg_closes[:, :count])
+    bearish_fvg = (fvg_lows[:, :count] > fvg_highs[:, 2:count + 2]) & (fvg_closes[:, 2:count + 2] < fvg_closes[:, :count])
+    gaps = bullish_fvg | bearish_fvg
+    i = gaps.argmax(axis=-1)
+    fvg_detected = gaps.any(axis=-1)
+    bullish = bullish_fvg[rows, i]
+    fvg_level = np.where(bullish, (fvg_highs[rows, i] + fvg_lows[rows, i + 2]) / 2, (fvg_lows[rows, i] + fvg_highs[rows, i + 2]) / 2)
+    fvg_level = np.where(fvg_detected, fvg_level, np.nan)
+    fvg_direction = np.where(fvg_detected, np.where(bullish, 1, -1), 0)
+    fvg_prob = np.where(fvg_detected, 90, 0)
+
+    # 2. Kill Zone (high-probability trading windows)
+    hour = np.floor(np.broadcast_to(np.asarray(current_time, dtype=np.float64), rows.shape) / 3600) % 24  # UTC hour
+    london = (7 <= hour) & (hour < 11)  # London Kill Zone: 7-11 UTC
+    new_york = (13 <= hour) & (hour < 17)  # NY Kill Zone: 13-17 UTC
+    kill_zone = np.where(london, 1, np.where(new_york, 2, 0))
+    kill_confidence = np.where(kill_zone != 0, 95, 0)
+
+    # 3. Power of Three (accumulation, manipulation, distribution)
+    pot_highs = highs[:, -20:]
+    pot_lows = lows[:, -20:]
+    bullish_pot = (pot_lows[:, -10:].min(axis=-1) < pot_lows[:, :-10].min(axis=-1)) & (pot_highs[:, -5:].max(axis=-1) > pot_highs[:, :-5].max(axis=-1))
+    bearish_pot = (pot_highs[:, -10:].max(axis=-1) > pot_highs[:, :-10].max(axis=-1)) & (pot_lows[:, -5:].min(axis=-1) < pot_lows[:, :-5].min(axis=-1))
+    pot_pattern = np.where(bullish_pot, 1, np.where(bearish_pot, -1, 0))
+    pot_confidence = np.where(pot_pattern != 0, 85, 0)
+
+    return {
+        "fvg_level": fvg_level,
+        "fvg_direction": fvg_direction,
+        "fvg_probability": fvg_prob,
+        "kill_zone": kill_zone,
+        "kill_confidence": kill_confidence,
+        "pot_pattern": pot_pattern,
+        "pot_confidence": pot_confidence
+    }
 
 def analyze_ict(candles, current_time, lookback=50):
     """
     Ultimate ICT calculations focusing on institutional trading concepts.
     Args:
-        candles: List of dicts with 'open', 'high', 'low', 'close', 'time'
+        candles: CandleFrame or list of dicts with 'open', 'high', 'low', 'close', 'time'
         current_time: Current timestamp (seconds since epoch)
         lookback: Number of candles to analyze (default 50)
     Returns:
@@ -19,53 +80,11 @@ def analyze_ict(candles, current_time, lookback=50):
             "power_of_three": {"pattern": None, "confidence": 0}
         }
 
-    # Extract OHLC data
-    highs = np.array([c["high"] for c in candles[-lookback:]])
-    lows = np.array([c["low"] for c in candles[-lookback:]])
-    closes = np.array([c["close"] for c in candles[-lookback:]])
-
-    # 1. Fair Value Gap (price inefficiency zones)
-    fvg_highs = highs[-10:]
-    fvg_lows = lows[-10:]
-    fvg_closes = closes[-10:]
-    for i in range(len(fvg_highs) - 3):
-        if fvg_highs[i] < fvg_lows[i + 2] and fvg_closes[i + 2] > fvg_closes[i]:  # Bullish FVG
-            fvg_level = (fvg_highs[i] + fvg_lows[i + 2]) / 2
-            fvg_detected = True
-            fvg_prob = 90
-            break
-        elif fvg_lows[i] > fvg_highs[i + 2] and fvg_closes[i + 2] < fvg_closes[i]:  # Bearish FVG
-            fvg_level = (fvg_lows[i] + fvg_highs[i + 2]) / 2
-            fvg_detected = True
-            fvg_prob = 90
-            break
-    else:
-        fvg_level, fvg_detected, fvg_prob = None, False, 0
-
-    # 2. Kill Zone (high-probability trading windows)
-    tz = pytz.utc
-    dt = datetime.fromtimestamp(current_time, tz)
-    hour = dt.hour
-    if 7 <= hour < 11:  # London Kill Zone: 7-11 UTC
-        kill_zone, kill_confidence = "London Kill Zone", 95
-    elif 13 <= hour < 17:  # NY Kill Zone: 13-17 UTC
-        kill_zone, kill_confidence = "NY Kill Zone", 95
-    else:
-        kill_zone, kill_confidence = None, 0
-
-    # 3. Power of Three (accumulation, manipulation, distribution)
-    pot_closes = closes[-20:]
-    pot_highs = highs[-20:]
-    pot_lows = lows[-20:]
-    if min(pot_lows[-10:]) < min(pot_lows[:-10]) and max(pot_highs[-5:]) > max(pot_highs[:-5]):  # Bullish POT
-        pot_pattern, pot_confidence = "Bullish Power of Three", 85
-    elif max(pot_highs[-10:]) > max(pot_highs[:-10]) and min(pot_lows[-5:]) < min(pot_lows[:-5]):  # Bearish POT
-        pot_pattern, pot_confidence = "Bearish Power of Three", 85
-    else:
-        pot_pattern, pot_confidence = None, 0
-
+    ict = {key: values[0] for key, values in analyze_ict_batch(CandleFrame.stack([as_frame(candles)], lookback), current_time, lookback).items()}
+    fvg_detected = bool(ict["fvg_direction"] != 0)
+    kill_zone = KILL_ZONES[int(ict["kill_zone"])]
     return {
-        "fair_value_gap": {"level": fvg_level, "detected": fvg_detected, "probability": fvg_prob},
-        "kill_zone": {"active": kill_zone is not None, "type": kill_zone, "confidence": kill_confidence},
-        "power_of_three": {"pattern": pot_pattern, "confidence": pot_confidence}
-    }
\ No newline at end of file
+        "fair_value_gap": {"level": ict["fvg_level"] if fvg_detected else None, "detected": fvg_detected, "probability": ict["fvg_probability"]},
+        "kill_zone": {"active": kill_zone is not None, "type": kill_zone, "confidence": ict["kill_confidence"]},
+        "power_of_three": {"pattern": POWER_OF_THREE[int(ict["pot_pattern"])], "confidence": ict["pot_confidence"]}
+    }
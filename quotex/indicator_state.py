@@ -0,0 +1,242 @@
+# indicator_state.py
+import math
+from collections import deque
+from candles import as_frame
+
+class _RollingSum:
+    """
+    Sum of the last `size` inputs. Also counts the nonzero ones, so a sum
+    of zeros is exactly zero even after rounding in the running total.
+    """
+    __slots__ = ("size", "values", "total", "nonzero", "since")
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.nonzero = 0
+        self.since = 0  # Inputs since the total was last summed exactly
+
+    def push(self, x):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.nonzero -= old != 0
+        self.values.append(x)
+        self.total += x
+        self.nonzero += x != 0
+        self.since += 1
+        if self.since >= self.size:  # Re-sum once per window so rounding cannot build up
+            self.total = math.fsum(self.values)
+            self.since = 0
+
+    @property
+    def ready(self):
+        return len(self.values) == self.size
+
+    @property
+    def sum(self):
+        return self.total if self.nonzero else 0.0
+
+    def state(self):
+        return tuple(self.values), self.total, self.nonzero, self.since
+
+    def set_state(self, state):
+        values, self.total, self.nonzero, self.since = state
+        self.values = deque(values, maxlen=self.size)
+
+class _WindowedEMA:
+    """
+    indicators._ema in O(1) per input: an EMA over the last `period` inputs,
+    seeded with the first of them. With a = 2/(period+1) and q = 1-a,
+    S_t = q*S_{t-1} + a*x_t - a*q^period*x_{t-period} weights the window
+    by a*q^k, and the seed correction q^period*x_{t-period+1} gives the
+    oldest input its q^(period-1).
+    """
+    __slots__ = ("period", "alpha", "decay", "weights", "values", "s", "since")
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.decay = (1 - self.alpha) ** period
+        self.weights = [self.alpha * (1 - self.alpha) ** k for k in range(period - 1, -1, -1)]  # Oldest first
+        self.values = deque(maxlen=period)
+        self.s = 0.0
+        self.since = 0
+
+    def push(self, x):
+        leaving = self.values[0] if len(self.values) == self.period else 0.0
+        self.values.append(x)
+        self.s = (1 - self.alpha) * self.s + self.alpha * x - self.alpha * self.decay * leaving
+        self.since += 1
+        if self.since >= self.period and len(self.values) == self.period:
+            self.s = math.fsum(w * v for w, v in zip(self.weights, self.values))
+            self.since = 0
+
+    @property
+    def ready(self):
+        return len(self.values) == self.period
+
+    @property
+    def value(self):
+        return self.s + self.decay * self.values[0]
+
+    def state(self):
+        return tuple(self.values), self.s, self.since
+
+    def set_state(self, state):
+        values, self.s, self.since = state
+        self.values = deque(values, maxlen=self.period)
+
+class IndicatorState:
+    """
+    Streaming EMA/RSI/MACD/ATR/ADX for one asset and timeframe. Values equal
+    the calculate_* functions in indicators.py over the same candles, i.e.
+    the windowed definitions the scorer reads, and each closed candle
+    updates them in O(1) whatever the length of the history.
+    """
+
+    def __init__(self, ema_periods=(10, 50), rsi_period=14, atr_period=14, adx_period=14, macd=(12, 26, 9)):
+        fast, slow, signal = macd
+        self.ema = {period: _WindowedEMA(period) for period in ema_periods}
+        self.macd_fast = _WindowedEMA(fast)
+        self.macd_slow = _WindowedEMA(slow)
+        self.macd_signal = _WindowedEMA(signal)
+        self.rsi_period = rsi_period
+        self.rsi_gain = _RollingSum(rsi_period - 1)  # rsi_series averages the last period-1 of `period` changes
+        self.rsi_loss = _RollingSum(rsi_period - 1)
+        self.atr = _RollingSum(atr_period)
+        self.adx_tr = _RollingSum(adx_period)
+        self.adx_dm_plus = _RollingSum(adx_period)
+        self.adx_dm_minus = _RollingSum(adx_period)
+        self._parts = list(self.ema.values()) + [
+            self.macd_fast, self.macd_slow, self.macd_signal, self.rsi_gain, self.rsi_loss,
+            self.atr, self.adx_tr, self.adx_dm_plus, self.adx_dm_minus
+        ]
+        self.changes = 0  # Price changes seen, one fewer than candles
+        self.prev = None  # (high, low, close) of the last applied candle
+        self.last_time = None  # Time of the last closed candle
+        self._forming = None  # Snapshot taken before the forming candle was applied
+
+    def snapshot(self):
+        """Capture the complete state as an immutable tuple."""
+        return tuple(part.state() for part in self._parts), self.changes, self.prev, self.last_time
+
+    def restore(self, snap):
+        """Roll back to a state previously returned by snapshot()."""
+        states, self.changes, self.prev, self.last_time = snap
+        for part, state in zip(self._parts, states):
+            part.set_state(state)
+        self._forming = None
+
+    def update(self, candle, closed=True):
+        """
+        Apply one candle.
+        A forming candle (closed=False) is applied on top of a snapshot, so the
+        next update, forming or closed, first rolls it back and replaces it.
+        A candle no newer than the last closed one is ignored.
+        Args:
+            candle: Dict with 'high', 'low', 'close' and optionally 'time'
+            closed: Whether the candle is final
+        Returns:
+            Dict of current indicator values (see values())
+        """
+        time = candle.get("time")
+        if time and self.last_time is not None and time <= self.last_time:
+            return self.values()  # Already applied (untimed candles are always new)
+        if self._forming is not None:
+            self.restore(self._forming)
+        if not closed:
+            self._forming = self.snapshot()
+        self._apply(candle["high"], candle["low"], candle["close"])
+        if closed:
+            self.last_time = time
+        return self.values()
+
+    def sync(self, candles):
+        """
+        Apply only the candles newer than the last closed one.
+        The final candle of `candles` is treated as still forming, matching
+        what client.get_candle returns mid-minute.
+        Args:
+            candles: CandleFrame or list of dicts with 'high', 'low', 'close', 'time'
+        Returns:
+            Dict of current indicator values
+        """
+        frame = as_frame(candles)
+        start = 0
+        if self.last_time is not None:
+            start = int(frame.time.searchsorted(self.last_time, side="right"))
+        for i in range(start, len(frame)):
+            self.update(frame[i], closed=i < len(frame) - 1)
+        return self.values()
+
+    def _apply(self, high, low, close):
+        for ema in self.ema.values():
+            ema.push(close)
+        self.macd_fast.push(close)
+        self.macd_slow.push(close)
+        if self.macd_slow.ready:
+            self.macd_signal.push(self.macd_fast.value - self.macd_slow.value)
+
+        if self.prev is not None:
+            prev_high, prev_low, prev_close = self.prev
+            self.changes += 1
+            delta = close - prev_close
+            if self.changes > 1:  # rsi_series skips the first change of its window
+                self.rsi_gain.push(delta if delta > 0 else 0.0)
+                self.rsi_loss.push(-delta if delta < 0 else 0.0)
+
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            self.atr.push(tr)
+            up_move = high - prev_high
+            down_move = prev_low - low
+            self.adx_tr.push(tr)
+            self.adx_dm_plus.push(up_move if up_move > down_move and up_move > 0 else 0.0)
+            self.adx_dm_minus.push(down_move if down_move > up_move and down_move > 0 else 0.0)
+        self.prev = (high, low, close)
+
+    def values(self):
+        """
+        Current indicator values, with the same neutral defaults as the
+        calculate_* functions while a series is still warming up.
+        Returns:
+            Dict with 'ema' ({period: value}), 'rsi', 'macd' (line, signal, histogram), 'atr', 'adx'
+        """
+        rsi = 50
+        if self.changes >= self.rsi_period:
+            gain, loss = self.rsi_gain.sum, self.rsi_loss.sum
+            if loss == 0:
+                rsi = 100 if gain > 0 else 50
+            else:
+                rsi = 100 - (100 / (1 + gain / loss))
+
+        macd = (0, 0, 0)
+        if self.macd_slow.ready:
+            macd_line = self.macd_fast.value - self.macd_slow.value
+            signal_line = self.macd_signal.value if self.macd_signal.ready else 0
+            macd = (macd_line, signal_line, macd_line - signal_line)
+
+        adx = 0
+        if self.adx_tr.ready and self.adx_tr.sum != 0:
+            plus, minus = self.adx_dm_plus.sum, self.adx_dm_minus.sum
+            adx = 100 * abs(plus - minus) / (plus + minus) if plus + minus != 0 else 0
+
+        return {
+            "ema": {period: ema.value if ema.ready else 0 for period, ema in self.ema.items()},
+            "rsi": rsi,
+            "macd": macd,
+            "atr": self.atr.sum / self.atr.size if self.atr.ready else 0,
+            "adx": adx
+        }
+
+class IndicatorStates(dict):
+    """IndicatorState per (asset, timeframe) key, created on first access."""
+
+    def __init__(self, **state_kwargs):
+        super().__init__()
+        self.state_kwargs = state_kwargs
+
+    def __missing__(self, key):
+        state = self[key] = IndicatorState(**self.state_kwargs)
+        return state
@@ -1,51 +1,195 @@
 # indicators.py
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from candles import as_frame
+
+# Series functions work along the last (time) axis, so they accept single-asset
+# frames as well as stacked (asset x time) frames. Bars without enough history
+# are NaN; the scalar calculate_* wrappers return the last value of a series
+# computed over just the window they need.
+#
+# Every indicator here is windowed: each value depends only on the last
+# `period` candles. The EMA is re-seeded from the first close of its window
+# instead of running over the whole history, and RSI, ATR and ADX are plain
+# rolling means, not Wilder-smoothed. These are the definitions the original
+# scorer was tuned on, and the rule table in scoring.py and its thresholds
+# (RSI 30/70, ADX 25, ...) depend on them. A textbook recursive EMA or Wilder
+# RSI gives different values and would change scores. For O(1) per-candle
+# updates of these same definitions use indicator_state.IndicatorState.
+
+def _pad(values, n):
+    """Left-pad `values` with NaN along the last axis to length `n`."""
+    missing = n - values.shape[-1]
+    if missing == 0:
+        return values
+    return np.concatenate([np.full(values.shape[:-1] + (missing,), np.nan), values], axis=-1)
+
+def _rolling_mean(values, period):
+    return sliding_window_view(values, period, axis=-1).mean(axis=-1)
+
+def _ema_weights(period):
+    # An EMA seeded with the first close of a `period` window, unrolled into FIR weights
+    alpha = 2 / (period + 1)
+    weights = alpha * (1 - alpha) ** np.arange(period - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (period - 1)
+    return weights
+
+def _ema(values, period):
+    if values.shape[-1] < period:
+        return np.full(values.shape, np.nan)
+    return _pad(sliding_window_view(values, period, axis=-1) @ _ema_weights(period), values.shape[-1])
+
+def ema_series(candles, period):
+    """
+    EMA series, each value seeded from the first close of its `period` window.
+    Args:
+        candles: CandleFrame or list of dicts with 'close' key
+        period: Lookback period for EMA
+    Returns:
+        Array: EMA per candle (NaN for the first period-1 candles)
+    """
+    return _ema(as_frame(candles).close, period)
+
+def rsi_series(candles, period=14):
+    """
+    RSI series from rolling means of gains and losses (not Wilder-smoothed).
+    Args:
+        candles: CandleFrame or list of dicts with 'close' key
+        period: Lookback period for RSI (default 14)
+    Returns:
+        Array: RSI per candle (NaN for the first `period` candles)
+    """
+    closes = as_frame(candles).close
+    n = closes.shape[-1]
+    if n < period + 1:
+        return np.full(closes.shape, np.nan)
+    deltas = np.diff(closes, axis=-1)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = _rolling_mean(gains[..., 1:], period - 1)  # Skip first diff of each window
+    avg_loss = _rolling_mean(losses[..., 1:], period - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+    return _pad(rsi, n)
+
+def macd_series(candles, fast=12, slow=26, signal=9):
+    """
+    MACD series with the signal line as a rolling EMA of the MACD line.
+    Args:
+        candles: CandleFrame or list of dicts with 'close' key
+        fast: Fast EMA period (default 12)
+        slow: Slow EMA period (default 26)
+        signal: Signal line period (default 9)
+    Returns:
+        Tuple of arrays: (macd_line, signal_line, histogram)
+    """
+    closes = as_frame(candles).close
+    n = closes.shape[-1]
+    macd_line = _ema(closes, fast) - _ema(closes, slow)
+    signal_line = _pad(_ema(macd_line[..., slow - 1:], signal), n)
+    return macd_line, signal_line, macd_line - signal_line
+
+def bollinger_series(candles, period=20, std_dev=2):
+    """
+    Bollinger Bands series.
+    Args:
+        candles: CandleFrame or list of dicts with 'close' key
+        period: Lookback period for SMA (default 20)
+        std_dev: Standard deviation multiplier (default 2)
+    Returns:
+        Tuple of arrays: (upper_bb, sma, lower_bb, bandwidth)
+    """
+    closes = as_frame(candles).close
+    n = closes.shape[-1]
+    if n < period:
+        empty = np.full(closes.shape, np.nan)
+        return empty, empty, empty, empty
+    windows = sliding_window_view(closes, period, axis=-1)
+    sma = windows.mean(axis=-1)
+    std = windows.std(axis=-1)
+    upper_bb = sma + std_dev * std
+    lower_bb = sma - std_dev * std
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bandwidth = np.where(sma != 0, (upper_bb - lower_bb) / sma, 0)
+    return _pad(upper_bb, n), _pad(sma, n), _pad(lower_bb, n), _pad(bandwidth, n)
+
+def _true_range(frame):
+    highs, lows, prev_closes = frame.high[..., 1:], frame.low[..., 1:], frame.close[..., :-1]
+    return np.maximum(highs - lows, np.maximum(np.abs(highs - prev_closes), np.abs(lows - prev_closes)))
+
+def atr_series(candles, period=14):
+    """
+    ATR series as a rolling mean of true range (not Wilder-smoothed).
+    Args:
+        candles: CandleFrame or list of dicts with 'high', 'low', 'close' keys
+        period: Lookback period for ATR (default 14)
+    Returns:
+        Array: ATR per candle (NaN for the first `period` candles)
+    """
+    frame = as_frame(candles)
+    n = len(frame)
+    if n < period + 1:
+        return np.full(frame.shape, np.nan)
+    return _pad(_rolling_mean(_true_range(frame), period), n)
+
+def adx_series(candles, period=14):
+    """
+    Directional index series from rolling means of +DM, -DM and true range.
+    This is the unsmoothed DX of the window, not a Wilder-smoothed ADX.
+    Args:
+        candles: CandleFrame or list of dicts with 'high', 'low', 'close' keys
+        period: Lookback period for ADX (default 14)
+    Returns:
+        Array: ADX per candle (0-100, NaN for the first `period` candles)
+    """
+    frame = as_frame(candles)
+    n = len(frame)
+    if n < period + 1:
+        return np.full(frame.shape, np.nan)
+    up_move = np.diff(frame.high, axis=-1)
+    down_move = -np.diff(frame.low, axis=-1)
+    dm_plus = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+    dm_minus = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+    atr = _rolling_mean(_true_range(frame), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_plus = 100 * _rolling_mean(dm_plus, period) / atr
+        di_minus = 100 * _rolling_mean(dm_minus, period) / atr
+        di_sum = di_plus + di_minus
+        dx = np.where(di_sum != 0, 100 * np.abs(di_plus - di_minus) / di_sum, 0)
+    return _pad(np.where(atr == 0, 0, dx), n)
 
 def calculate_ema(candles, period):
     """
     Calculate Exponential Moving Average.
     Args:
-        candles: List of dicts with 'close' key
+        candles: CandleFrame or list of dicts with 'close' key
         period: Lookback period for EMA
     Returns:
         Float: Latest EMA value
     """
     if len(candles) < period:
         return 0
-    closes = np.array([c["close"] for c in candles])
-    alpha = 2 / (period + 1)
-    ema = closes[-period:].copy()
-    for i in range(1, len(ema)):
-        ema[i] = alpha * ema[i] + (1 - alpha) * ema[i-1]
-    return ema[-1]
+    return ema_series(as_frame(candles)[-period:], period)[-1]
 
 def calculate_rsi(candles, period=14):
     """
     Calculate Relative Strength Index.
     Args:
-        candles: List of dicts with 'close' key
+        candles: CandleFrame or list of dicts with 'close' key
         period: Lookback period for RSI (default 14)
     Returns:
         Float: RSI value (0-100)
     """
     if len(candles) < period + 1:  # Need extra candle for diff
         return 50  # Neutral value if insufficient data
-    closes = np.array([c["close"] for c in candles])
-    deltas = np.diff(closes[-period-1:])
-    gains = np.where(deltas > 0, deltas, 0)
-    losses = np.where(deltas < 0, -deltas, 0)
-    avg_gain = np.mean(gains[1:])  # Skip first diff
-    avg_loss = np.mean(losses[1:])
-    if avg_loss == 0:
-        return 100 if avg_gain > 0 else 50
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    return rsi_series(as_frame(candles)[-period-1:], period)[-1]
 
 def calculate_macd(candles, fast=12, slow=26, signal=9):
     """
     Calculate MACD (Moving Average Convergence Divergence).
     Args:
-        candles: List of dicts with 'close' key
+        candles: CandleFrame or list of dicts with 'close' key
         fast: Fast EMA period (default 12)
         slow: Slow EMA period (default 26)
         signal: Signal line period (default 9)
@@ -54,22 +198,10 @@ def calculate_macd(candles, fast=12, slow=26, signal=9):
     """
     if len(candles) < slow:
         return 0, 0, 0
-    closes = np.array([c["close"] for c in candles])
-    ema_fast = calculate_ema(candles[-fast:], fast)
-    ema_slow = calculate_ema(candles[-slow:], slow)
-    macd_line = ema_fast - ema_slow
-    
-    # Calculate signal line (EMA of MACD line)
-    if len(candles) >= slow + signal - 1:
-        macd_values = [calculate_ema(candles[:i+1], fast) - calculate_ema(candles[:i+1], slow) 
-                       for i in range(slow-1, slow-1+signal)]
-        alpha = 2 / (signal + 1)
-        signal_line = macd_values[0]
-        for i in range(1, len(macd_values)):
-            signal_line = alpha * macd_values[i] + (1 - alpha) * signal_line
-    else:
-        signal_line = 0
-    
+    macd_line, signal_line, _ = macd_series(as_frame(candles)[-(slow+signal-1):], fast, slow, signal)
+    macd_line = macd_line[-1]
+    # Signal line needs `signal` MACD values
+    signal_line = signal_line[-1] if len(candles) >= slow + signal - 1 else 0
     histogram = macd_line - signal_line
     return macd_line, signal_line, histogram
 
@@ -77,7 +209,7 @@ def calculate_bollinger_bands(candles, period=20, std_dev=2):
     """
     Calculate Bollinger Bands.
     Args:
-        candles: List of dicts with 'close' key
+        candles: CandleFrame or list of dicts with 'close' key
         period: Lookback period for SMA (default 20)
         std_dev: Standard deviation multiplier (default 2)
     Returns:
@@ -85,63 +217,31 @@ def calculate_bollinger_bands(candles, period=20, std_dev=2):
     """
     if len(candles) < period:
         return 0, 0, 0, 0
-    closes = np.array([c["close"] for c in candles[-period:]])
-    sma = np.mean(closes)
-    std = np.std(closes)
-    upper_bb = sma + std_dev * std
-    lower_bb = sma - std_dev * std
-    bandwidth = (upper_bb - lower_bb) / sma if sma != 0 else 0
-    return upper_bb, sma, lower_bb, bandwidth
+    upper_bb, sma, lower_bb, bandwidth = bollinger_series(as_frame(candles)[-period:], period, std_dev)
+    return upper_bb[-1], sma[-1], lower_bb[-1], bandwidth[-1]
 
 def calculate_atr(candles, period=14):
     """
     Calculate Average True Range.
     Args:
-        candles: List of dicts with 'high', 'low', 'close' keys
+        candles: CandleFrame or list of dicts with 'high', 'low', 'close' keys
         period: Lookback period for ATR (default 14)
     Returns:
         Float: ATR value
     """
     if len(candles) < period + 1:  # Need extra candle for previous close
         return 0
-    highs = np.array([c["high"] for c in candles[-period-1:]])
-    lows = np.array([c["low"] for c in candles[-period-1:]])
-    closes = np.array([c["close"] for c in candles[-period-1:]])
-    tr = np.maximum(highs[1:] - lows[1:], 
-                    np.abs(highs[1:] - closes[:-1]), 
-                    np.abs(lows[1:] - closes[:-1]))
-    return np.mean(tr)
+    return atr_series(as_frame(candles)[-period-1:], period)[-1]
 
 def calculate_adx(candles, period=14):
     """
     Calculate Average Directional Index.
     Args:
-        candles: List of dicts with 'high', 'low', 'close' keys
+        candles: CandleFrame or list of dicts with 'high', 'low', 'close' keys
         period: Lookback period for ADX (default 14)
     Returns:
         Float: ADX value (0-100)
     """
     if len(candles) < period + 1:
         return 0
-    highs = np.array([c["high"] for c in candles[-period-1:]])
-    lows = np.array([c["low"] for c in candles[-period-1:]])
-    dm_plus = np.zeros(period)
-    dm_minus = np.zeros(period)
-    tr = np.zeros(period)
-    
-    for i in range(period):
-        up_move = highs[i+1] - highs[i]
-        down_move = lows[i] - lows[i+1]
-        dm_plus[i] = up_move if up_move > down_move and up_move > 0 else 0
-        dm_minus[i] = down_move if down_move > up_move and down_move > 0 else 0
-        tr[i] = max(highs[i+1] - lows[i+1], 
-                    abs(highs[i+1] - candles[i]["close"]), 
-                    abs(lows[i+1] - candles[i]["close"]))
-    
-    atr = np.mean(tr)
-    if atr == 0:
-        return 0
-    di_plus = 100 * np.mean(dm_plus) / atr
-    di_minus = 100 * np.mean(dm_minus) / atr
-    dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus) if (di_plus + di_minus) != 0 else 0
-    return dx
\ No newline at end of file
+    return adx_series(as_frame(candles)[-period-1:], period)[-1]
@@ -0,0 +1,86 @@
+# latency.py
+import os
+import json
+import time
+from collections import deque
+import numpy as np
+
+class _Timer:
+    __slots__ = ("tracker", "stage", "asset", "started")
+
+    def __init__(self, tracker, stage, asset):
+        self.tracker = tracker
+        self.stage = stage
+        self.asset = asset
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracker.record(self.stage, time.perf_counter() - self.started, self.asset)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = _NullTimer()
+
+class LatencyTracker:
+    """
+    Rolling latency samples per stage, and per asset where a stage handles
+    one asset at a time. Disabled by default: stage() then returns a shared
+    no-op context manager and record() returns immediately.
+    """
+
+    def __init__(self, enabled=False, window=1000):
+        self.enabled = enabled
+        self.window = window
+        self.samples = {}  # (stage, asset or None) -> deque of seconds
+
+    def stage(self, name, asset=None):
+        """Context manager timing one run of a stage."""
+        return _Timer(self, name, asset) if self.enabled else NULL_TIMER
+
+    def record(self, stage, seconds, asset=None):
+        if not self.enabled:
+            return
+        samples = self.samples.get((stage, asset))
+        if samples is None:
+            samples = self.samples[(stage, asset)] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentiles(self, stage, asset=None):
+        """
+        Returns:
+            Dict with p50, p95, p99 and max in milliseconds and the sample count, or None without samples
+        """
+        samples = self.samples.get((stage, asset))
+        if not samples:
+            return None
+        values = np.fromiter(samples, dtype=np.float64, count=len(samples)) * 1000
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(values.max()), "count": len(values)}
+
+    def summary(self):
+        """Percentiles of every tracked stage, keyed "stage" or "stage@asset", in first-seen order."""
+        return {stage if asset is None else f"{stage}@{asset}": self.percentiles(stage, asset) for stage, asset in list(self.samples)}
+
+    def export(self, path):
+        """Write summary() with a timestamp as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"exported": time.time(), "window": self.window, "stages": self.summary()}, f, indent=2)
+
+    def reset(self):
+        self.samples.clear()
+
+latency = LatencyTracker()
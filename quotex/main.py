@@ -2,23 +2,74 @@ import sys
 import time
 import asyncio
 import itertools
+from collections import deque
+from functools import partial
 from quotexapi.stable_api import Quotex
 from rich.console import Console
 from rich.live import Live
-from rich.panel import Panel
-from rich.text import Text
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn
 from rich.table import Table
-from indicators import calculate_ema, calculate_rsi, calculate_macd, calculate_bollinger_bands, calculate_atr, calculate_adx
-from patterns import detect_patterns
-from candle_psychology import analyze_candle_psychology
-from smc import analyze_smc
-from ict import analyze_ict
-from price_action import analyze_price_action  # New addition
+from candle_store import CandleStore
+from candle_feed import CandleFeed, QuotexSource
+from asset_discovery import discover_assets
+from asset_cache import AssetCache
+from dashboard import DashboardState, Dashboard, render
+from event_log import EventLog
+from latency import latency
+from analysis_executor import AnalysisExecutor
+from scheduler import CandleClock
+from gap_index import GapIndex
+from session_log import RecordingClient
+from sessions import Session
+from scoring import load_scorer
 
 console = Console()
 trade_count = 0
-log = []
+log = deque(maxlen=200)  # Recent messages for the UI; full history goes to events
+
+MAX_ASSETS = 3  # Highest-payout open assets traded per session
+DISCOVERY_CONCURRENCY = 8
+DISCOVERY_TIMEOUT = 5.0  # Seconds per asset request
+ASSET_TTL = 60.0  # Seconds before an asset's open status and payout are re-checked
+BALANCE_RECONCILE_INTERVAL = 60.0  # Seconds between balance checks against the API
+ANALYSIS_BACKEND = "thread"  # inline, thread or process
+EVENT_LOG = "logs/events.jsonl"
+LATENCY_TRACKING = False  # Per-stage timers, shown in the dashboard and exported on exit
+LATENCY_EXPORT = "logs/latency.json"
+CANDLE_PERIOD = 60  # Seconds per candle; signals are evaluated once per close
+PRECOMPUTE_LEAD = 0.5  # Seconds before the close to run analysis and prepare the order
+ENTRY_DELAY = 0.05  # Seconds after the next candle opens to send the order
+ORDER_DURATION = 60  # Option expiry in seconds
+SIGNAL_THRESHOLD = 90  # Minimum confidence to trade
+MAX_POSITIONS = 3  # Options open at the same time, one per asset
+MARTINGALE_STEPS = 3  # Trades per martingale sequence before the stake resets
+ERROR_BACKOFF = 5.0  # Seconds to wait after a failed scan before the next one
+SESSION_RECORDING = False  # Log all client traffic for replay with session_log.py
+SESSION_LOG = "logs/session-%Y%m%d-%H%M%S.qxs"  # strftime pattern
+
+latency.enabled = LATENCY_TRACKING
+
+class Runtime:
+    """
+    Collaborators shared by every part of a trading run. Built when a run
+    starts, not on import; the simulator, replay and benchmark pass their own.
+    """
+
+    def __init__(self, store=None, events=None, analysis=None, clock=None, scorer=None):
+        """
+        Args:
+            store: CandleStore (default: the local candle directory)
+            events: EventLog (default: EVENT_LOG)
+            analysis: AnalysisExecutor (default: ANALYSIS_BACKEND)
+            clock: scheduler.CandleClock (default: wall clock; simulator runs pass an accelerated one)
+            scorer: scoring.Scorer (default: built-in rules plus scoring.json overrides, if present)
+        """
+        self.store = CandleStore() if store is None else store
+        self.events = EventLog(EVENT_LOG) if events is None else events
+        self.analysis = AnalysisExecutor(ANALYSIS_BACKEND) if analysis is None else analysis
+        self.clock = CandleClock(CANDLE_PERIOD) if clock is None else clock
+        self.scorer = load_scorer() if scorer is None else scorer
+        self.gaps = None  # Unfilled gaps of the feed's assets, set by start_feed
 
 def get_user_input():
     email = console.input("[bold neon_green]Enter Quotex Email: [/]")
@@ -29,421 +80,323 @@ def get_user_input():
     stop_profit = float(console.input("[bold neon_green]Enter Stop Profit ($): [/]"))
     return email, password, base_bet, martingale, stop_loss, stop_profit
 
-def update_ui(status, assets_data, selected_asset, log_entry, spinner="", balance=0):
-    table = Table.grid(expand=True)
-    table.add_column(style="bold white on #0a0a23")
-    table.add_column(style="bold white on #0a0a23")
-
-    header = Text("✨ Quantum SMC/ICT Trading Matrix ✨", style="bold neon_green gradient(#00ffff #ff00ff)", justify="center")
-    table.add_row("", header)
-
-    status_color = {"Idle": "neon_green", "Trading": "electric_blue", "Scanning": "yellow", "Waiting": "cyan", "Analyzed": "magenta", "Stopped": "hot_pink", "Failed": "red"}.get(status, "white")
-    status_display = f"[bold {status_color} underline]{status.upper()}[/]"
-    table.add_row(Panel(f"⚡ Status: {status_display}", border_style=f"bold {status_color}", box=rich.box.MINIMAL, padding=(0, 1)))
-
-    asset_signals = ""
-    for asset, data in assets_data.items():
-        confidence = data["confidence"]
-        signal_bar = "█" * int(confidence / 5) + " " * (20 - int(confidence / 5))
-        signal_color = "neon_green" if confidence >= 90 else "electric_blue" if confidence >= 70 else "hot_pink"
-        asset_signals += f"[bold magenta]{asset}[/]: [{signal_color}]{signal_bar}[/] {confidence:.1f}%\n"
-    signal_panel = Panel(Text(f"📡 Signals:\n{asset_signals.strip()}", style="white on #0a0a23"), border_style="bold neon_green", box=rich.box.MINIMAL, padding=(0, 1))
-    table.add_row(signal_panel)
-
-    asset_panel = Panel(Text(f"🎯 Selected: [bold magenta]{selected_asset or 'None'}[/]", style="white on #0a0a23"), border_style="bold magenta", box=rich.box.MINIMAL, padding=(0, 1))
-    balance_panel = Panel(Text(f"💸 Balance: [bold cyan]${balance:.2f}[/]", style="white on #0a0a23"), border_style="bold cyan", box=rich.box.MINIMAL, padding=(0, 1))
-    table.add_row(asset_panel, balance_panel)
-
-    selected_data = assets_data.get(selected_asset, {"direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"})
-    analysis = f"{selected_data['direction']} | {selected_data['pattern']} | {selected_data['kill_zone']} | {selected_data['pot']}"
-    analysis_panel = Panel(Text(f"🔮 Analysis: [yellow]{analysis}[/]", style="white on #0a0a23"), border_style="bold yellow", box=rich.box.MINIMAL, padding=(0, 1))
-    log_panel = Panel(Text(f"🔔 Log: {log_entry} {spinner}", style="white on #0a0a23"), border_style="bold electric_blue", box=rich.box.MINIMAL, padding=(0, 1))
-    table.add_row(analysis_panel, log_panel)
-
-    return Panel(table, border_style="bold neon_green gradient(#ff00ff #00ffff #ffff00)", box=rich.box.DOUBLE, padding=(1, 2), title="[bold electric_blue blinking]Quantum Matrix[/]", title_align="left", subtitle="[bold magenta]v1.0[/]", subtitle_align="right", style="on #0a0a23", width=90)
+def asset_table(ranked, selected):
+    table = Table(title="Open Assets by Payout")
+    table.add_column("#", justify="right")
+    table.add_column("Asset", style="magenta")
+    table.add_column("Payout", style="cyan", justify="right")
+    for rank, (asset, payout) in enumerate(ranked.items(), 1):
+        table.add_row(str(rank), f"{asset} *" if asset in selected else asset, f"{payout}%")
+    return table
 
-async def login_and_fetch_assets(client, live):
+async def login_and_fetch_assets(runtime, client, ui, cache=None, max_assets=MAX_ASSETS):
     try:
         check_connect = await client.test_connection()
         if not check_connect:
             log.append("Connection failed")
-            live.update(update_ui("Failed", {}, None, log[-1]))
+            ui.set("Failed", {}, None, log[-1])
             return None
         
         log.append("Logged in successfully!")
         
         with Progress(SpinnerColumn(), "[progress.description]{task.description}", BarColumn(), "[progress.percentage]{task.percentage:>3.0f}%", console=console) as progress:
-            all_assets = await client.get_all_assets()
-            task = progress.add_task("[cyan]Fetching Quantum Signals...", total=len(all_assets))
-            open_assets = {}
-            for i, asset_code in enumerate(all_assets):
-                asset_info = await client.get_asset(asset_code)
-                if asset_info and asset_info.get("is_open", False):
-                    payout = await client.get_payout_by_asset(asset_code)
-                    if payout and "turbo" in payout:
-                        open_assets[asset_code] = payout["turbo"]["profit"]
-                progress.update(task, advance=1)
-                log.append(f"Scanning assets ({i+1}/{len(all_assets)})")
-                live.update(update_ui("Fetching", {}, None, log[-1]))
-                await asyncio.sleep(0.05)
-            
-            top_assets = dict(sorted(open_assets.items(), key=lambda x: x[1], reverse=True)[:3])
-            log.append(f"Top Assets Loaded: {', '.join(f'{k} ({v}%)' for k, v in top_assets.items())}")
-            live.update(update_ui("Idle", {k: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for k in top_assets}, None, log[-1]))
+            task = progress.add_task("[cyan]Fetching Quantum Signals...", total=None)
+
+            def on_progress(done, total, failed):
+                progress.update(task, completed=done, total=total)
+                if done == total or done % 10 == 0:
+                    log.append(f"Scanning assets ({done}/{total}, {failed} failed)")
+                    ui.set("Fetching", {}, None, log[-1])
+
+            ranked, failed = await discover_assets(client, DISCOVERY_CONCURRENCY, DISCOVERY_TIMEOUT, on_progress)
+            if cache is not None:
+                cache.seed(ranked)
+            top_assets = dict(itertools.islice(ranked.items(), max_assets))
+            console.print(asset_table(ranked, top_assets))
+            timeouts = sum(reason == "timeout" for reason in failed.values())
+            problems = [f"{count} {label}" for count, label in ((timeouts, "timed out"), (len(failed) - timeouts, "failed")) if count]
+            log.append(f"Top Assets Loaded: {', '.join(f'{k} ({v}%)' for k, v in top_assets.items())}" + (f" (assets {', '.join(problems)})" if problems else ""))
+            ui.set("Idle", {k: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for k in top_assets}, None, log[-1])
         return top_assets
     except Exception as e:
         log.append(f"Asset fetch error: {str(e)}")
-        live.update(update_ui("Failed", {}, None, log[-1]))
+        runtime.events.emit("error", stage="discovery", message=str(e))
+        ui.set("Failed", {}, None, log[-1])
         return None
 
-async def analyze_assets(client, assets, live):
-    tasks = [analyze_single_asset(client, asset, live) for asset in assets]
-    results = await asyncio.gather(*tasks)
-    return dict(zip(assets.keys(), results))
+async def fetch_candles(runtime, client, asset, count=120):
+    # Request only what the local store is missing, then read the window back from it
+    store = runtime.store
+    fetch = store.fetch_count(asset, 60, runtime.clock.now(), count)
+    with latency.stage("fetch", asset):
+        candles = await client.get_candle(asset, 60, fetch)
+    if candles:
+        store.append(asset, 60, candles)
+    return store.tail(asset, 60, count, contiguous=True)
 
-async def analyze_single_asset(client, asset, live):
+async def start_feed(runtime, client, assets):
+    # Subscribe once per asset; without a realtime channel analysis falls back to polling fetch_candles
+    feed = CandleFeed(QuotexSource(client), store=runtime.store)
+    runtime.gaps = GapIndex(store=runtime.store, feed=feed, period=CANDLE_PERIOD)
+    feed.add_listener(runtime.gaps.on_candle)
     try:
-        candles = await client.get_candle(asset, 60, 120)
-        if not candles or len(candles) < 50:
-            return {"direction": None, "confidence": 0, "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"}
-        
-        ema_short = calculate_ema(candles, 10)
-        ema_long = calculate_ema(candles, 50)
-        rsi = calculate_rsi(candles)
-        macd_line, signal_line, histogram = calculate_macd(candles)
-        upper_bb, sma_bb, lower_bb, bandwidth = calculate_bollinger_bands(candles)
-        atr = calculate_atr(candles)
-        adx = calculate_adx(candles)
-        latest_close = candles[-1]["close"]
-        current_time = candles[-1]["time"]
-        
-        psych = analyze_candle_psychology(candles)
-        smc = analyze_smc(candles)
-        ict = analyze_ict(candles, current_time)
-        price_action = analyze_price_action(candles)  # Enhanced price action
-        psych_pattern, psych_confidence = detect_patterns(candles)
-        
-        confidence = 0
-        direction = None
-        
-        # Technical Indicators
-        if latest_close > ema_short > ema_long:
-            confidence += 10
-            direction = "call"
-        elif latest_close < ema_short < ema_long:
-            confidence += 10
-            direction = "put"
-        
-        if rsi < 30 and direction == "call":
-            confidence += 8
-        elif rsi > 70 and direction == "put":
-            confidence += 8
-        
-        if macd_line > signal_line and histogram > 0 and direction == "call":
-            confidence += 10
-        elif macd_line < signal_line and histogram < 0 and direction == "put":
-            confidence += 10
-        
-        if latest_close < upper_bb and direction == "call" and bandwidth > 0.015:
-            confidence += 8
-        elif latest_close > lower_bb and direction == "put" and bandwidth > 0.015:
-            confidence += 8
-        
-        if adx > 25:
-            confidence += 8
-        
-        if atr > sma_bb * 0.005:
-            confidence += 8
-        
-        # Candle Psychology
-        if psych["trend_persistence"] > 50 and direction == "call":
-            confidence += min(15, psych["trend_persistence"] * 0.3)
-        elif psych["trend_persistence"] < -50 and direction == "put":
-            confidence += min(15, abs(psych["trend_persistence"]) * 0.3)
-        
-        if psych["reversal_strength"] > 70:
-            if direction == "call" and psych["sentiment"] == "bullish":
-                confidence += min(10, psych["reversal_strength"] * 0.15)
-            elif direction == "put" and psych["sentiment"] == "bearish":
-                confidence += min(10, psych["reversal_strength"] * 0.15)
-        
-        if psych["volatility_clustering"] > 60:
-            confidence += min(8, psych["volatility_clustering"] * 0.15)
-        
-        if psych["exhaustion_signal"] > 80:
-            if direction == "call" and psych["sentiment"] == "bullish":
-                confidence += min(10, psych["exhaustion_signal"] * 0.15)
-            elif direction == "put" and psych["sentiment"] == "bearish":
-                confidence += min(10, psych["exhaustion_signal"] * 0.15)
-        
-        if psych["fractal_momentum"] > 1.5 and direction == "call":
-            confidence += min(8, psych["fractal_momentum"] * 3)
-        elif psych["fractal_momentum"] < -1.5 and direction == "put":
-            confidence += min(8, abs(psych["fractal_momentum"]) * 3)
-        
-        if psych["mtf_correlation"] > 70 and direction == "call":
-            confidence += min(10, psych["mtf_correlation"] * 0.15)
-        elif psych["mtf_correlation"] < -70 and direction == "put":
-            confidence += min(10, abs(psych["mtf_correlation"]) * 0.15)
-        
-        if psych["psychological_pressure"] > 60:
-            confidence += min(8, psych["psychological_pressure"] * 0.15)
-        
-        if psych["candle_entropy"] > 70:
-            confidence += 8
-        
-        # SMC
-        ob = smc["order_block"]
-        if ob["level"] and ob["type"] == "bullish" and direction == "call" and abs(latest_close - ob["level"]) < atr:
-            confidence += min(15, ob["confidence"] * 0.2)
-        elif ob["level"] and ob["type"] == "bearish" and direction == "put" and abs(latest_close - ob["level"]) < atr:
-            confidence += min(15, ob["confidence"] * 0.2)
-        
-        liq = smc["liquidity_grab"]
-        if liq["direction"] == "bullish" and direction == "call":
-            confidence += min(10, liq["confidence"] * 0.15)
-        elif liq["direction"] == "bearish" and direction == "put":
-            confidence += min(10, liq["confidence"] * 0.15)
-        
-        imb = smc["imbalance"]
-        if imb["direction"] == "bullish" and direction == "call" and latest_close < imb["level"]:
-            confidence += min(10, imb["confidence"] * 0.15)
-        elif imb["direction"] == "bearish" and direction == "put" and latest_close > imb["level"]:
-            confidence += min(10, imb["confidence"] * 0.15)
-        
-        # ICT
-        fvg = ict["fair_value_gap"]
-        if fvg["detected"] and direction == "call" and latest_close < fvg["level"]:
-            confidence += min(15, fvg["probability"] * 0.2)
-        elif fvg["detected"] and direction == "put" and latest_close > fvg["level"]:
-            confidence += min(15, fvg["probability"] * 0.2)
-        
-        kz = ict["kill_zone"]
-        if kz["active"] and direction:
-            confidence += min(10, kz["confidence"] * 0.15)
-        
-        pot = ict["power_of_three"]
-        if pot["pattern"] == "Bullish Power of Three" and direction == "call":
-            confidence += min(10, pot["confidence"] * 0.15)
-        elif pot["pattern"] == "Bearish Power of Three" and direction == "put":
-            confidence += min(10, pot["confidence"] * 0.15)
-        
-        # Patterns
-        if "bullish" in psych_pattern.lower() or "hammer" in psych_pattern.lower() or "morning" in psych_pattern.lower():
-            if direction == "call":
-                confidence += min(15, psych_confidence * 0.2)
-        elif "bearish" in psych_pattern.lower() or "shooting" in psych_pattern.lower() or "evening" in psych_pattern.lower():
-            if direction == "put":
-                confidence += min(15, psych_confidence * 0.2)
-
-        # Price Action
-        supply = price_action["supply_zone"]
-        demand = price_action["demand_zone"]
-        if direction == "call" and latest_close > demand["level"] and abs(latest_close - demand["level"]) < atr:
-            confidence += min(15, demand["strength"] * 0.2)
-        elif direction == "put" and latest_close < supply["level"] and abs(latest_close - supply["level"]) < atr:
-            confidence += min(15, supply["strength"] * 0.2)
-        
-        if price_action["breakout_power"] > 50 and direction == "call":
-            confidence += min(15, price_action["breakout_power"] * 0.2)
-        elif price_action["breakout_power"] > 50 and direction == "put":
-            confidence += min(15, price_action["breakout_power"] * 0.2)
-        
-        trend = price_action["trendline_dynamics"]
-        if trend["slope"] > 0 and trend["strength"] > 70 and direction == "call":
-            confidence += min(10, trend["strength"] * 0.15)
-        elif trend["slope"] < 0 and trend["strength"] > 70 and direction == "put":
-            confidence += min(10, trend["strength"] * 0.15)
-        
-        liq_sweep = price_action["liquidity_sweep"]
-        if liq_sweep["type"] == "bullish" and direction == "call" and abs(latest_close - liq_sweep["level"]) < atr:
-            confidence += min(15, liq_sweep["confidence"] * 0.2)
-        elif liq_sweep["type"] == "bearish" and direction == "put" and abs(latest_close - liq_sweep["level"]) < atr:
-            confidence += min(15, liq_sweep["confidence"] * 0.2)
-        
-        if price_action["price_rejection_intensity"] > 70:
-            if direction == "call" and latest_close > price_action["volatility_adjusted_pivot"]:
-                confidence += min(10, price_action["price_rejection_intensity"] * 0.15)
-            elif direction == "put" and latest_close < price_action["volatility_adjusted_pivot"]:
-                confidence += min(10, price_action["price_rejection_intensity"] * 0.15)
-        
-        if price_action["consolidation_breakout_potential"] > 80 and direction:
-            confidence += min(10, price_action["consolidation_breakout_potential"] * 0.15)
-        
-        if price_action["impulse_wave_strength"] > 5 and direction == "call":
-            confidence += min(10, price_action["impulse_wave_strength"] * 2)
-        elif price_action["impulse_wave_strength"] > 5 and direction == "put":
-            confidence += min(10, price_action["impulse_wave_strength"] * 2)
-        
-        if price_action["fibonacci_confluence"] > 80 and direction:
-            confidence += 10
-        
-        if price_action["momentum_divergence"] > 50:
-            if direction == "call" and latest_close > price_action["volatility_adjusted_pivot"]:
-                confidence -= 10  # Reduce confidence for bullish divergence
-            elif direction == "put" and latest_close < price_action["volatility_adjusted_pivot"]:
-                confidence -= 10  # Reduce confidence for bearish divergence
-
-        confidence = min(100, confidence)
-        return {
-            "direction": direction,
-            "confidence": confidence,
-            "pattern": psych_pattern,
-            "kill_zone": kz["type"] if kz["active"] else "No Kill Zone",
-            "pot": pot["pattern"] if pot["pattern"] else "No POT"
-        }
+        for asset in assets:
+            await feed.subscribe(asset)
+    except Exception as e:
+        log.append(f"Realtime feed unavailable, polling candles: {str(e)}")
+        return None, None
+    return feed, asyncio.create_task(feed.run())
+
+async def follow_assets(assets, cache, feed=None, count=MAX_ASSETS):
+    # Swap closed or lower-paying assets for the best open ones in the cache
+    if cache is None:
+        return assets
+    ranked = cache.ranked(count)
+    if not ranked or ranked.keys() == assets.keys():
+        return assets
+    if feed is not None:
+        for asset in ranked:
+            try:
+                await feed.subscribe(asset)
+            except Exception as e:
+                log.append(f"Feed subscribe error for {asset}: {str(e)}")
+    return ranked
+
+async def current_balance(client, tracker=None):
+    # In-memory when tracked, otherwise one API round-trip
+    return tracker.balance if tracker is not None else await client.get_balance()
+
+def on_asset_change(asset, old, new):
+    if old is None:
+        log.append(f"Asset available: {asset} ({new['payout']}%)")
+    elif old["is_open"] and not new["is_open"]:
+        log.append(f"Asset closed: {asset}")
+    elif new["is_open"] and not old["is_open"]:
+        log.append(f"Asset reopened: {asset} ({new['payout']}%)")
+    else:
+        log.append(f"Payout changed: {asset} {old['payout']}% -> {new['payout']}%")
+
+async def analyze_assets(runtime, client, assets, ui, batched=True, feed=None):
+    events = runtime.events
+    if feed is not None:
+        try:
+            frames = {asset: feed.frame(asset) for asset in assets}
+            gaps = None
+            if runtime.gaps is not None:
+                gaps = runtime.gaps.levels({asset: frame.close[-1] for asset, frame in frames.items() if frame is not None and len(frame)})
+            return await runtime.analysis.analyze(frames, runtime.scorer, gaps)
+        except Exception as e:
+            log.append(f"Batch analysis error: {str(e)}")
+            events.emit("error", stage="analysis", message=str(e))
+            return {asset: {"direction": None, "confidence": 0, "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for asset in assets}
+
+    if not batched:
+        tasks = [analyze_single_asset(runtime, client, asset, ui) for asset in assets]
+        results = await asyncio.gather(*tasks)
+        return dict(zip(assets.keys(), results))
+
+    # Fetch concurrently, then score every asset in one vectorized pass
+    fetched = await asyncio.gather(*(fetch_candles(runtime, client, asset) for asset in assets), return_exceptions=True)
+    candles_by_asset = {}
+    for asset, candles in zip(assets, fetched):
+        if isinstance(candles, Exception):
+            log.append(f"Analysis error for {asset}: {str(candles)}")
+            events.emit("error", stage="analysis", asset=asset, message=str(candles))
+            candles = None
+        candles_by_asset[asset] = candles
+    try:
+        return await runtime.analysis.analyze(candles_by_asset, runtime.scorer)
+    except Exception as e:
+        log.append(f"Batch analysis error: {str(e)}")
+        events.emit("error", stage="analysis", message=str(e))
+        ui.set("Idle", {asset: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for asset in assets}, None, log[-1])
+        return {asset: {"direction": None, "confidence": 0, "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for asset in assets}
+
+async def analyze_single_asset(runtime, client, asset, ui):
+    try:
+        candles = await fetch_candles(runtime, client, asset)  # CandleFrame shared by every analyzer
+        return (await runtime.analysis.analyze({asset: candles}, runtime.scorer))[asset]
     except Exception as e:
         log.append(f"Analysis error for {asset}: {str(e)}")
-        live.update(update_ui("Idle", {asset: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"}}, None, log[-1]))
+        runtime.events.emit("error", stage="analysis", asset=asset, message=str(e))
+        ui.set("Idle", {asset: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"}}, None, log[-1])
         return {"direction": None, "confidence": 0, "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"}
 
-async def place_trade_with_martingale(client, assets, live, base_bet, martingale, stop_loss, stop_profit):
+async def submit_order(clock, client, amount, asset, direction, fire_at=None):
+    # The order is fully prepared before this call; with fire_at it is held until then
+    if fire_at is not None:
+        await clock.wait_until(fire_at)
+        latency.record("fire_to_order", clock.now() - fire_at, asset)
+    # buy_and_check_win returns only once the option has settled; PositionManager awaits it in its own task
+    with latency.stage("order_settlement", asset):
+        return await client.buy_and_check_win(amount, asset, direction, ORDER_DURATION)
+
+def on_settlement(events, ui, sessions, session, position, status, result):
     global trade_count
-    amount = base_bet
-    attempt = 1
-    total_profit = 0
-    cycle_start = time.time()
-    trade_executed = False
+    positions = session.positions
+    balance = sum(other.tracker.balance for other in sessions)
+    if not status:
+        log.append(f"{session.prefix}Trade failed on {position.asset}: {result}")
+        events.emit("error", stage="order", asset=position.asset, message=str(result), **session.tags)
+        ui.set("Trading" if positions.open else "Idle", ui.assets_data, position.asset, log[-1], balance=balance)
+        return
+
+    win = result.get("win", False)
+    profit = result.get("profit", 0)
+    trade_count += 1
+    events.emit("settlement", asset=position.asset, direction=position.direction, amount=position.amount, win=win, profit=profit, balance=balance, **session.tags)
+    if win:
+        log.append(f"{session.prefix}🎉 WIN! {position.asset} Profit: ${profit:.2f}")
+    elif positions.step:
+        log.append(f"{session.prefix}❌ LOSS! {position.asset} Loss: ${profit:.2f}, quantum escalation: Next @ ${positions.amount:.2f}")
+    else:
+        log.append(f"{session.prefix}❌ LOSS! {position.asset} Loss: ${profit:.2f}" + (", max quantum attempts reached" if profit < 0 else ""))
+
+    if positions.stopped == "loss":
+        log.append(f"{session.prefix}Quantum Loss limit hit: ${-positions.profit:.2f}")
+    elif positions.stopped == "profit":
+        log.append(f"{session.prefix}Quantum Profit achieved: ${positions.profit:.2f}")
+    status = "Stopped" if positions.stopped else "Trading" if positions.open else "Idle"
+    ui.set(status, ui.assets_data, position.asset, log[-1], balance=balance)
+
+async def place_trade_with_martingale(runtime, client, assets, ui, sessions, feed=None, cache=None):
+    # One 180 s cycle: scan at every candle close and, for each session with free slots, open positions on signals
+    # at or above its threshold. `client` supplies market data; orders go through each session's own client and
+    # settle in the background. Returns the assets followed at the end of the cycle.
+    clock = runtime.clock
+    events = runtime.events
+    cycle_start = clock.now()
+    spinner = itertools.cycle(['🌌', '🌠', '💫', '✨'])
     assets_data = {asset: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for asset in assets}
-    
-    while time.time() - cycle_start < 180:
+    balance = None
+
+    while clock.now() - cycle_start < 180 and any(not session.stopped for session in sessions):
         try:
-            balance = await client.get_balance()
-            assets_data = await analyze_assets(client, assets, live)
-            
-            best_asset = max(assets_data.items(), key=lambda x: x[1]["confidence"] if x[1]["direction"] else 0, default=(None, {"confidence": 0}))
-            best_confidence = best_asset[1]["confidence"]
-            best_direction = best_asset[1]["direction"]
-            selected_asset = best_asset[0]
-            
-            if best_direction and best_confidence >= 90:
-                log.append(f"Executing {best_direction.upper()} trade on {selected_asset} @ ${amount:.2f} (Conf: {best_confidence:.1f}%)")
-                live.update(update_ui("Trading", assets_data, selected_asset, log[-1], balance=balance))
-                status, result = await client.buy_and_check_win(amount, selected_asset, best_direction, 60)
-                trade_executed = True
-            elif not trade_executed and time.time() - cycle_start > 150 and best_direction and best_confidence >= 90:
-                log.append(f"Fallback Trade {best_direction.upper()} on {selected_asset} @ ${amount:.2f} (Conf: {best_confidence:.1f}%)")
-                live.update(update_ui("Trading", assets_data, selected_asset, log[-1], balance=balance))
-                status, result = await client.buy_and_check_win(amount, selected_asset, best_direction, 60)
-                trade_executed = True
-            else:
-                spinner = itertools.cycle(['🌌', '🌠', '💫', '✨'])
-                remaining = int(180 - (time.time() - cycle_start))
-                log.append(f"Scanning quantum signals ({remaining}s)")
-                live.update(update_ui("Scanning", assets_data, None, log[-1], next(spinner), balance=balance))
-                await asyncio.sleep(1)
-                continue
-            
-            if not status:
-                log.append(f"Trade failed: {result}")
-                live.update(update_ui("Idle", assets_data, selected_asset, log[-1], balance=balance))
-                return False
-            
-            spinner = itertools.cycle(['⚡', '🔋', '🌩️', '💥'])
-            for i in range(60):
-                log[-1] = f"Trade executing ({60-i}s)"
-                live.update(update_ui("Waiting", assets_data, selected_asset, log[-1], next(spinner), balance=balance))
-                await asyncio.sleep(1)
-            
-            win = result.get("win", False)
-            profit = result.get("profit", 0)
-            total_profit += profit
-            balance = await client.get_balance()
-            
-            if win:
-                log.append(f"🎉 WIN! Profit: ${profit:.2f}")
-                trade_count += 1
-                live.update(update_ui("Idle", assets_data, selected_asset, log[-1], balance=balance))
-                if total_profit >= stop_profit:
-                    log.append(f"Quantum Profit achieved: ${total_profit:.2f}")
-                    live.update(update_ui("Stopped", assets_data, selected_asset, log[-1], balance=balance))
-                    return True
-                return True
-            else:
-                log.append(f"❌ LOSS! Loss: ${profit:.2f}")
-                amount *= martingale
-                trade_count += 1
-                attempt += 1
-                if -total_profit >= stop_loss:
-                    log.append(f"Quantum Loss limit hit: ${-total_profit:.2f}")
-                    live.update(update_ui("Stopped", assets_data, selected_asset, log[-1], balance=balance))
-                    return False
-                if attempt > 3:
-                    log.append("Max quantum attempts reached.")
-                else:
-                    log.append(f"Quantum escalation: Next @ ${amount:.2f}")
-                live.update(update_ui("Idle", assets_data, selected_asset, log[-1], balance=balance))
-                return False
+            balance = sum([await current_balance(session.client, session.tracker) for session in sessions])
+            assets = await follow_assets(assets, cache, feed, len(assets))
+            # Analyze just before the candle closes, enter just after the next one opens
+            close_at = clock.next_wake(-PRECOMPUTE_LEAD) + PRECOMPUTE_LEAD
+            await clock.wait_until(close_at - PRECOMPUTE_LEAD)
+            scan_started = time.perf_counter()
+            assets_data = await analyze_assets(runtime, client, assets, ui, feed=feed)
+            tradable = [(asset, data) for asset, data in assets_data.items() if data["direction"] and (cache is None or cache.is_open(asset))]
+            tradable.sort(key=lambda x: x[1]["confidence"], reverse=True)
+
+            opened = 0
+            for session in sessions:
+                positions = session.positions
+                signals = [(asset, data) for asset, data in tradable if data["confidence"] >= session.threshold and not positions.holding(asset)][:positions.free]
+                for selected_asset, data in signals:
+                    amount = positions.amount
+                    direction = data["direction"]
+                    log.append(f"{session.prefix}Executing {direction.upper()} trade on {selected_asset} @ ${amount:.2f} (Conf: {data['confidence']:.1f}%)")
+                    ui.set("Trading", assets_data, selected_asset, log[-1], balance=balance)
+                    events.emit("signal", asset=selected_asset, **data, **session.tags)
+                    events.emit("order", asset=selected_asset, direction=direction, amount=amount, attempt=positions.step + 1, entry_at=close_at + ENTRY_DELAY, **session.tags)
+                    positions.submit(selected_asset, direction, submit_order(clock, session.client, amount, selected_asset, direction, close_at + ENTRY_DELAY),
+                                     expires_at=close_at + ENTRY_DELAY + ORDER_DURATION, confidence=data["confidence"])
+                    # Up to the hand-off; the deliberate hold until the entry time is not part of it
+                    latency.record("signal_to_scheduled", time.perf_counter() - scan_started, selected_asset)
+                opened += len(signals)
+
+            if not opened:
+                best_asset, best = max(assets_data.items(), key=lambda x: x[1]["confidence"] if x[1]["direction"] else 0, default=(None, {"confidence": 0, "direction": None}))
+                remaining = int(180 - (clock.now() - cycle_start))
+                open_count = sum(len(session.positions.open) for session in sessions)
+                log.append(f"Scanning quantum signals ({remaining}s, {open_count} open)")
+                events.emit("scan", best=best_asset, direction=best["direction"], confidence=best["confidence"], open=open_count)
+                if latency.enabled:
+                    ui.set_latency(latency.summary())
+                ui.set("Trading" if open_count else "Scanning", assets_data, None, log[-1], next(spinner), balance=balance)
         except Exception as e:
             log.append(f"Trade error: {str(e)}")
-            live.update(update_ui("Idle", assets_data, selected_asset, log[-1], balance=balance))
-            return False
-    
-    if not trade_executed:
+            events.emit("error", stage="trade", message=str(e))
+            ui.set("Idle", assets_data, None, log[-1], balance=balance)
+            await clock.sleep(ERROR_BACKOFF)
+    return assets
+
+async def smart_martingale_trade(client=None, settings=None, max_assets=MAX_ASSETS, runtime=None):
+    """
+    Run the trading session.
+    Args:
+        client: Quotex client or a stand-in such as simulator.SimulatedQuotex (default: prompt for credentials)
+        settings: Tuple (base_bet, martingale, stop_loss, stop_profit), required with `client`
+        max_assets: Assets traded at once
+        runtime: Runtime to use (default: a new one)
+    """
+    if client is None:
+        email, password, base_bet, martingale, stop_loss, stop_profit = get_user_input()
+        client = Quotex(email=email, password=password, lang="pt")
+    else:
+        base_bet, martingale, stop_loss, stop_profit = settings
+    runtime = Runtime() if runtime is None else runtime
+    recording = None
+    if SESSION_RECORDING:
+        recording = client = RecordingClient(client, time.strftime(SESSION_LOG), runtime.store, runtime.clock.now,
+                                             {"settings": [base_bet, martingale, stop_loss, stop_profit], "max_assets": max_assets})
+    session = Session(client, base_bet, martingale, stop_loss, stop_profit, max_positions=MAX_POSITIONS, martingale_steps=MARTINGALE_STEPS,
+                      threshold=SIGNAL_THRESHOLD, reconcile_interval=BALANCE_RECONCILE_INTERVAL, clock=runtime.clock.now)
+    try:
+        await trade_sessions([session], max_assets, runtime)
+    finally:
+        if recording is not None:
+            recording.close()
+
+async def trade_sessions(sessions, max_assets=MAX_ASSETS, runtime=None):
+    """
+    Trade several sessions in one event loop. Discovery, the asset cache, the
+    candle feed and analysis run once on the first session's client; each
+    session's signals, orders, stops and balance are its own.
+    Args:
+        sessions: List of sessions.Session
+        max_assets: Assets followed and analyzed
+        runtime: Runtime to use (default: a new one)
+    """
+    runtime = Runtime() if runtime is None else runtime
+    events = runtime.events
+    market = sessions[0].client
+    ui = DashboardState(log_entry="Initializing Quantum SMC/ICT Matrix...")
+    with Live(render(ui), auto_refresh=False, console=console) as live:
+        dashboard = Dashboard(live, ui)
+        dashboard.start()
+        events.start()
+        cache = AssetCache(market, ASSET_TTL, DISCOVERY_CONCURRENCY, DISCOVERY_TIMEOUT)
+        started = []
+        feed_task = None
         try:
-            assets_data = await analyze_assets(client, assets, live)
-            best_asset = max(assets_data.items(), key=lambda x: x[1]["confidence"] if x[1]["direction"] else 0, default=(None, {"confidence": 0}))
-            best_confidence = best_asset[1]["confidence"]
-            best_direction = best_asset[1]["direction"]
-            selected_asset = best_asset[0]
-            
-            if best_direction and best_confidence >= 90:
-                log.append(f"Forced Trade {best_direction.upper()} on {selected_asset} @ ${amount:.2f} (Conf: {best_confidence:.1f}%)")
-                live.update(update_ui("Trading", assets_data, selected_asset, log[-1], balance=balance))
-                status, result = await client.buy_and_check_win(amount, selected_asset, best_direction, 60)
-                if status:
-                    win = result.get("win", False)
-                    profit = result.get("profit", 0)
-                    total_profit += profit
-                    balance = await client.get_balance()
-                    log.append(f"Forced Trade {'WIN' if win else 'LOSS'}: ${profit:.2f}")
-                    live.update(update_ui("Idle", assets_data, selected_asset, log[-1], balance=balance))
-                    return win
-                else:
-                    log.append("Forced trade failed")
-                    live.update(update_ui("Idle", assets_data, selected_asset, log[-1], balance=balance))
-                    return False
-            else:
-                log.append("No quantum signal ≥90% for forced trade")
-                live.update(update_ui("Idle", assets_data, None, log[-1], balance=balance))
-                return False
-        except Exception as e:
-            log.append(f"Forced trade error: {str(e)}")
-            live.update(update_ui("Idle", assets_data, None, log[-1], balance=balance))
-            return False
-
-async def smart_martingale_trade():
-    email, password, base_bet, martingale, stop_loss, stop_profit = get_user_input()
-    client = Quotex(email=email, password=password, lang="pt")
-    
-    with Live(update_ui("Idle", {}, None, "Initializing Quantum SMC/ICT Matrix...", balance=0), refresh_per_second=20, console=console) as live:
-        top_assets = await login_and_fetch_assets(client, live)
-        if not top_assets:
-            return
-        
-        initial_balance = await client.get_balance()
-        while True:
-            balance = await client.get_balance()
-            trade_executed = await place_trade_with_martingale(client, top_assets, live, base_bet, martingale, stop_loss, stop_profit)
-            
-            if not trade_executed and balance <= initial_balance - stop_loss:
-                log.append(f"Quantum Loss limit hit: ${initial_balance - balance:.2f}")
-                live.update(update_ui("Stopped", {k: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for k in top_assets}, None, log[-1], balance=balance))
-                break
-            if trade_executed and balance >= initial_balance + stop_profit:
-                log.append(f"Quantum Profit achieved: ${balance - initial_balance:.2f}")
-                live.update(update_ui("Stopped", {k: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for k in top_assets}, None, log[-1], balance=balance))
-                break
-            
-            elapsed = time.time() - (time.time() - 180)
-            if elapsed < 180:
-                wait_time = 180 - elapsed
-                spinner = itertools.cycle(['🌌', '🌠', '💫', '✨'])
-                for i in range(int(wait_time)):
-                    balance = await client.get_balance()
-                    log.append(f"Preparing quantum cycle ({int(wait_time)-i}s)")
-                    live.update(update_ui("Scanning", {k: {"confidence": 0, "direction": "N/A", "pattern": "N/A", "kill_zone": "N/A", "pot": "N/A"} for k in top_assets}, None, log[-1], next(spinner), balance=balance))
-                    await asyncio.sleep(1)
+            top_assets = await login_and_fetch_assets(runtime, market, ui, cache, max_assets)
+            if not top_assets:
+                return
+            cache.add_listener(on_asset_change)
+            cache.start()
+        
+            feed, feed_task = await start_feed(runtime, market, top_assets)
+            for session in sessions:
+                if session.client is not market and not await session.client.test_connection():
+                    log.append(f"{session.prefix}Connection failed, session skipped")
+                    continue
+                await session.start()
+                session.positions.add_listener(partial(on_settlement, events, ui, started, session))
+                started.append(session)
+            while any(not session.stopped for session in started):
+                if feed is not None and feed_task.done():
+                    log.append("Realtime feed stopped, polling candles")
+                    feed = None
+                top_assets = await follow_assets(top_assets, cache, feed, max_assets)
+                top_assets = await place_trade_with_martingale(runtime, market, top_assets, ui, started, feed, cache)
+            await asyncio.gather(*(session.positions.join() for session in started))  # Let open options settle before shutting down
+        finally:
+            for session in started:
+                session.stop()
+            if feed_task is not None:
+                feed_task.cancel()
+                await asyncio.gather(feed_task, return_exceptions=True)
+            cache.stop()
+            dashboard.stop()
+            await events.stop()
+            runtime.analysis.shutdown()
+            if latency.enabled:
+                latency.export(LATENCY_EXPORT)
 
 async def execute(argument):
     if argument == "smart_martingale_trade":
@@ -0,0 +1,30 @@
+# pattern_stats.py
+import sys
+import time
+from rich.console import Console
+from rich.table import Table
+from backtest import load_candles
+from patterns import pattern_hit_rates
+
+console = Console()
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        console.print("[yellow]Usage: python pattern_stats.py <candles.json|candles.csv|asset> [horizon candles][/yellow]")
+        return
+    frame = load_candles(sys.argv[1])
+    horizon = int(sys.argv[2]) if len(sys.argv) == 3 else 1
+    started = time.perf_counter()
+    stats = pattern_hit_rates(frame, horizon)
+    elapsed = time.perf_counter() - started
+    table = Table(title=f"Pattern Hit Rates ({len(frame):,} candles, {horizon}-candle horizon, {elapsed * 1000:.1f} ms)")
+    table.add_column("Pattern", style="cyan")
+    table.add_column("Count", style="magenta", justify="right")
+    table.add_column("Hits", style="magenta", justify="right")
+    table.add_column("Hit Rate", style="green", justify="right")
+    for name, row in stats.items():
+        table.add_row(name, f"{row['count']:,}", f"{row['hits']:,}", "N/A" if row["hit_rate"] is None else f"{row['hit_rate']:.1f}%")
+    console.print(table)
+
+if __name__ == "__main__":
+    main()
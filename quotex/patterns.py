@@ -1,68 +1,150 @@
 # patterns.py
 import numpy as np
+from candles import as_frame
 
-def detect_patterns(candles):
+# (name, confidence) in priority order; index 0 means no pattern
+PATTERNS = (
+    ("N/A", 0),
+    ("Bullish Hammer", 85),
+    ("Bearish Shooting Star", 85),
+    ("Morning Star", 90),
+    ("Evening Star", 90),
+    ("Bullish Engulfing", 80),
+    ("Bearish Engulfing", 80)
+)
+PATTERN_NAMES = np.array([name for name, _ in PATTERNS])
+PATTERN_CONFIDENCES = np.array([confidence for _, confidence in PATTERNS])
+
+PATTERN_DIRECTIONS = np.array([0, 1, -1, 1, -1, 1, -1])  # 1 bullish, -1 bearish
+
+def scan_patterns(candles):
     """
-    Detect candlestick patterns and assign confidence.
+    Evaluate every candlestick pattern at every bar of a series in one pass.
     Args:
-        candles: List of dicts with 'open', 'high', 'low', 'close' keys
+        candles: CandleFrame (1-D or stacked, time on the last axis) or list of candle dicts
     Returns:
-        Tuple: (pattern_name, confidence) where confidence is 0-100
+        Dict of pattern name -> boolean mask shaped like the close prices; a
+        bar is True when the pattern completes on it. Bars without enough
+        earlier candles for a pattern are False.
     """
-    if len(candles) < 3:  # Need at least 3 candles for multi-candle patterns
-        return "N/A", 0
-    
-    opens = np.array([c["open"] for c in candles[-3:]])
-    highs = np.array([c["high"] for c in candles[-3:]])
-    lows = np.array([c["low"] for c in candles[-3:]])
-    closes = np.array([c["close"] for c in candles[-3:]])
+    frame = as_frame(candles)
+    opens = frame.open
+    highs = frame.high
+    lows = frame.low
+    closes = frame.close
     body_sizes = np.abs(closes - opens)
     ranges = highs - lows
-    
+
+    def shifted(values, lag):
+        # values[..., i - lag] aligned to bar i; the first `lag` bars are never read
+        return np.concatenate([values[..., :lag], values[..., :-lag]], axis=-1)
+
+    def from_bar(mask, first):
+        mask[..., :first] = False
+        return mask
+
+    # Previous candle (lag 1) and the one before it (lag 2), aligned to the completing bar
+    open1, close1, high1, low1 = shifted(opens, 1), shifted(closes, 1), shifted(highs, 1), shifted(lows, 1)
+    body1, range1 = shifted(body_sizes, 1), shifted(ranges, 1)
+    open2, close2, high2, low2 = shifted(opens, 2), shifted(closes, 2), shifted(highs, 2), shifted(lows, 2)
+
     # Single Candle Patterns
     # Bullish Hammer
-    if (closes[-1] > opens[-1] and
-        (highs[-1] - closes[-1]) > 2 * body_sizes[-1] and  # Long upper wick
-        (opens[-1] - lows[-1]) < body_sizes[-1] * 0.3 and  # Short lower wick
-        body_sizes[-1] < ranges[-1] * 0.3):  # Small body
-        return "Bullish Hammer", 85
-    
+    hammer = ((closes > opens) &
+              ((highs - closes) > 2 * body_sizes) &  # Long upper wick
+              ((opens - lows) < body_sizes * 0.3) &  # Short lower wick
+              (body_sizes < ranges * 0.3))  # Small body
+
     # Bearish Shooting Star
-    if (closes[-1] < opens[-1] and
-        (highs[-1] - opens[-1]) > 2 * body_sizes[-1] and  # Long upper wick
-        (closes[-1] - lows[-1]) < body_sizes[-1] * 0.3 and  # Short lower wick
-        body_sizes[-1] < ranges[-1] * 0.3):  # Small body
-        return "Bearish Shooting Star", 85
-    
+    shooting_star = ((closes < opens) &
+                     ((highs - opens) > 2 * body_sizes) &  # Long upper wick
+                     ((closes - lows) < body_sizes * 0.3) &  # Short lower wick
+                     (body_sizes < ranges * 0.3))  # Small body
+
     # Multi-Candle Patterns
     # Morning Star (Bullish Reversal)
-    if (closes[-3] < opens[-3] and  # Downtrend (bearish candle)
-        body_sizes[-2] < ranges[-2] * 0.3 and  # Small body (indecision)
-        closes[-1] > opens[-1] and  # Uptrend (bullish candle)
-        closes[-1] > (opens[-3] + closes[-3]) / 2 and  # Close above midpoint of first candle
-        lows[-2] < lows[-3]):  # Gap down then up
-        return "Morning Star", 90
-    
+    morning_star = ((close2 < open2) &  # Downtrend (bearish candle)
+                    (body1 < range1 * 0.3) &  # Small body (indecision)
+                    (closes > opens) &  # Uptrend (bullish candle)
+                    (closes > (open2 + close2) / 2) &  # Close above midpoint of first candle
+                    (low1 < low2))  # Gap down then up
+
     # Evening Star (Bearish Reversal)
-    if (closes[-3] > opens[-3] and  # Uptrend (bullish candle)
-        body_sizes[-2] < ranges[-2] * 0.3 and  # Small body (indecision)
-        closes[-1] < opens[-1] and  # Downtrend (bearish candle)
-        closes[-1] < (opens[-3] + closes[-3]) / 2 and  # Close below midpoint of first candle
-        highs[-2] > highs[-3]):  # Gap up then down
-        return "Evening Star", 90
-    
+    evening_star = ((close2 > open2) &  # Uptrend (bullish candle)
+                    (body1 < range1 * 0.3) &  # Small body (indecision)
+                    (closes < opens) &  # Downtrend (bearish candle)
+                    (closes < (open2 + close2) / 2) &  # Close below midpoint of first candle
+                    (high1 > high2))  # Gap up then down
+
     # Bullish Engulfing
-    if len(candles) >= 2 and (closes[-2] < opens[-2] and  # Bearish candle
-                              closes[-1] > opens[-1] and  # Bullish candle
-                              closes[-1] > opens[-2] and  # Engulfs previous open
-                              opens[-1] < closes[-2]):  # Engulfs previous close
-        return "Bullish Engulfing", 80
-    
+    bullish_engulfing = ((close1 < open1) &  # Bearish candle
+                         (closes > opens) &  # Bullish candle
+                         (closes > open1) &  # Engulfs previous open
+                         (opens < close1))  # Engulfs previous close
+
     # Bearish Engulfing
-    if len(candles) >= 2 and (closes[-2] > opens[-2] and  # Bullish candle
-                              closes[-1] < opens[-1] and  # Bearish candle
-                              closes[-1] < opens[-2] and  # Engulfs previous open
-                              opens[-1] > closes[-2]):  # Engulfs previous close
-        return "Bearish Engulfing", 80
-    
-    return "N/A", 0
\ No newline at end of file
+    bearish_engulfing = ((close1 > open1) &  # Bullish candle
+                         (closes < opens) &  # Bearish candle
+                         (closes < open1) &  # Engulfs previous open
+                         (opens > close1))  # Engulfs previous close
+
+    masks = (hammer, shooting_star, from_bar(morning_star, 2), from_bar(evening_star, 2),
+             from_bar(bullish_engulfing, 1), from_bar(bearish_engulfing, 1))
+    return {name: mask for (name, _), mask in zip(PATTERNS[1:], masks)}
+
+def pattern_series(masks):
+    """
+    Resolve overlapping pattern masks to one pattern per bar, in PATTERNS priority order.
+    Args:
+        masks: Dict from scan_patterns
+    Returns:
+        Tuple of arrays: (pattern index into PATTERNS, confidence)
+    """
+    pattern = np.select([masks[name] for name, _ in PATTERNS[1:]], np.arange(1, len(PATTERNS)), 0)
+    return pattern, PATTERN_CONFIDENCES[pattern]
+
+def detect_patterns_batch(frame):
+    """
+    Vectorized candlestick pattern detection over a stacked (asset x time) frame.
+    Args:
+        frame: 2-D CandleFrame with at least 3 candles per row
+    Returns:
+        Tuple of arrays: (pattern index into PATTERNS, confidence)
+    """
+    pattern, confidence = pattern_series(scan_patterns(frame[-3:]))
+    return pattern[:, -1], confidence[:, -1]
+
+def pattern_hit_rates(candles, horizon=1):
+    """
+    How often each pattern was followed by a move in its direction.
+    Args:
+        candles: 1-D CandleFrame or list of candle dicts, oldest first
+        horizon: Candles after the pattern bar whose close is compared with its close
+    Returns:
+        Dict of pattern name -> {"count", "hits", "hit_rate"}; hit_rate is a
+        percentage of the occurrences with a later close, None without any
+    """
+    frame = as_frame(candles)
+    moves = np.full(len(frame), np.nan)
+    moves[:len(frame) - horizon] = frame.close[horizon:] - frame.close[:len(frame) - horizon]
+    stats = {}
+    for (name, _), direction, mask in zip(PATTERNS[1:], PATTERN_DIRECTIONS[1:], scan_patterns(frame).values()):
+        settled = mask & ~np.isnan(moves)
+        hits = int(np.sum(np.sign(moves[settled]) == direction))
+        count = int(np.sum(settled))
+        stats[name] = {"count": int(np.sum(mask)), "hits": hits, "hit_rate": hits / count * 100 if count else None}
+    return stats
+
+def detect_patterns(candles):
+    """
+    Detect candlestick patterns and assign confidence.
+    Args:
+        candles: CandleFrame or list of dicts with 'open', 'high', 'low', 'close' keys
+    Returns:
+        Tuple: (pattern_name, confidence) where confidence is 0-100
+    """
+    if len(candles) < 3:  # Need at least 3 candles for multi-candle patterns
+        return "N/A", 0
+
+    pattern, _ = pattern_series(scan_patterns(as_frame(candles)[-3:]))
+    return PATTERNS[pattern[-1]]
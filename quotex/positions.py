@@ -0,0 +1,142 @@
+# positions.py
+import asyncio
+import itertools
+
+class Position:
+    __slots__ = ("id", "asset", "direction", "amount", "step", "info", "future", "task")
+
+    def __init__(self, id, asset, direction, amount, step, info):
+        self.id = id
+        self.asset = asset
+        self.direction = direction
+        self.amount = amount
+        self.step = step  # Martingale step the stake was sized at
+        self.info = info  # Signal details kept for listeners
+        self.future = asyncio.get_running_loop().create_future()  # (status, result) once settled
+        self.task = None
+
+class PositionManager:
+    """
+    Open options, up to `max_positions` at once and one per asset. Orders
+    are sent without waiting for their outcome; one settlement task applies
+    results as they arrive: it books them, moves the martingale stake,
+    checks the stop limits, resolves the position's future and notifies
+    listeners.
+    """
+
+    def __init__(self, max_positions=3, base_bet=1.0, martingale=1.0, max_steps=3, stop_loss=None, stop_profit=None, tracker=None):
+        """
+        Args:
+            max_positions: Positions open at the same time
+            base_bet: Stake of the first trade in a martingale sequence
+            martingale: Stake multiplier after a loss
+            max_steps: Trades per martingale sequence before the stake resets
+            stop_loss, stop_profit: Realized session loss/profit that stops new positions (None: no limit)
+            tracker: Optional BalanceTracker to book settlements in
+        """
+        self.max_positions = max_positions
+        self.base_bet = base_bet
+        self.martingale = martingale
+        self.max_steps = max_steps
+        self.stop_loss = stop_loss
+        self.stop_profit = stop_profit
+        self.tracker = tracker
+        self.amount = base_bet  # Stake of the next position
+        self.step = 0
+        self.profit = 0.0
+        self.stopped = None  # "loss" or "profit" once a limit is hit
+        self.open = {}  # id -> Position
+        self._ids = itertools.count(1)
+        self._settled = asyncio.Queue()
+        self._listeners = []
+        self._task = None
+
+    @property
+    def free(self):
+        return 0 if self.stopped else max(0, self.max_positions - len(self.open))
+
+    def holding(self, asset):
+        return any(position.asset == asset for position in self.open.values())
+
+    def add_listener(self, callback):
+        """Register callback(position, status, result), called once per settled or failed order."""
+        self._listeners.append(callback)
+
+    def submit(self, asset, direction, order, expires_at=None, **info):
+        """
+        Track an order sent at the current stake.
+        Args:
+            asset, direction: Order details
+            order: Awaitable of the order, returning buy_and_check_win's (status, result)
+            expires_at: Expiry time of the option on the tracker's clock, if known
+            info: Signal details passed on to listeners
+        Returns:
+            Position, whose future resolves to (status, result)
+        """
+        position = Position(next(self._ids), asset, direction, self.amount, self.step, info)
+        self.open[position.id] = position
+        if self.tracker is not None:
+            self.tracker.open_order(position.amount, position.id, expires_at)
+        position.task = asyncio.create_task(self._wait(position, order))
+        return position
+
+    async def _wait(self, position, order):
+        try:
+            status, result = await order
+        except Exception as e:
+            status, result = False, str(e)
+        await self._settled.put((position, status, result))
+
+    def book(self, profit):
+        """
+        Apply one settled result to the session: realized profit, the
+        martingale stake and the stop limits. backtest.settle_portfolio
+        replays history through this too.
+        """
+        self.profit += profit
+        if profit < 0 and self.step + 1 < self.max_steps:
+            self.amount *= self.martingale
+            self.step += 1
+        elif profit != 0:
+            self.amount = self.base_bet
+            self.step = 0
+        if self.stop_loss is not None and -self.profit >= self.stop_loss:
+            self.stopped = "loss"
+        elif self.stop_profit is not None and self.profit >= self.stop_profit:
+            self.stopped = "profit"
+
+    def _apply(self, position, status, result):
+        del self.open[position.id]
+        if status:
+            profit = result.get("profit", 0)
+            if self.tracker is not None:
+                self.tracker.record_trade(profit, position.amount, position.id)
+            self.book(profit)
+        elif self.tracker is not None:
+            self.tracker.cancel_order(position.amount, position.id)
+        if not position.future.done():
+            position.future.set_result((status, result))
+        for callback in self._listeners:
+            callback(position, status, result)
+
+    async def run(self):
+        """Settlement listener: apply results in arrival order."""
+        while True:
+            self._apply(*await self._settled.get())
+
+    async def join(self):
+        """Wait until every open position has settled."""
+        while self.open:
+            await asyncio.wait([position.future for position in self.open.values()])
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def stop(self):
+        """Stop waiting for settlements; the options stay open with the broker."""
+        for position in self.open.values():
+            position.task.cancel()
+        if self._task is not None:
+            self._task.cancel()
@@ -1,11 +1,144 @@
 # price_action.py
 import numpy as np
+from candles import CandleFrame, as_frame
+
+SWEEP_TYPES = {1: "bullish", -1: "bearish", 0: "none"}
+FIB_RATIOS = np.array([0.236, 0.382, 0.5, 0.618, 0.786])
+
+def _linear_fit(values):
+    """Row-wise least-squares line through `values` against 0..n-1, as (slope, intercept)."""
+    x = np.arange(values.shape[-1], dtype=np.float64)
+    x_centered = x - x.mean()
+    slope = np.sum(x_centered * (values - values.mean(axis=-1, keepdims=True)), axis=-1) / np.sum(x_centered * x_centered)
+    intercept = values.mean(axis=-1) - slope * x.mean()
+    return slope, intercept
+
+def analyze_price_action_batch(frame, lookback=50, short_lookback=10):
+    """
+    Vectorized price action metrics over a stacked (asset x time) frame.
+    Args:
+        frame: 2-D CandleFrame with at least `lookback` candles per row
+        lookback: Long-term analysis period (default 50)
+        short_lookback: Short-term analysis period (default 10)
+    Returns:
+        Dict of per-row arrays; 'liq_sweep_type' is coded 1 bullish, -1 bearish, 0 none
+    """
+    frame = frame[-lookback:]
+    opens = frame.open
+    highs = frame.high
+    lows = frame.low
+    closes = frame.close
+    latest_close = closes[:, -1]
+    short_closes = closes[:, -short_lookback:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 1. Supply and Demand Zones (dynamic zones based on reversal points)
+        returns = np.diff(closes, axis=-1) / closes[:, :-1] * 100
+        reversals = np.zeros(closes.shape, dtype=bool)
+        reversals[:, 1:-1] = np.sign(returns[:, :-1]) != np.sign(returns[:, 1:])
+        supply_points = reversals & (highs > closes)
+        demand_points = reversals & (lows < closes)
+        supply_count = supply_points.sum(axis=-1)
+        demand_count = demand_points.sum(axis=-1)
+        supply_level = np.where(supply_count > 0, np.where(supply_points, highs, 0).sum(axis=-1) / supply_count, highs.max(axis=-1))
+        demand_level = np.where(demand_count > 0, np.where(demand_points, lows, 0).sum(axis=-1) / demand_count, lows.min(axis=-1))
+        supply_strength = supply_count / lookback * 100
+        demand_strength = demand_count / lookback * 100
+
+        # 2. Breakout Power (momentum + volume proxy via range expansion)
+        ranges = highs - lows
+        mean_range = np.mean(ranges, axis=-1)
+        range_expansion = np.where(mean_range != 0, np.mean(ranges[:, -5:], axis=-1) / mean_range, 1)
+        breakout_power = np.where(
+            latest_close > supply_level,
+            ((latest_close - supply_level) / supply_level * 100) * range_expansion,
+            np.where(latest_close < demand_level, ((demand_level - latest_close) / demand_level * 100) * range_expansion, 0)
+        )
+
+        # 3. Trendline Dynamics (slope, strength, acceleration)
+        x = np.arange(lookback)
+        slope, intercept = _linear_fit(closes)
+        trendline_slope = slope * 1000  # Scaled for readability
+        residuals = closes - (slope[:, None] * x + intercept[:, None])
+        trendline_strength = 100 - (np.std(residuals, axis=-1) / np.mean(closes, axis=-1) * 100)
+        short_slope, _ = _linear_fit(short_closes)
+        trendline_acceleration = (short_slope - slope) * 1000  # Change in slope
+
+        # 4. Liquidity Sweep (extreme wick zones indicating stop hunts)
+        wick_sizes = highs - np.maximum(opens, closes)
+        lower_wick_sizes = np.minimum(opens, closes) - lows
+        wick_total = wick_sizes + lower_wick_sizes
+        liq_threshold = np.mean(wick_total, axis=-1) + 2.5 * np.std(wick_total, axis=-1)
+        liq_points = wick_total > liq_threshold[:, None]
+        liq_count = liq_points.sum(axis=-1)
+        liq_level = np.where(liq_count > 0, np.where(liq_points, (highs + lows) / 2, 0).sum(axis=-1) / liq_count, 0)
+        liq_type = np.where(liq_count > 0, np.where(latest_close > liq_level, 1, -1), 0)
+        liq_confidence = np.where(liq_count > 0, np.fmin(100, liq_count / lookback * 300), 0)
+
+        # 5. Price Rejection Intensity (wick rejection with momentum context)
+        rejection_intensity = np.where(np.mean(ranges[:, -5:], axis=-1) != 0, np.mean(wick_total[:, -5:] / ranges[:, -5:], axis=-1) * 100, 0)
+        impulsive = np.abs(returns[:, -1]) > np.std(returns, axis=-1) * 1.5
+        rejection_intensity = np.where(impulsive, rejection_intensity * 1.5, rejection_intensity)  # Boost if recent move is impulsive
+
+        # 6. Consolidation Breakout Potential (range contraction + volatility)
+        short_ranges = ranges[:, -short_lookback:]
+        short_mean_range = np.mean(short_ranges, axis=-1)
+        consolidation_volatility = np.where(short_mean_range != 0, np.std(short_ranges, axis=-1) / short_mean_range, 0)
+        consolidation_breakout_potential = 100 - (consolidation_volatility * 100) + np.where(mean_range != 0, np.max(ranges[:, -3:], axis=-1) / mean_range * 50, 0)
+
+        # 7. Impulse Wave Strength (magnitude of consecutive directional moves)
+        consecutive_returns = np.cumsum(returns * (np.sign(returns) == np.sign(np.roll(returns, 1, axis=-1))), axis=-1)
+        if consecutive_returns.shape[-1] >= short_lookback:
+            impulse_wave_strength = np.max(np.abs(consecutive_returns[:, -short_lookback:]), axis=-1)
+        else:
+            impulse_wave_strength = np.zeros(closes.shape[0])
+
+        # 8. Fibonacci Confluence (proximity to key Fib levels)
+        range_low = lows.min(axis=-1)
+        price_range = highs.max(axis=-1) - range_low
+        fib_levels = range_low[:, None] + price_range[:, None] * FIB_RATIOS
+        fib_distances = np.abs(latest_close[:, None] - fib_levels)
+        fib_confluence = np.where(price_range != 0, 100 - (fib_distances.min(axis=-1) / price_range * 100), 0)
+
+        # 9. Volatility-Adjusted Pivot (dynamic pivot with ATR weighting)
+        prev_closes = closes[:, :-1]
+        true_range = np.maximum(highs[:, 1:] - lows[:, 1:], np.maximum(np.abs(highs[:, 1:] - prev_closes), np.abs(lows[:, 1:] - prev_closes)))
+        atr = np.mean(true_range, axis=-1)
+        pivots = (highs + lows + closes) / 3
+        volatility_adjusted_pivot = np.mean(pivots[:, -short_lookback:] * (1 + atr / np.mean(closes, axis=-1))[:, None], axis=-1)
+
+        # 10. Momentum Divergence (price vs. momentum divergence)
+        momentum = np.diff(short_closes, axis=-1) / short_closes[:, :-1] * 100
+        price_trend = short_closes[:, -1] - short_closes[:, 0]
+        momentum_trend = np.sum(momentum, axis=-1)
+        close_std = np.std(closes, axis=-1)
+        momentum_divergence = np.where(close_std != 0, np.abs(price_trend - momentum_trend) / close_std * 100, 0)
+
+    return {
+        "supply_level": supply_level,
+        "supply_strength": supply_strength,
+        "demand_level": demand_level,
+        "demand_strength": demand_strength,
+        "breakout_power": breakout_power,
+        "trend_slope": trendline_slope,
+        "trend_strength": trendline_strength,
+        "trend_acceleration": trendline_acceleration,
+        "liq_sweep_level": liq_level,
+        "liq_sweep_type": liq_type,
+        "liq_sweep_confidence": liq_confidence,
+        "price_rejection_intensity": rejection_intensity,
+        "consolidation_breakout_potential": consolidation_breakout_potential,
+        "impulse_wave_strength": impulse_wave_strength,
+        "fibonacci_confluence": fib_confluence,
+        "volatility_adjusted_pivot": volatility_adjusted_pivot,
+        "momentum_divergence": momentum_divergence
+    }
 
 def analyze_price_action(candles, lookback=50, short_lookback=10):
     """
     Ultimate price action analysis with advanced metrics.
     Args:
-        candles: List of dicts with 'open', 'high', 'low', 'close' keys
+        candles: CandleFrame or list of dicts with 'open', 'high', 'low', 'close' keys
         lookback: Long-term analysis period (default 50)
         short_lookback: Short-term analysis period (default 10)
     Returns:
@@ -26,94 +159,18 @@ def analyze_price_action(candles, lookback=50, short_lookback=10):
             "momentum_divergence": 0
         }
 
-    opens = np.array([c["open"] for c in candles[-lookback:]])
-    highs = np.array([c["high"] for c in candles[-lookback:]])
-    lows = np.array([c["low"] for c in candles[-lookback:]])
-    closes = np.array([c["close"] for c in candles[-lookback:]])
-    latest_close = closes[-1]
-    short_closes = closes[-short_lookback:]
-
-    # 1. Supply and Demand Zones (dynamic zones based on reversal points)
-    returns = np.diff(closes) / closes[:-1] * 100
-    reversal_indices = np.where(np.sign(returns[:-1]) != np.sign(returns[1:]))[0] + 1
-    supply_level = np.mean(highs[reversal_indices[highs[reversal_indices] > closes[reversal_indices]]]) if np.any(highs[reversal_indices] > closes[reversal_indices]) else max(highs)
-    demand_level = np.mean(lows[reversal_indices[lows[reversal_indices] < closes[reversal_indices]]]) if np.any(lows[reversal_indices] < closes[reversal_indices]) else min(lows)
-    supply_strength = len(reversal_indices[highs[reversal_indices] > closes[reversal_indices]]) / lookback * 100
-    demand_strength = len(reversal_indices[lows[reversal_indices] < closes[reversal_indices]]) / lookback * 100
-
-    # 2. Breakout Power (momentum + volume proxy via range expansion)
-    ranges = highs - lows
-    breakout_power = 0
-    if latest_close > supply_level:
-        breakout_power = ((latest_close - supply_level) / supply_level * 100) * (np.mean(ranges[-5:]) / np.mean(ranges) if np.mean(ranges) != 0 else 1)
-    elif latest_close < demand_level:
-        breakout_power = ((demand_level - latest_close) / demand_level * 100) * (np.mean(ranges[-5:]) / np.mean(ranges) if np.mean(ranges) != 0 else 1)
-
-    # 3. Trendline Dynamics (slope, strength, acceleration)
-    x = np.arange(lookback)
-    slope, intercept = np.polyfit(x, closes, 1)
-    trendline_slope = slope * 1000  # Scaled for readability
-    residuals = closes - (slope * x + intercept)
-    trendline_strength = 100 - (np.std(residuals) / np.mean(closes) * 100)
-    short_slope, _ = np.polyfit(np.arange(short_lookback), short_closes, 1)
-    trendline_acceleration = (short_slope - slope) * 1000  # Change in slope
-
-    # 4. Liquidity Sweep (extreme wick zones indicating stop hunts)
-    wick_sizes = highs - np.maximum(opens, closes)
-    lower_wick_sizes = np.minimum(opens, closes) - lows
-    wick_total = wick_sizes + lower_wick_sizes
-    wick_mean, wick_std = np.mean(wick_total), np.std(wick_total)
-    liq_threshold = wick_mean + 2.5 * wick_std
-    liq_indices = np.where(wick_total > liq_threshold)[0]
-    if liq_indices.size > 0:
-        liq_level = np.mean((highs[liq_indices] + lows[liq_indices]) / 2)
-        liq_type = "bullish" if latest_close > liq_level else "bearish"
-        liq_confidence = min(100, len(liq_indices) / lookback * 300)
-        liquidity_sweep = {"level": liq_level, "type": liq_type, "confidence": liq_confidence}
-    else:
-        liquidity_sweep = {"level": 0, "type": "none", "confidence": 0}
-
-    # 5. Price Rejection Intensity (wick rejection with momentum context)
-    rejection_intensity = np.mean(wick_total[-5:] / ranges[-5:]) * 100 if np.mean(ranges[-5:]) != 0 else 0
-    if abs(returns[-1]) > np.std(returns) * 1.5:
-        rejection_intensity *= 1.5  # Boost if recent move is impulsive
-
-    # 6. Consolidation Breakout Potential (range contraction + volatility)
-    consolidation_volatility = np.std(ranges[-short_lookback:]) / np.mean(ranges[-short_lookback:]) if np.mean(ranges[-short_lookback:]) != 0 else 0
-    consolidation_breakout_potential = 100 - (consolidation_volatility * 100) + (np.max(ranges[-3:]) / np.mean(ranges) * 50 if np.mean(ranges) != 0 else 0)
-
-    # 7. Impulse Wave Strength (magnitude of consecutive directional moves)
-    consecutive_returns = np.cumsum(returns * (np.sign(returns) == np.sign(np.roll(returns, 1))))
-    impulse_wave_strength = np.max(np.abs(consecutive_returns[-short_lookback:])) if len(consecutive_returns) >= short_lookback else 0
-
-    # 8. Fibonacci Confluence (proximity to key Fib levels)
-    price_range = max(highs) - min(lows)
-    fib_levels = [min(lows) + price_range * level for level in [0.236, 0.382, 0.5, 0.618, 0.786]]
-    fib_distances = np.abs(latest_close - np.array(fib_levels))
-    fib_confluence = 100 - (min(fib_distances) / price_range * 100) if price_range != 0 else 0
-
-    # 9. Volatility-Adjusted Pivot (dynamic pivot with ATR weighting)
-    atr = np.mean([max(h - l, abs(h - c_prev), abs(l - c_prev)) 
-                   for h, l, c_prev in zip(highs[1:], lows[1:], closes[:-1])])
-    pivots = (highs + lows + closes) / 3
-    volatility_adjusted_pivot = np.mean(pivots[-short_lookback:] * (1 + atr / np.mean(closes)))
-
-    # 10. Momentum Divergence (price vs. momentum divergence)
-    momentum = np.diff(closes[-short_lookback:]) / closes[-short_lookback:-1] * 100
-    price_trend = short_closes[-1] - short_closes[0]
-    momentum_trend = np.sum(momentum)
-    momentum_divergence = abs(price_trend - momentum_trend) / np.std(closes) * 100 if np.std(closes) != 0 else 0
-
+    pa = analyze_price_action_batch(CandleFrame.stack([as_frame(candles)], lookback), lookback, short_lookback)
+    pa = {key: values[0] for key, values in pa.items()}
     return {
-        "supply_zone": {"level": supply_level, "strength": supply_strength},
-        "demand_zone": {"level": demand_level, "strength": demand_strength},
-        "breakout_power": breakout_power,
-        "trendline_dynamics": {"slope": trendline_slope, "strength": trendline_strength, "acceleration": trendline_acceleration},
-        "liquidity_sweep": liquidity_sweep,
-        "price_rejection_intensity": rejection_intensity,
-        "consolidation_breakout_potential": consolidation_breakout_potential,
-        "impulse_wave_strength": impulse_wave_strength,
-        "fibonacci_confluence": fib_confluence,
-        "volatility_adjusted_pivot": volatility_adjusted_pivot,
-        "momentum_divergence": momentum_divergence
-    }
\ No newline at end of file
+        "supply_zone": {"level": pa["supply_level"], "strength": pa["supply_strength"]},
+        "demand_zone": {"level": pa["demand_level"], "strength": pa["demand_strength"]},
+        "breakout_power": pa["breakout_power"],
+        "trendline_dynamics": {"slope": pa["trend_slope"], "strength": pa["trend_strength"], "acceleration": pa["trend_acceleration"]},
+        "liquidity_sweep": {"level": pa["liq_sweep_level"], "type": SWEEP_TYPES[int(pa["liq_sweep_type"])], "confidence": pa["liq_sweep_confidence"]},
+        "price_rejection_intensity": pa["price_rejection_intensity"],
+        "consolidation_breakout_potential": pa["consolidation_breakout_potential"],
+        "impulse_wave_strength": pa["impulse_wave_strength"],
+        "fibonacci_confluence": pa["fibonacci_confluence"],
+        "volatility_adjusted_pivot": pa["volatility_adjusted_pivot"],
+        "momentum_divergence": pa["momentum_divergence"]
+    }
@@ -0,0 +1,114 @@
+# resampler.py
+import numpy as np
+from candles import CandleFrame, FIELDS, as_frame
+from candle_feed import CandleWindow
+
+TIMEFRAMES = (300, 900, 3600)  # 5m, 15m, 1h
+
+def resample(candles, timeframe):
+    """
+    Aggregate a 1-D candle series into OHLC bars aligned to wall-clock
+    multiples of `timeframe`. A leading bar whose first candles are missing
+    is dropped; the last bar covers whatever of its period has traded.
+    Args:
+        candles: CandleFrame or list of candle dicts, oldest first
+        timeframe: Bar length in seconds
+    Returns:
+        CandleFrame of bars, time = bar open time
+    """
+    frame = as_frame(candles)
+    bucket = frame.time - frame.time % timeframe
+    start = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]]) if len(frame) else np.zeros(0, dtype=np.int64)
+    if len(start) and frame.time[0] != bucket[0]:
+        start = start[1:]
+    if not len(start):
+        return CandleFrame(*np.empty((len(FIELDS), 0)))
+    first = start[0]
+    end = np.r_[start[1:], len(frame)] - 1
+    return CandleFrame(frame.open[start], np.maximum.reduceat(frame.high[first:], start - first),
+                       np.minimum.reduceat(frame.low[first:], start - first), frame.close[end], bucket[start])
+
+class Resampler:
+    """
+    Higher-timeframe bars per asset, updated from the 1-minute stream.
+    Register on_candle as a CandleFeed listener; each update touches only
+    the current bar of every timeframe. An asset is seeded from the candle
+    store, or the feed window, the first time it is seen.
+    """
+
+    def __init__(self, timeframes=TIMEFRAMES, window=120, store=None, feed=None, period=60):
+        """
+        Args:
+            timeframes: Bar lengths in seconds, multiples of `period`
+            window: Bars kept per timeframe
+            store: Optional CandleStore to seed history from
+            feed: Optional CandleFeed to seed from when the store has nothing
+            period: Length of the incoming candles in seconds
+        """
+        self.timeframes = tuple(timeframes)
+        self.window = window
+        self.store = store
+        self.feed = feed
+        self.period = period
+        self.windows = {}  # (asset, timeframe) -> CandleWindow
+        self.closed = {}  # (asset, timeframe) -> (open, high, low, close) of the current bar's closed candles, or None
+
+    def seed(self, asset, candles):
+        """Build every timeframe of an asset from closed candles, replacing what it had."""
+        frame = as_frame(candles)
+        for timeframe in self.timeframes:
+            window = self.windows[(asset, timeframe)] = CandleWindow(self.window)
+            bars = resample(frame, timeframe)[-self.window:]
+            for bar in zip(bars.open, bars.high, bars.low, bars.close, bars.time):
+                window.append(*bar)
+            self.closed[(asset, timeframe)] = (bars.open[-1], bars.high[-1], bars.low[-1], bars.close[-1]) if len(bars) else None
+
+    def _history(self, asset):
+        count = max(self.timeframes) // self.period * self.window
+        if self.store is not None:
+            frame = self.store.tail(asset, self.period, count)
+            if len(frame):
+                return frame
+        if self.feed is not None:
+            frame = self.feed.frame(asset)
+            if frame is not None:
+                return frame[:-1]
+        return []
+
+    def on_candle(self, asset, candle, closed):
+        """
+        Apply a 1-minute candle update (CandleFeed listener signature).
+        Args:
+            asset: Asset code
+            candle: Dict with open, high, low, close and time (open time)
+            closed: Whether the candle is final; forming updates replace each other
+        """
+        if (asset, self.timeframes[0]) not in self.windows:
+            self.seed(asset, self._history(asset))
+        for timeframe in self.timeframes:
+            key = (asset, timeframe)
+            window = self.windows[key]
+            bucket = candle["time"] - candle["time"] % timeframe
+            last = window.last()
+            if last is not None and bucket < last["time"]:
+                continue  # Late candle of a finished bar
+            if last is None or bucket > last["time"]:
+                window.append(candle["open"], candle["high"], candle["low"], candle["close"], bucket)
+                self.closed[key] = None
+            base = self.closed[key]
+            if base is None:
+                bar = (candle["open"], candle["high"], candle["low"], candle["close"])
+            else:
+                bar = (base[0], max(base[1], candle["high"]), min(base[2], candle["low"]), candle["close"])
+            window.set_last(*bar, bucket)
+            if closed:
+                self.closed[key] = bar
+
+    def frame(self, asset, timeframe):
+        """Bars of one timeframe, oldest first; the last may still be forming. None before the asset is seen."""
+        window = self.windows.get((asset, timeframe))
+        return window.frame() if window is not None else None
+
+    def frames(self, asset):
+        """Dict of timeframe -> bars of an asset."""
+        return {timeframe: self.frame(asset, timeframe) for timeframe in self.timeframes if (asset, timeframe) in self.windows}
@@ -0,0 +1,62 @@
+# scheduler.py
+import time
+import asyncio
+from latency import latency
+
+class CandleClock:
+    """
+    Wakes at precise offsets from candle boundaries, e.g. 500 ms before a
+    candle closes to prepare a decision and 50 ms after the next one opens
+    to act on it.
+    """
+
+    def __init__(self, period=60, clock=time.time, sleep=asyncio.sleep, spin=0.005):
+        self.period = period
+        self.clock = clock  # Wall-clock source, e.g. a simulator's accelerated clock
+        self.sleep = sleep  # Sleep matching `clock`
+        self.spin = spin  # Final stretch waited in event-loop turns instead of one timed sleep (0 on a virtual clock)
+
+    def now(self):
+        return self.clock()
+
+    def next_boundary(self, now=None):
+        """Open time of the next candle after `now`."""
+        now = self.clock() if now is None else now
+        return (now // self.period + 1) * self.period
+
+    def next_wake(self, offset, now=None):
+        """Earliest boundary + offset still in the future."""
+        now = self.clock() if now is None else now
+        return self.next_boundary(now - offset) + offset
+
+    async def wait_until(self, target):
+        """
+        Sleep until wall-clock time `target`.
+        Returns:
+            Float: Seconds the wake-up came after `target`
+        """
+        while True:
+            remaining = target - self.clock()
+            if remaining <= 0:
+                break
+            if remaining > self.spin:
+                await self.sleep(remaining - self.spin)
+            else:
+                await asyncio.sleep(0)
+        lag = self.clock() - target
+        latency.record("wake_lag", lag)
+        return lag
+
+    async def ticks(self, *offsets):
+        """
+        Yield (boundary, offset) at every boundary + offset, in time order,
+        skipping wake-ups that are already in the past.
+        """
+        offsets = sorted(offsets)
+        boundary = self.next_boundary(self.clock() - offsets[0]) if offsets else None
+        while offsets:
+            for offset in offsets:
+                if boundary + offset >= self.clock():
+                    await self.wait_until(boundary + offset)
+                    yield boundary, offset
+            boundary += self.period
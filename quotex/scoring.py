@@ -0,0 +1,186 @@
+# scoring.py
+import os
+import json
+from collections import namedtuple
+import numpy as np
+from patterns import PATTERN_NAMES
+
+SCORING_CONFIG = "scoring.json"  # Optional rule overrides, see load_rules
+
+PATTERN_BIAS = np.array([
+    1 if any(word in name.lower() for word in ("bullish", "hammer", "morning"))
+    else -1 if any(word in name.lower() for word in ("bearish", "shooting", "evening"))
+    else 0
+    for name in PATTERN_NAMES
+])
+
+# One row of the confidence model.
+#   feature:   Feature tested against `threshold` (None: no test)
+#   direction: How the test relates to the trade direction
+#              "any"        feature > threshold
+#              "trading"    feature > threshold, only when a direction is set
+#              "signed"     feature > threshold for a call, < -threshold for a put
+#              "contrarian" feature < threshold[0] for a call, > threshold[1] for a put
+#              "code"       feature == 1 for a call, == -1 for a put
+#   threshold: Test threshold (ignored by "code")
+#   points:    Feature scored when the rule fires (None: a flat `cap` points)
+#   weight:    Multiplier of `points` (absolute value for "signed" rules)
+#   cap:       Maximum points awarded, or the flat award
+#   gate:      Name of an extra condition in GATES that must also hold, or None
+Rule = namedtuple("Rule", "name feature direction threshold points weight cap gate")
+
+GATES = {
+    "macd_aligned": lambda f, call, put: (f["macd_line"] > f["signal_line"]) & (f["histogram"] > 0) & call | (f["macd_line"] < f["signal_line"]) & (f["histogram"] < 0) & put,
+    "inside_bands": lambda f, call, put: (f["close"] < f["upper_bb"]) & call | (f["close"] > f["lower_bb"]) & put,
+    "active_range": lambda f, call, put: f["atr"] > f["sma_bb"] * 0.005,
+    "aligned_sentiment": lambda f, call, put: call & (f["sentiment"] == 1) | put & (f["sentiment"] == -1),
+    "near_order_block": lambda f, call, put: ~np.isnan(f["ob_level"]) & (f["ob_level"] != 0) & (np.abs(f["close"] - f["ob_level"]) < f["atr"]),
+    "imbalance_side": lambda f, call, put: call & (f["close"] < f["imb_level"]) | put & (f["close"] > f["imb_level"]),
+    "fvg_side": lambda f, call, put: (f["fvg_direction"] != 0) & (call & (f["close"] < f["fvg_level"]) | put & (f["close"] > f["fvg_level"])),
+    "pattern_aligned": lambda f, call, put: (PATTERN_BIAS[f["pattern"]] == 1) & call | (PATTERN_BIAS[f["pattern"]] == -1) & put,
+    "at_demand": lambda f, call, put: call & (f["close"] > f["demand_level"]) & (np.abs(f["close"] - f["demand_level"]) < f["atr"]),
+    "at_supply": lambda f, call, put: put & (f["close"] < f["supply_level"]) & (np.abs(f["close"] - f["supply_level"]) < f["atr"]),
+    "trend_aligned": lambda f, call, put: (f["trend_slope"] > 0) & call | (f["trend_slope"] < 0) & put,
+    "near_sweep": lambda f, call, put: np.abs(f["close"] - f["liq_sweep_level"]) < f["atr"],
+    "with_pivot": lambda f, call, put: call & (f["close"] > f["volatility_adjusted_pivot"]) | put & (f["close"] < f["volatility_adjusted_pivot"]),
+    "at_unfilled_gap": lambda f, call, put: call & (f["close"] - f["gap_below"] < f["atr"]) | put & (f["gap_above"] - f["close"] < f["atr"])
+}
+
+DIRECTION_MODES = ("any", "trading", "signed", "contrarian", "code")
+
+DEFAULT_RULES = (
+    # Technical Indicators
+    Rule("trend", None, "trading", None, None, None, 10, None),
+    Rule("rsi", "rsi", "contrarian", (30, 70), None, None, 8, None),
+    Rule("macd", None, "any", None, None, None, 10, "macd_aligned"),
+    Rule("bollinger", "bandwidth", "any", 0.015, None, None, 8, "inside_bands"),
+    Rule("adx", "adx", "any", 25, None, None, 8, None),
+    Rule("atr", None, "any", None, None, None, 8, "active_range"),
+
+    # Candle Psychology
+    Rule("trend_persistence", "trend_persistence", "signed", 50, "trend_persistence", 0.3, 15, None),
+    Rule("reversal_strength", "reversal_strength", "any", 70, "reversal_strength", 0.15, 10, "aligned_sentiment"),
+    Rule("volatility_clustering", "volatility_clustering", "any", 60, "volatility_clustering", 0.15, 8, None),
+    Rule("exhaustion_signal", "exhaustion_signal", "any", 80, "exhaustion_signal", 0.15, 10, "aligned_sentiment"),
+    Rule("fractal_momentum", "fractal_momentum", "signed", 1.5, "fractal_momentum", 3, 8, None),
+    Rule("mtf_correlation", "mtf_correlation", "signed", 70, "mtf_correlation", 0.15, 10, None),
+    Rule("psychological_pressure", "psychological_pressure", "any", 60, "psychological_pressure", 0.15, 8, None),
+    Rule("candle_entropy", "candle_entropy", "any", 70, None, None, 8, None),
+
+    # SMC
+    Rule("order_block", "ob_type", "code", None, "ob_confidence", 0.2, 15, "near_order_block"),
+    Rule("liquidity", "liq_direction", "code", None, "liq_confidence", 0.15, 10, None),
+    Rule("imbalance", "imb_direction", "code", None, "imb_confidence", 0.15, 10, "imbalance_side"),
+
+    # ICT
+    Rule("fair_value_gap", None, "any", None, "fvg_probability", 0.2, 15, "fvg_side"),
+    Rule("kill_zone", "kill_zone", "trading", 0, "kill_confidence", 0.15, 10, None),
+    Rule("power_of_three", "pot_pattern", "code", None, "pot_confidence", 0.15, 10, None),
+
+    # Patterns
+    Rule("pattern", None, "any", None, "pattern_confidence", 0.2, 15, "pattern_aligned"),
+
+    # Price Action
+    Rule("demand_zone", None, "any", None, "demand_strength", 0.2, 15, "at_demand"),
+    Rule("supply_zone", None, "any", None, "supply_strength", 0.2, 15, "at_supply"),
+    Rule("breakout_power", "breakout_power", "trading", 50, "breakout_power", 0.2, 15, None),
+    Rule("trend_strength", "trend_strength", "any", 70, "trend_strength", 0.15, 10, "trend_aligned"),
+    Rule("liquidity_sweep", "liq_sweep_type", "code", None, "liq_sweep_confidence", 0.2, 15, "near_sweep"),
+    Rule("price_rejection", "price_rejection_intensity", "any", 70, "price_rejection_intensity", 0.15, 10, "with_pivot"),
+    Rule("consolidation_breakout", "consolidation_breakout_potential", "trading", 80, "consolidation_breakout_potential", 0.15, 10, None),
+    Rule("impulse_wave", "impulse_wave_strength", "trading", 5, "impulse_wave_strength", 2, 10, None),
+    Rule("fibonacci_confluence", "fibonacci_confluence", "trading", 80, None, None, 10, None),
+    Rule("momentum_divergence", "momentum_divergence", "any", 50, None, None, -10, "with_pivot"),
+
+    # Gap index: an unfilled gap within one ATR behind a call (below) or a put (above)
+    Rule("unfilled_gap", None, "any", None, None, None, 10, "at_unfilled_gap")
+)
+
+class Scorer:
+    """
+    Confidence model compiled from a rule table, evaluated over feature
+    arrays of any shape: one asset, a batch of assets or every bar of a
+    history. Rules are added in table order, so the default table gives the
+    same floating point result as the original if/elif chain.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = tuple(rules)
+        for rule in self.rules:
+            if rule.direction not in DIRECTION_MODES:
+                raise ValueError(f"Rule {rule.name}: unknown direction {rule.direction!r}")
+            if rule.gate is not None and rule.gate not in GATES:
+                raise ValueError(f"Rule {rule.name}: unknown gate {rule.gate!r}")
+
+    def _fires(self, rule, f, call, put, trading):
+        value = f[rule.feature] if rule.feature is not None else None
+        if rule.direction == "code":
+            condition = (value == 1) & call | (value == -1) & put
+        elif rule.direction == "signed":
+            condition = (value > rule.threshold) & call | (value < -rule.threshold) & put
+        elif rule.direction == "contrarian":
+            condition = (value < rule.threshold[0]) & call | (value > rule.threshold[1]) & put
+        else:
+            condition = value > rule.threshold if value is not None else True
+            if rule.direction == "trading":
+                condition = condition & trading
+        if rule.gate is not None:
+            condition = condition & GATES[rule.gate](f, call, put)
+        return condition
+
+    def _points(self, rule, f):
+        if rule.points is None:
+            return rule.cap
+        value = np.abs(f[rule.points]) if rule.direction == "signed" else f[rule.points]
+        return np.fmin(rule.cap, value * rule.weight)
+
+    def __call__(self, f):
+        """
+        Args:
+            f: Feature dict from batch.compute_features or backtest.history_features
+        Returns:
+            Tuple of arrays: (direction coded 1 call, -1 put, 0 none; confidence 0-100)
+        """
+        close = f["close"]
+        call = (close > f["ema_short"]) & (f["ema_short"] > f["ema_long"])
+        put = ~call & (close < f["ema_short"]) & (f["ema_short"] < f["ema_long"])
+        trading = call | put
+        confidence = np.zeros(close.shape)
+        with np.errstate(invalid="ignore"):
+            for rule in self.rules:
+                confidence = confidence + np.where(self._fires(rule, f, call, put, trading), self._points(rule, f), 0)
+        direction = np.where(call, 1, np.where(put, -1, 0))
+        return direction, np.fmin(100, confidence)
+
+def load_rules(path, rules=DEFAULT_RULES):
+    """
+    Apply a weight set from a JSON file to a rule table.
+    The file maps rule names to the fields to override, e.g.
+    {"rsi": {"cap": 10}, "trend_persistence": {"weight": 0.25, "threshold": 40}}
+    Args:
+        path: JSON file path
+        rules: Rule table to start from (default DEFAULT_RULES)
+    Returns:
+        Tuple of Rule
+    """
+    with open(path) as f:
+        overrides = json.load(f)
+    return override_rules(overrides, rules)
+
+def override_rules(overrides, rules=DEFAULT_RULES):
+    """Return `rules` with {rule name: {field: value}} overrides applied."""
+    by_name = {rule.name: rule for rule in rules}
+    unknown = overrides.keys() - by_name.keys()
+    if unknown:
+        raise ValueError(f"Unknown scoring rules: {', '.join(sorted(unknown))}")
+    for name, fields in overrides.items():
+        if "threshold" in fields and isinstance(fields["threshold"], list):
+            fields = dict(fields, threshold=tuple(fields["threshold"]))
+        by_name[name] = by_name[name]._replace(**fields)
+    return tuple(by_name[rule.name] for rule in rules)
+
+score_features = Scorer()
+
+def load_scorer(path=SCORING_CONFIG):
+    """Scorer with the overrides in `path` applied, or the built-in rules when the file does not exist."""
+    return Scorer(load_rules(path)) if os.path.exists(path) else score_features
@@ -0,0 +1,390 @@
+# session_log.py
+import os
+import gzip
+import json
+import time
+import struct
+import asyncio
+import argparse
+import tempfile
+from collections import defaultdict, deque
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from candles import FIELDS
+from event_log import _json_default
+
+console = Console()
+
+# File layout (gzip stream):
+#   MAGIC, u32 header length, JSON header {"started", "settings", "max_assets", ...}
+#   records: RECORD header, JSON args, payload
+# RECORD: request number, seconds since start, duration, method code, encoding, args length, payload length
+# Records are written as requests complete; the request number is taken when each is made
+MAGIC = b"QXSESS2\n"
+RECORD = struct.Struct("<IddBBHI")
+METHODS = ("test_connection", "get_all_assets", "get_asset", "get_payout_by_asset", "get_candle", "get_balance",
+           "start_realtime_price", "get_realtime_price", "buy_and_check_win", "history")
+JSON, CANDLES, TICKS, ERROR = range(4)
+ERRORS = {"ConnectionError": ConnectionError, "TimeoutError": TimeoutError, "ValueError": ValueError, "KeyError": KeyError}
+
+def _encode(result):
+    # Candle and tick lists as packed float64 rows; everything else as JSON
+    if isinstance(result, list) and result and all(isinstance(item, dict) for item in result):
+        keys = set().union(*result)
+        if keys == set(FIELDS):
+            return CANDLES, np.array([[c[f] for f in FIELDS] for c in result], dtype=np.float64).tobytes()
+        if keys == {"time", "price"}:
+            return TICKS, np.array([(t["time"], t["price"]) for t in result], dtype=np.float64).tobytes()
+    return JSON, json.dumps(result, default=_json_default, separators=(",", ":")).encode()
+
+def _decode(encoding, payload):
+    if encoding == CANDLES:
+        return [dict(zip(FIELDS, row)) for row in np.frombuffer(payload, dtype=np.float64).reshape(-1, len(FIELDS)).tolist()]
+    if encoding == TICKS:
+        return [{"time": t, "price": p} for t, p in np.frombuffer(payload, dtype=np.float64).reshape(-1, 2).tolist()]
+    return json.loads(payload)
+
+class SessionWriter:
+    """Appends request/response records to a gzip-compressed binary session log."""
+
+    def __init__(self, path, header):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = gzip.open(path, "wb")
+        meta = json.dumps(header, default=_json_default).encode()
+        self.file.write(MAGIC + struct.pack("<I", len(meta)) + meta)
+        self.records = 0
+        self.requests = 0
+
+    def request(self):
+        """Number the next request, in the order requests are made."""
+        self.requests += 1
+        return self.requests - 1
+
+    def write(self, request, at, duration, method, args, result=None, error=None):
+        if error is not None:
+            encoding, payload = ERROR, json.dumps({"type": type(error).__name__, "message": str(error)}).encode()
+        else:
+            encoding, payload = _encode(result)
+        args = json.dumps(args, default=_json_default, separators=(",", ":")).encode()
+        self.file.write(RECORD.pack(request, at, duration, METHODS.index(method), encoding, len(args), len(payload)) + args + payload)
+        self.records += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def read_session(path):
+    """
+    Read a session log. A log cut short by a crash yields every complete record.
+    Returns:
+        Tuple: (header dict, list of (at, duration, method, args list, encoding, result)
+               in the order the requests were made)
+    """
+    records = []
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session log")
+        header = json.loads(f.read(struct.unpack("<I", f.read(4))[0]))
+        try:
+            while True:
+                head = f.read(RECORD.size)
+                if len(head) < RECORD.size:
+                    break
+                request, at, duration, code, encoding, args_length, payload_length = RECORD.unpack(head)
+                args = f.read(args_length)
+                payload = f.read(payload_length)
+                if len(args) < args_length or len(payload) < payload_length:
+                    break
+                records.append((request, (at, duration, METHODS[code], json.loads(args), encoding, _decode(encoding, payload))))
+        except EOFError:
+            pass  # Truncated stream
+    records.sort(key=lambda record: record[0])
+    return header, [record for _, record in records]
+
+class RecordingClient:
+    """
+    Wraps a Quotex client and logs every request it answers, with timing,
+    for ReplayClient. Attributes not in METHODS pass straight through.
+    """
+
+    def __init__(self, client, path, store=None, clock=time.time, header=None, history=120):
+        """
+        Args:
+            client: Quotex client to wrap
+            path: Session log file
+            store: CandleStore the session reads candle history from; the history of each
+                   asset is logged before its first get_candle so replay starts from the same window
+            clock: Wall-clock source of the session
+            header: Extra header fields, e.g. the trade settings
+            history: Candles of store history logged per asset
+        """
+        self.client = client
+        self.store = store
+        self.clock = clock
+        self.history = history
+        self.started = clock()
+        self.writer = SessionWriter(path, dict(header or {}, started=self.started))
+        self._seen_history = set()
+        self._last_tick = {}
+
+    def __getattr__(self, name):
+        if name not in METHODS:
+            return getattr(self.client, name)
+        method = getattr(self.client, name)
+
+        async def recorded(*args):
+            if name == "get_candle":
+                self._record_history(*args[:2])
+            request = self.writer.request()
+            started = self.clock()
+            try:
+                result = await method(*args)
+            except BaseException as e:  # Includes the cancellation of a timed-out request
+                self.writer.write(request, started - self.started, self.clock() - started, name, args, error=e)
+                raise
+            if name == "get_realtime_price":
+                self._record_ticks(request, started, args, result)
+            else:
+                self.writer.write(request, started - self.started, self.clock() - started, name, args, result)
+                if name == "buy_and_check_win":
+                    self.writer.flush()
+            return result
+
+        return recorded
+
+    def _record_history(self, asset, period):
+        if self.store is None or (asset, period) in self._seen_history:
+            return
+        self._seen_history.add((asset, period))
+        frame = self.store.tail(asset, period, self.history)
+        self.writer.write(self.writer.request(), self.clock() - self.started, 0.0, "history", [asset, period], frame.to_candles() if len(frame) else [])
+
+    def _record_ticks(self, request, started, args, result):
+        # Polled many times a second: log only ticks newer than the last logged one
+        prices = result if isinstance(result, list) else [result] if result else []
+        last = self._last_tick.get(args[0], 0)
+        new = [{"time": tick["time"], "price": tick["price"]} for tick in prices if tick["time"] > last]
+        if new:
+            self._last_tick[args[0]] = max(tick["time"] for tick in new)
+            self.writer.write(request, started - self.started, self.clock() - started, "get_realtime_price", args, new)
+
+    def close(self):
+        self.writer.close()
+
+class _SkippingSelector:
+    # Polls without blocking; when nothing is ready, moves the loop's clock to the next timer
+    def __init__(self, selector, loop):
+        self.selector = selector
+        self.loop = loop
+
+    def select(self, timeout=None):
+        events = self.selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            return self.selector.select(None)  # Nothing scheduled: wait for I/O or a worker thread
+        self.loop._now += timeout
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self.selector, name)
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop on a virtual clock starting at 0. Sleeps and timeouts complete
+    as soon as nothing else is ready, so a replay runs as fast as the CPU
+    allows and in the same order every time. Work handed to threads does not
+    hold the clock back; run analysis inline for exact replays.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._now = 0.0
+        self._selector = _SkippingSelector(self._selector, self)
+
+    def time(self):
+        return self._now
+
+class ReplayClient:
+    """
+    Answers the requests of a recorded session from its log, for runs on a
+    VirtualTimeLoop. Each request waits its recorded duration in virtual time.
+    Responses are matched per request, in the order requested: orders by
+    amount, asset, direction and duration, candles by asset and period (the requested count depends on the local store) and
+    everything else by its arguments. Realtime prices are served by time.
+    """
+
+    def __init__(self, path, store=None):
+        self.path = path
+        self.store = store
+        self.header, records = read_session(path)
+        self.started = self.header["started"]
+        self.end = max((at + duration for at, duration, *_ in records), default=0.0)
+        self.responses = defaultdict(deque)
+        self.ticks = defaultdict(deque)
+        self.history = {}
+        self.recorded_orders = []
+        self.orders = []
+        self.misses = 0
+        for at, duration, method, args, encoding, result in records:
+            if method == "history":
+                self.history[tuple(args)] = result
+            elif method == "get_realtime_price":
+                self.ticks[args[0]].append((at + duration, result))
+            else:
+                self.responses[self._key(method, args)].append((duration, encoding, result))
+                if method == "buy_and_check_win":
+                    self.recorded_orders.append((at, args, result))
+
+    @staticmethod
+    def _key(method, args):
+        if method == "get_candle":
+            return (method, *args[:2])
+        return (method, *args)
+
+    def time(self):
+        """Wall-clock time of the recorded session at the current virtual time."""
+        return self.started + asyncio.get_running_loop().time()
+
+    async def _respond(self, method, *args):
+        queue = self.responses.get(self._key(method, args))
+        if not queue:
+            self.misses += 1
+            raise LookupError(f"No recorded response for {method}{tuple(args)}")
+        duration, encoding, result = queue.popleft()
+        await asyncio.sleep(duration)
+        if encoding == ERROR:
+            if result["type"] == "CancelledError":
+                raise TimeoutError(result["message"])  # The live request was cut off by its timeout
+            raise ERRORS.get(result["type"], RuntimeError)(result["message"])
+        return result
+
+    async def test_connection(self):
+        return await self._respond("test_connection")
+
+    async def get_all_assets(self):
+        return await self._respond("get_all_assets")
+
+    async def get_asset(self, asset):
+        return await self._respond("get_asset", asset)
+
+    async def get_payout_by_asset(self, asset):
+        return await self._respond("get_payout_by_asset", asset)
+
+    async def get_candle(self, asset, period, count):
+        history = self.history.pop((asset, period), None)
+        if history and self.store is not None:
+            self.store.append(asset, period, history)
+        return await self._respond("get_candle", asset, period, count)
+
+    async def get_balance(self):
+        return await self._respond("get_balance")
+
+    async def start_realtime_price(self, asset, period):
+        return await self._respond("start_realtime_price", asset, period)
+
+    async def get_realtime_price(self, asset):
+        now = asyncio.get_running_loop().time()
+        queue = self.ticks.get(asset)
+        prices = []
+        while queue and queue[0][0] <= now:
+            prices.extend(queue.popleft()[1])
+        return prices
+
+    async def buy_and_check_win(self, amount, asset, direction, duration):
+        self.orders.append((asyncio.get_running_loop().time(), [amount, asset, direction, duration]))
+        status, result = await self._respond("buy_and_check_win", amount, asset, direction, duration)
+        return status, result
+
+    async def run(self, session):
+        """Run `session` until the virtual clock passes the end of the recording."""
+        task = asyncio.ensure_future(session)
+        done, _ = await asyncio.wait([task], timeout=self.end + 1.0)
+        if not done:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+def replay(path, track_latency=False):
+    """
+    Feed a session log back through main.smart_martingale_trade with analysis
+    inline and a scratch candle store, as fast as possible.
+    Returns:
+        ReplayClient with the recorded and replayed orders
+    """
+    import main as bot
+    from candle_store import CandleStore
+    from scheduler import CandleClock
+    from analysis_executor import AnalysisExecutor
+    from event_log import EventLog
+
+    store = CandleStore(tempfile.mkdtemp(prefix="replay_candles_"))
+    bot.SESSION_RECORDING = False
+    bot.latency.enabled = track_latency or bot.latency.enabled
+    client = ReplayClient(path, store)
+    runtime = bot.Runtime(store, EventLog(os.path.splitext(path)[0] + ".replay.jsonl"), AnalysisExecutor("inline"),
+                          CandleClock(bot.CANDLE_PERIOD, client.time, asyncio.sleep, spin=0))
+
+    loop = VirtualTimeLoop()
+    try:
+        loop.run_until_complete(client.run(bot.smart_martingale_trade(client, client.header["settings"], client.header["max_assets"], runtime)))
+        # Background tasks of the session (feed, asset cache, balance tracker) end with it, as under asyncio.run
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        loop.close()
+    return client
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded trading session from its session log.")
+    parser.add_argument("path", help="Session log (.qxs)")
+    parser.add_argument("--info", action="store_true", help="Only summarize the log")
+    parser.add_argument("--track-latency", action="store_true", help="Enable stage timers and export them on exit")
+    args = parser.parse_args()
+
+    if args.info:
+        header, records = read_session(args.path)
+        counts = defaultdict(int)
+        for record in records:
+            counts[record[2]] += 1
+        table = Table(title=f"{args.path} ({os.path.getsize(args.path):,} bytes)")
+        table.add_column("Request", style="cyan")
+        table.add_column("Count", justify="right")
+        for method, count in counts.items():
+            table.add_row(method, f"{count:,}")
+        console.print(header)
+        console.print(table)
+        return
+
+    started = time.perf_counter()
+    client = replay(args.path, args.track_latency)
+    elapsed = time.perf_counter() - started
+
+    table = Table(title=f"Orders ({client.end / 60:.1f} recorded minutes replayed in {elapsed:.1f}s)")
+    table.add_column("#", justify="right")
+    table.add_column("Recorded", style="cyan")
+    table.add_column("Replayed", style="magenta")
+    table.add_column("Match", justify="center")
+    for i in range(max(len(client.recorded_orders), len(client.orders))):
+        recorded = client.recorded_orders[i] if i < len(client.recorded_orders) else None
+        replayed = client.orders[i] if i < len(client.orders) else None
+        describe = lambda order: f"{order[0]:.1f}s {order[1][1]} {order[1][2]} ${order[1][0]:.2f}" if order else "-"
+        match = recorded is not None and replayed is not None and recorded[1] == replayed[1]
+        table.add_row(str(i + 1), describe(recorded), describe(replayed), "[green]yes[/green]" if match else "[red]no[/red]")
+    console.print(table)
+    if client.misses:
+        console.print(f"[yellow]{client.misses} requests had no recorded response[/yellow]")
+
+if __name__ == "__main__":
+    main()
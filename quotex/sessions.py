@@ -0,0 +1,109 @@
+# sessions.py
+import time
+import json
+import asyncio
+import argparse
+from balance_tracker import BalanceTracker
+from positions import PositionManager
+
+class Session:
+    """
+    Execution and risk state of one account: its client, balance tracker and
+    positions. Market data, asset metadata and analysis are shared by every
+    session of a run; only orders and balance requests go through `client`.
+    """
+
+    def __init__(self, client, base_bet, martingale=1.0, stop_loss=None, stop_profit=None, name=None,
+                 max_positions=3, martingale_steps=3, threshold=90, reconcile_interval=60.0, clock=time.time):
+        """
+        Args:
+            client: Quotex client of the account
+            base_bet, martingale, stop_loss, stop_profit: Trade settings, as entered in main.get_user_input
+            name: Label for the log and events (None for a single-session run)
+            max_positions, martingale_steps: See positions.PositionManager
+            threshold: Minimum signal confidence to trade
+            reconcile_interval: Seconds between balance checks against the API
+            clock: Wall-clock source of the run, which order expiry times are given in
+        """
+        self.name = name
+        self.client = client
+        self.threshold = threshold
+        self.tracker = BalanceTracker(client, reconcile_interval, clock)
+        self.positions = PositionManager(max_positions, base_bet, martingale, martingale_steps, stop_loss, stop_profit, self.tracker)
+
+    @property
+    def stopped(self):
+        return self.positions.stopped
+
+    @property
+    def prefix(self):
+        """Log prefix naming the session, empty for a single-session run."""
+        return f"[{self.name}] " if self.name else ""
+
+    @property
+    def tags(self):
+        """Extra event fields naming the session."""
+        return {"session": self.name} if self.name else {}
+
+    async def start(self):
+        await self.tracker.start()
+        self.positions.start()
+
+    def stop(self):
+        self.positions.stop()
+        self.tracker.stop()
+
+def load_configs(path):
+    """
+    Read a multi-session config file:
+    {"max_assets": 5, "sessions": [{"name": "main", "email": "...", "password": "...", "base_bet": 1,
+      "martingale": 2, "stop_loss": 50, "stop_profit": 50, "max_positions": 3, "threshold": 90}]}
+    Returns:
+        Tuple: (max_assets or None, list of session config dicts)
+    """
+    with open(path) as f:
+        config = json.load(f)
+    sessions = config["sessions"]
+    names = [session.get("name") for session in sessions]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError("Every session needs a unique name")
+    return config.get("max_assets"), sessions
+
+def build_session(config, client, reconcile_interval=60.0, clock=time.time):
+    """Session from one config dict; credentials in it are not used here."""
+    settings = {key: config[key] for key in ("base_bet", "martingale", "stop_loss", "stop_profit", "max_positions", "martingale_steps", "threshold") if key in config}
+    return Session(client, name=config["name"], reconcile_interval=reconcile_interval, clock=clock, **settings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several accounts or strategy settings in one process on shared market data.")
+    parser.add_argument("config", help="JSON file with the session list (see load_configs)")
+    parser.add_argument("--simulate", action="store_true", help="Trade every session against one local simulated exchange")
+    parser.add_argument("--speed", type=float, default=1.0, help="Simulated seconds per real second (default 1)")
+    parser.add_argument("--assets", type=int, default=100, help="Simulated assets (default 100)")
+    parser.add_argument("--event-log", help="Event log path (default: main.EVENT_LOG)")
+    args = parser.parse_args()
+
+    import main as bot
+    from event_log import EventLog
+    max_assets, configs = load_configs(args.config)
+    events = EventLog(args.event_log or bot.EVENT_LOG)
+    if args.simulate:
+        import tempfile
+        from candle_store import CandleStore
+        from scheduler import CandleClock
+        from simulator import SimulatedQuotex
+        market = SimulatedQuotex(assets=args.assets, speed=args.speed)
+        clients = [market.account(config.get("balance")) for config in configs]
+        runtime = bot.Runtime(store=CandleStore(tempfile.mkdtemp(prefix="sim_candles_")), events=events,
+                              clock=CandleClock(bot.CANDLE_PERIOD, market.clock.time, market.clock.sleep))
+    else:
+        clients = [bot.Quotex(email=config["email"], password=config["password"], lang="pt") for config in configs]
+        runtime = bot.Runtime(events=events)
+    sessions = [build_session(config, client, bot.BALANCE_RECONCILE_INTERVAL, runtime.clock.now) for config, client in zip(configs, clients)]
+    try:
+        asyncio.run(bot.trade_sessions(sessions, max_assets or bot.MAX_ASSETS, runtime))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
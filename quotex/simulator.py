@@ -0,0 +1,282 @@
+# simulator.py
+import os
+import copy
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from collections import Counter, deque
+import numpy as np
+from rich.console import Console
+from candles import CandleFrame, as_frame
+from synthetic import synthetic_frame
+
+console = Console()
+
+KNOTS = np.array([0.0, 15.0, 30.0, 59.0])  # Seconds into a candle of open, nearer extreme, farther extreme, close
+
+class SimClock:
+    """
+    Virtual wall clock that starts at `start` and runs `speed` times faster
+    than real time. sleep() takes virtual seconds.
+    """
+
+    def __init__(self, start=None, speed=1.0):
+        self.start = time.time() if start is None else start
+        self.speed = speed
+        self.origin = time.monotonic()
+
+    def time(self):
+        return self.start + (time.monotonic() - self.origin) * self.speed
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(max(0.0, seconds) / self.speed)
+
+class SimulatedQuotex:
+    """
+    In-process stand-in for quotexapi.stable_api.Quotex. Serves recorded or
+    synthetic 1-minute candles against a virtual clock, streams prices for the
+    realtime feed and settles orders from the same price path, so a session
+    runs offline and, with speed > 1, faster than real time.
+
+    Inside a candle the price moves linearly through open, nearer extreme,
+    farther extreme and close (the tick order of candle_feed.ReplaySource).
+    An asset closes when its candles run out.
+    """
+
+    def __init__(self, candles_by_asset=None, assets=100, minutes=1440, start_index=120, speed=1.0, seed=0,
+                 payouts=(70, 92), closed=0.1, balance=10000.0, latency=0.0, jitter=0.0, error_rate=0.0, tick_interval=1.0):
+        """
+        Args:
+            candles_by_asset: Dict of asset -> CandleFrame or list of candle dicts to replay (default: synthetic)
+            assets: Number of synthetic assets when no candles are given
+            minutes: Synthetic candles per asset after the first `start_index`
+            start_index: Candle of each series forming when the session starts; earlier candles are history
+            speed: Virtual seconds per real second
+            seed: Seed for synthetic prices, payouts, open status, latency and errors
+            payouts: Range of payout percentages assigned to assets
+            closed: Fraction of assets reported closed
+            balance: Starting account balance
+            latency: Real seconds added to every request
+            jitter: Extra random real seconds, up to this much, per request
+            error_rate: Probability that a request fails
+            tick_interval: Virtual seconds between realtime prices
+        """
+        if candles_by_asset is None:
+            candles_by_asset = {f"SIM{i:03d}_otc": synthetic_frame(start_index + minutes, seed + i) for i in range(assets)}
+        self.clock = SimClock(speed=speed)
+        self.anchor = self.clock.start - self.clock.start % 60  # Open time of candle `start_index`
+        self.start_index = start_index
+        self.frames = {}
+        for asset, candles in candles_by_asset.items():
+            frame = as_frame(candles)
+            self.frames[asset] = CandleFrame(frame.open, frame.high, frame.low, frame.close,
+                                             self.anchor + 60 * (np.arange(len(frame)) - start_index))
+
+        rng = random.Random(seed)
+        self.payouts = {asset: rng.randint(*payouts) for asset in self.frames}
+        self.closed = {asset for asset in self.frames if rng.random() < closed}
+        self.rng = rng
+        self.balance = balance
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tick_interval = tick_interval
+        self.ticks = {}  # Subscribed asset -> deque of {"time", "price"}
+        self.tick_time = {}  # Subscribed asset -> time of its newest tick
+        self.calls = Counter()  # Requests per method
+        self.orders = []
+
+    def account(self, balance=None):
+        """
+        Another account on the same market: shares candles, clock and payouts,
+        with its own balance, orders and request counts.
+        """
+        other = copy.copy(self)
+        other.balance = self.balance if balance is None else balance
+        other.ticks = {}
+        other.tick_time = {}
+        other.calls = Counter()
+        other.orders = []
+        return other
+
+    async def _request(self, method):
+        self.calls[method] += 1
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise ConnectionError(f"Simulated {method} failure")
+
+    def _index(self, timestamp):
+        return int((timestamp - self.anchor) // 60) + self.start_index
+
+    def _is_open(self, asset, timestamp=None):
+        frame = self.frames.get(asset)
+        if frame is None or asset in self.closed:
+            return False
+        return self._index(self.clock.time() if timestamp is None else timestamp) < len(frame)
+
+    def _knots(self, frame, index):
+        bullish = frame.close[index] >= frame.open[index]
+        first = np.where(bullish, frame.low[index], frame.high[index])
+        second = np.where(bullish, frame.high[index], frame.low[index])
+        return np.stack([frame.open[index], first, second, frame.close[index]], axis=-1)
+
+    def prices(self, asset, timestamps):
+        """Prices of an asset at an array of virtual times, from the candle price path."""
+        frame = self.frames[asset]
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        index = np.clip(((timestamps - self.anchor) // 60).astype(np.int64) + self.start_index, 0, len(frame) - 1)
+        elapsed = np.clip(timestamps - frame.time[index], 0, KNOTS[-1])
+        segment = np.clip(np.searchsorted(KNOTS, elapsed, side="right") - 1, 0, len(KNOTS) - 2)
+        weight = (elapsed - KNOTS[segment]) / (KNOTS[segment + 1] - KNOTS[segment])
+        knots = self._knots(frame, index)
+        start = np.take_along_axis(knots, segment[..., None], -1)[..., 0]
+        end = np.take_along_axis(knots, segment[..., None] + 1, -1)[..., 0]
+        return start + weight * (end - start)
+
+    def price(self, asset, timestamp=None):
+        return float(self.prices(asset, self.clock.time() if timestamp is None else timestamp))
+
+    def _forming(self, asset, index, now):
+        # The current candle as far as it has traded
+        frame = self.frames[asset]
+        elapsed = now - frame.time[index]
+        price = self.price(asset, now)
+        seen = np.r_[self._knots(frame, index)[KNOTS <= elapsed], price]
+        return {"open": float(frame.open[index]), "high": float(seen.max()), "low": float(seen.min()), "close": price, "time": float(frame.time[index])}
+
+    async def test_connection(self):
+        await self._request("test_connection")
+        return True
+
+    async def get_all_assets(self):
+        await self._request("get_all_assets")
+        return list(self.frames)
+
+    async def get_asset(self, asset):
+        await self._request("get_asset")
+        if asset not in self.frames:
+            return None
+        return {"asset": asset, "is_open": self._is_open(asset)}
+
+    async def get_payout_by_asset(self, asset):
+        await self._request("get_payout_by_asset")
+        if not self._is_open(asset):
+            return None
+        return {"turbo": {"profit": self.payouts[asset]}}
+
+    async def get_candle(self, asset, period, count):
+        await self._request("get_candle")
+        if period != 60:
+            raise ValueError(f"Simulated candles are 60s, not {period}s")
+        frame = self.frames[asset]
+        now = self.clock.time()
+        index = min(self._index(now), len(frame))
+        candles = frame[max(0, index - count + 1):index].to_candles()
+        if index < len(frame):
+            candles.append(self._forming(asset, index, now))
+        return candles[-count:]
+
+    async def get_balance(self):
+        await self._request("get_balance")
+        return self.balance
+
+    async def start_realtime_price(self, asset, period):
+        await self._request("start_realtime_price")
+        self.ticks.setdefault(asset, deque(maxlen=256))
+        self.tick_time.setdefault(asset, self.clock.time())
+
+    async def get_realtime_price(self, asset):
+        # Prices since the previous call on a fixed virtual grid, like the websocket buffer
+        buffer = self.ticks.get(asset)
+        if buffer is None:
+            return []
+        now = self.clock.time()
+        if not self._is_open(asset, now):
+            return list(buffer)
+        times = np.arange(self.tick_time[asset] + self.tick_interval, now, self.tick_interval)[-buffer.maxlen:]
+        if len(times):
+            buffer.extend({"time": float(t), "price": float(p)} for t, p in zip(times, self.prices(asset, times)))
+            self.tick_time[asset] = float(times[-1])
+        return list(buffer)
+
+    async def buy_and_check_win(self, amount, asset, direction, duration):
+        """
+        Open an option and wait, in virtual time, until it settles.
+        Returns:
+            Tuple: (status, result dict with win and profit) or (False, reason)
+        """
+        try:
+            await self._request("buy_and_check_win")
+        except ConnectionError as e:
+            return False, str(e)
+        if not self._is_open(asset):
+            return False, f"{asset} is closed"
+        if amount > self.balance:
+            return False, "Insufficient balance"
+
+        opened = self.clock.time()
+        entry = self.price(asset, opened)
+        self.balance -= amount
+        await self.clock.sleep(opened + duration - self.clock.time())
+        close = self.price(asset, opened + duration)
+
+        moved = close - entry if direction == "call" else entry - close
+        profit = round(amount * self.payouts[asset] / 100, 2) if moved > 0 else 0.0 if moved == 0 else -amount
+        self.balance += amount + profit
+        order = {"asset": asset, "direction": direction, "amount": amount, "open_time": opened, "open_price": entry,
+                 "close_price": close, "win": moved > 0, "profit": profit}
+        self.orders.append(order)
+        return True, order
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the trading session against a local simulated exchange.")
+    parser.add_argument("sources", nargs="*", help="candles.json, candles.csv or asset code in the candle store to replay (default: synthetic)")
+    parser.add_argument("--assets", type=int, default=100, help="Synthetic assets (default 100)")
+    parser.add_argument("--max-assets", type=int, default=3, help="Assets traded at once (default 3)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Virtual seconds per real second (default 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request (default 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds per request, up to this much (default 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability that a request fails (default 0)")
+    parser.add_argument("--balance", type=float, default=10000.0, help="Starting balance (default 10000)")
+    parser.add_argument("--bet", type=float, default=1.0, help="Base bet (default 1)")
+    parser.add_argument("--martingale", type=float, default=2.0, help="Martingale multiplier (default 2)")
+    parser.add_argument("--stop-loss", type=float, default=100.0, help="Stop loss (default 100)")
+    parser.add_argument("--stop-profit", type=float, default=100.0, help="Stop profit (default 100)")
+    parser.add_argument("--track-latency", action="store_true", help="Enable stage timers and export them on exit")
+    parser.add_argument("--event-log", help="Event log path (default: main.EVENT_LOG)")
+    args = parser.parse_args()
+
+    candles = None
+    if args.sources:
+        from backtest import load_candles
+        candles = {os.path.splitext(os.path.basename(source))[0]: load_candles(source) for source in args.sources}
+    client = SimulatedQuotex(candles, args.assets, speed=args.speed, seed=args.seed, balance=args.balance,
+                             latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+
+    import main as bot
+    from candle_store import CandleStore
+    from event_log import EventLog
+    from scheduler import CandleClock
+    runtime = bot.Runtime(store=CandleStore(tempfile.mkdtemp(prefix="sim_candles_")),  # Keep synthetic candles out of the real store
+                          events=EventLog(args.event_log or bot.EVENT_LOG),
+                          clock=CandleClock(bot.CANDLE_PERIOD, client.clock.time, client.clock.sleep))
+    bot.latency.enabled = args.track_latency or bot.latency.enabled
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(bot.smart_martingale_trade(client, (args.bet, args.martingale, args.stop_loss, args.stop_profit), args.max_assets, runtime))
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - started
+    wins = sum(order["win"] for order in client.orders)
+    console.print(f"[cyan]{elapsed:.1f}s real, {elapsed * args.speed / 60:.1f} simulated minutes, "
+                  f"{len(client.orders)} orders ({wins} won), balance {client.balance:,.2f}, "
+                  f"{sum(client.calls.values()):,} requests[/cyan]")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,86 @@
 import numpy as np
+from candles import CandleFrame, as_frame
+
+DIRECTIONS = {1: "bullish", -1: "bearish", 0: None}
+
+def _first_gap(highs, lows, span=3):
+    """
+    Locate the first three-candle gap in each row.
+    Returns:
+        Tuple of arrays: (found, index, is_gap_up) for the earliest gap per row
+    """
+    count = highs.shape[-1] - span
+    gap_up = highs[:, :count] < lows[:, 2:count + 2]
+    gap_down = lows[:, :count] > highs[:, 2:count + 2]
+    gaps = gap_up | gap_down
+    index = gaps.argmax(axis=-1)
+    rows = np.arange(highs.shape[0])
+    return gaps.any(axis=-1), index, gap_up[rows, index]
+
+def analyze_smc_batch(frame, lookback=50):
+    """
+    Vectorized SMC metrics over a stacked (asset x time) frame.
+    Args:
+        frame: 2-D CandleFrame with at least `lookback` candles per row
+        lookback: Number of candles to analyze (default 50)
+    Returns:
+        Dict of per-row arrays; directions are coded 1 bullish, -1 bearish, 0 none
+        and missing levels are NaN
+    """
+    frame = frame[-lookback:]
+    highs = frame.high
+    lows = frame.low
+    closes = frame.close
+    rows = np.arange(closes.shape[0])
+
+    # 1. Order Block (significant support/resistance zones)
+    trend = np.mean(np.diff(closes[:, -20:-1], axis=-1), axis=-1)  # Trend over last 19 candles
+    latest_close = closes[:, -1]
+    rejection_low = lows[:, -5:].min(axis=-1)  # Strong rejection low in last 5
+    rejection_high = highs[:, -5:].max(axis=-1)  # Strong rejection high
+    bullish_ob = (trend > 0) & (latest_close > rejection_low)
+    bearish_ob = (trend < 0) & (latest_close < rejection_high)
+    ob_level = np.where(bullish_ob, rejection_low, np.where(bearish_ob, rejection_high, np.nan))
+    ob_type = np.where(bullish_ob, 1, np.where(bearish_ob, -1, 0))
+    ob_confidence = np.where(bullish_ob | bearish_ob, np.fmin(100, 75 + np.abs(trend) * 1000), 0)
+
+    # 2. Liquidity Grab (stop-loss hunting)
+    liq_highs = highs[:, -10:]
+    liq_lows = lows[:, -10:]
+    liq_closes = closes[:, -10:]
+    bearish_grab = (liq_highs[:, -1] > liq_highs[:, :-1].max(axis=-1)) & (liq_closes[:, -1] < liq_closes[:, -2])  # Sweep highs, close lower
+    bullish_grab = (liq_lows[:, -1] < liq_lows[:, :-1].min(axis=-1)) & (liq_closes[:, -1] > liq_closes[:, -2])  # Sweep lows, close higher
+    liq_direction = np.where(bearish_grab, -1, np.where(bullish_grab, 1, 0))
+    liq_confidence = np.where(liq_direction != 0, 80, 0)
+
+    # 3. Imbalance (unfilled price gaps)
+    imb_highs = highs[:, -10:]
+    imb_lows = lows[:, -10:]
+    found, i, gap_up = _first_gap(imb_highs, imb_lows)
+    imb_direction = np.where(found, np.where(gap_up, 1, -1), 0)
+    imb_level = np.where(gap_up, (imb_highs[rows, i] + imb_lows[rows, i + 2]) / 2, (imb_lows[rows, i] + imb_highs[rows, i + 2]) / 2)
+    imb_level = np.where(found, imb_level, np.nan)
+    imb_confidence = np.where(found, 85, 0)
+
+    return {
+        "ob_level": ob_level,
+        "ob_type": ob_type,
+        "ob_confidence": ob_confidence,
+        "liq_direction": liq_direction,
+        "liq_confidence": liq_confidence,
+        "imb_direction": imb_direction,
+        "imb_level": imb_level,
+        "imb_confidence": imb_confidence
+    }
+
+def _level(value):
+    return None if np.isnan(value) else value
 
 def analyze_smc(candles, lookback=50):
     """
     Ultimate SMC calculations focusing on institutional price action.
     Args:
-        candles: List of dicts with 'open', 'high', 'low', 'close'
+        candles: CandleFrame or list of dicts with 'open', 'high', 'low', 'close'
         lookback: Number of candles to analyze (default 50)
     Returns:
         Dict with SMC metrics
@@ -16,64 +92,9 @@ def analyze_smc(candles, lookback=50):
             "imbalance": {"direction": None, "level": None, "confidence": 0}
         }
 
-    # Extract OHLC data
-    opens = np.array([c["open"] for c in candles[-lookback:]])
-    highs = np.array([c["high"] for c in candles[-lookback:]])
-    lows = np.array([c["low"] for c in candles[-lookback:]])
-    closes = np.array([c["close"] for c in candles[-lookback:]])
-
-    # 1. Order Block (significant support/resistance zones)
-    trend = np.mean(np.diff(closes[-20:-1]))  # Trend over last 19 candles
-    latest_close = closes[-1]
-    if trend > 0:  # Bullish trend
-        ob_idx = np.argmin(lows[-5:])  # Strong rejection low in last 5
-        if latest_close > lows[-5:][ob_idx]:
-            ob_level = lows[-5:][ob_idx]
-            ob_confidence = min(100, 75 + abs(trend) * 1000)
-            ob_type = "bullish"
-        else:
-            ob_level, ob_type, ob_confidence = None, None, 0
-    elif trend < 0:  # Bearish trend
-        ob_idx = np.argmax(highs[-5:])  # Strong rejection high
-        if latest_close < highs[-5:][ob_idx]:
-            ob_level = highs[-5:][ob_idx]
-            ob_confidence = min(100, 75 + abs(trend) * 1000)
-            ob_type = "bearish"
-        else:
-            ob_level, ob_type, ob_confidence = None, None, 0
-    else:
-        ob_level, ob_type, ob_confidence = None, None, 0
-
-    # 2. Liquidity Grab (stop-loss hunting)
-    liq_highs = highs[-10:]
-    liq_lows = lows[-10:]
-    liq_closes = closes[-10:]
-    if liq_highs[-1] > max(liq_highs[:-1]) and liq_closes[-1] < liq_closes[-2]:  # Sweep highs, close lower
-        liq_direction, liq_confidence = "bearish", 80
-    elif liq_lows[-1] < min(liq_lows[:-1]) and liq_closes[-1] > liq_closes[-2]:  # Sweep lows, close higher
-        liq_direction, liq_confidence = "bullish", 80
-    else:
-        liq_direction, liq_confidence = None, 0
-
-    # 3. Imbalance (unfilled price gaps)
-    imb_highs = highs[-10:]
-    imb_lows = lows[-10:]
-    for i in range(len(imb_highs) - 3):
-        if imb_highs[i] < imb_lows[i + 2]:  # Gap up
-            imb_direction = "bullish"
-            imb_level = (imb_highs[i] + imb_lows[i + 2]) / 2
-            imb_confidence = 85
-            break
-        elif imb_lows[i] > imb_highs[i + 2]:  # Gap down
-            imb_direction = "bearish"
-            imb_level = (imb_lows[i] + imb_highs[i + 2]) / 2
-            imb_confidence = 85
-            break
-    else:
-        imb_direction, imb_level, imb_confidence = None, None, 0
-
+    smc = {key: values[0] for key, values in analyze_smc_batch(CandleFrame.stack([as_frame(candles)], lookback), lookback).items()}
     return {
-        "order_block": {"level": ob_level, "type": ob_type, "confidence": ob_confidence},
-        "liquidity_grab": {"direction": liq_direction, "confidence": liq_confidence},
-        "imbalance": {"direction": imb_direction, "level": imb_level, "confidence": imb_confidence}
-    }
\ No newline at end of file
+        "order_block": {"level": _level(smc["ob_level"]), "type": DIRECTIONS[int(smc["ob_type"])], "confidence": smc["ob_confidence"]},
+        "liquidity_grab": {"direction": DIRECTIONS[int(smc["liq_direction"])], "confidence": smc["liq_confidence"]},
+        "imbalance": {"direction": DIRECTIONS[int(smc["imb_direction"])], "level": _level(smc["imb_level"]), "confidence": smc["imb_confidence"]}
+    }
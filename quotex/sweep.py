@@ -0,0 +1,153 @@
+# sweep.py
+import os
+import json
+import time
+import random
+import argparse
+import itertools
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from backtest import LEDGER_DTYPE, load_candles, history_features, settle_portfolio, summarize
+from candles import as_frame
+from scoring import Scorer, override_rules, score_features
+
+console = Console()
+
+# Parameter space: a list is a set of choices, {"uniform": [low, high]} a
+# continuous range for random sampling. Keys other than the
+# settle_portfolio arguments (threshold, martingale, max_positions, ...)
+# address rule fields as "rule.<name>.<field>".
+DEFAULT_SPACE = {
+    "threshold": [70, 75, 80, 85, 90, 95],
+    "martingale": [1.0, 1.5, 2.0, 2.5],
+    "max_positions": [1, 2, 3]  # Positions open at once across assets, main.MAX_POSITIONS live
+}
+
+_data = None  # Asset -> (frame, features), set once per worker process
+
+def grid(space):
+    """Every combination of the choices in `space`."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def sample(space, count, seed=None):
+    """`count` random parameter sets drawn from `space`."""
+    rng = random.Random(seed)
+
+    def draw(values):
+        if isinstance(values, dict):
+            return rng.uniform(*values["uniform"])
+        return rng.choice(values)
+
+    return [{name: draw(values) for name, values in space.items()} for _ in range(count)]
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+def evaluate(params, data=None, balance=None, **settle_kwargs):
+    """
+    Score every asset's history under one parameter set and settle the
+    signals as one account, with the live session's shared stake and
+    position limit.
+    Args:
+        params: Dict of settle_portfolio arguments and "rule.<name>.<field>" values
+        data: Asset -> (frame, history_features) (default: the worker's shared copy)
+        balance: Starting balance; stakes that no longer fit in it are not placed (None: no limit, start at 0)
+        settle_kwargs: Fixed settle_portfolio arguments (payout, base_bet, max_steps, stop_loss, ...)
+    Returns:
+        summarize() dict of the account's trades
+    """
+    data = _data if data is None else data
+    rules = {}
+    trade = {}
+    for key, value in params.items():
+        if key.startswith("rule."):
+            _, name, field = key.split(".")
+            rules.setdefault(name, {})[field] = value
+        else:
+            trade[key] = value
+    scorer = Scorer(override_rules(rules)) if rules else score_features
+
+    signals = {asset: (frame, features["time"], *scorer(features)) for asset, (frame, features) in data.items()}
+    ledger = settle_portfolio(signals, balance=balance, **{**settle_kwargs, **trade})
+    return summarize(ledger, 0.0 if balance is None else balance)
+
+def run_sweep(candles_by_asset, configs, workers=None, **settle_kwargs):
+    """
+    Evaluate many parameter sets against stored history on all CPU cores.
+    Features are computed once per asset and shared by every parameter set.
+    Args:
+        candles_by_asset: Dict of asset -> CandleFrame or list of candle dicts
+        configs: List of parameter dicts (see grid and sample)
+        workers: Worker processes (default: os.cpu_count(); 1 runs inline)
+        settle_kwargs: Fixed evaluate arguments (balance, payout, base_bet, max_steps, stop_loss, stop_profit, expiry)
+    Returns:
+        List of (params, summary) in the order of `configs`
+    """
+    data = {}
+    for asset, candles in candles_by_asset.items():
+        frame = as_frame(candles)
+        features = history_features(frame)
+        if features:
+            data[asset] = (frame, features)
+    if not data:
+        return [(params, summarize(np.zeros(0, dtype=LEDGER_DTYPE), settle_kwargs.get("balance") or 0.0)) for params in configs]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        summaries = [evaluate(params, data, **settle_kwargs) for params in configs]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data,)) as pool:
+            chunksize = max(1, len(configs) // (workers * 4))
+            summaries = list(pool.map(partial(evaluate, **settle_kwargs), configs, chunksize=chunksize))
+    return list(zip(configs, summaries))
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep trading parameters over stored candle history.")
+    parser.add_argument("sources", nargs="+", help="candles.json, candles.csv or asset code in the candle store")
+    parser.add_argument("--space", help="JSON file with the parameter space (default: threshold x martingale x max_positions grid)")
+    parser.add_argument("--samples", type=int, help="Random samples instead of the full grid")
+    parser.add_argument("--seed", type=int, help="Random seed for --samples")
+    parser.add_argument("--payout", type=float, default=80, help="Payout percentage (default 80)")
+    parser.add_argument("--balance", type=float, help="Starting balance; stakes that do not fit are skipped (default: no limit, start at 0)")
+    parser.add_argument("--bet", type=float, default=1.0, help="Base bet (default 1)")
+    parser.add_argument("--stop-loss", type=float, help="Realized loss that stops new positions (default: none)")
+    parser.add_argument("--stop-profit", type=float, help="Realized profit that stops new positions (default: none)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show (default 20)")
+    parser.add_argument("--out", help="Write every result to this JSON file")
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    configs = sample(space, args.samples, args.seed) if args.samples else grid(space)
+
+    started = time.perf_counter()
+    results = run_sweep({source: load_candles(source) for source in args.sources}, configs, args.workers, payout=args.payout,
+                        balance=args.balance, base_bet=args.bet, stop_loss=args.stop_loss, stop_profit=args.stop_profit)
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda result: result[1]["ev_per_trade"], reverse=True)
+
+    table = Table(title=f"Parameter Sweep ({len(configs)} configurations, {elapsed:.1f}s)")
+    table.add_column("#", justify="right")
+    table.add_column("Parameters", style="cyan")
+    for column in ("Trades", "Win Rate", "EV/Trade", "Net Profit", "Max Drawdown", "Final Balance"):
+        table.add_column(column, style="magenta", justify="right")
+    for rank, (params, summary) in enumerate(results[:args.top], 1):
+        table.add_row(str(rank), ", ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in params.items()),
+                      f"{summary['trades']:,}", f"{summary['win_rate']:.1f}%", f"{summary['ev_per_trade']:.3f}",
+                      f"{summary['net_profit']:,.2f}", f"{summary['max_drawdown']:,.2f}", f"{summary['final_balance']:,.2f}")
+    console.print(table)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump([{"params": params, "summary": summary} for params, summary in results], f, indent=2)
+
+if __name__ == "__main__":
+    main()
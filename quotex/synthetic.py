@@ -0,0 +1,20 @@
+# synthetic.py
+import numpy as np
+from candles import CandleFrame
+
+START_TIME = 1_700_000_040  # Minute-aligned
+
+def synthetic_frame(length, seed=0):
+    """
+    Deterministic 1-minute candles: a random walk whose volatility and drift
+    switch between regimes, so trend, range and reversal branches all run.
+    """
+    rng = np.random.default_rng(seed)
+    regime = rng.integers(0, 3, length // 25 + 1).repeat(25)[:length]
+    volatility = np.array([0.02, 0.05, 0.15])[regime]
+    drift = np.array([0.0, 0.01, -0.01])[regime]
+    close = 100 + np.cumsum(rng.normal(drift, volatility))
+    open = np.r_[close[0], close[:-1]] + rng.normal(0, volatility / 4)
+    high = np.maximum(open, close) + np.abs(rng.normal(0, volatility / 2))
+    low = np.minimum(open, close) - np.abs(rng.normal(0, volatility / 2))
+    return CandleFrame(open, high, low, close, START_TIME + 60 * np.arange(length))
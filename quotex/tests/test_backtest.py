@@ -0,0 +1,58 @@
+import numpy as np
+from backtest import history_features, run_backtest, settle_portfolio
+from candles import CandleFrame
+from scoring import score_features
+from synthetic import synthetic_frame
+
+def rising(length, start=0.0):
+    # Every close above the last, so every call wins
+    close = 100 + np.arange(length, dtype=np.float64)
+    return CandleFrame(close, close + 0.5, close - 0.5, close, start + 60 * np.arange(length))
+
+def signals_on(frame, bars, direction=1, confidence=95.0):
+    directions = np.zeros(len(frame), dtype=np.int8)
+    confidences = np.zeros(len(frame))
+    directions[bars] = direction
+    confidences[bars] = confidence
+    return frame, frame.time, directions, confidences
+
+def test_a_position_blocks_its_asset_until_it_settles():
+    frame = rising(10)
+    ledger = settle_portfolio({"A": signals_on(frame, [0, 1, 2, 3])})
+    # Opened at bar 0, still open at the scan of bar 1, settled before bar 2's
+    assert ledger["time"].tolist() == [frame.time[0], frame.time[2]]
+
+def test_positions_are_shared_across_assets_strongest_first():
+    signals = {asset: signals_on(rising(5), [0], confidence=confidence) for asset, confidence in (("A", 91), ("B", 99), ("C", 95))}
+    ledger = settle_portfolio(signals, max_positions=2)
+    assert ledger["confidence"].tolist() == [99, 95]
+
+def test_stake_and_stops_are_shared():
+    losing = {asset: signals_on(rising(6), [0, 2, 4], direction=-1) for asset in "AB"}
+    ledger = settle_portfolio(losing, max_positions=2, martingale=2.0, max_steps=3, stop_loss=6.0)
+    # Both losses at 1 escalate the shared stake twice; the next close opens both at 4, and the loss limit stops the rest
+    assert ledger["amount"].tolist() == [1.0, 1.0, 4.0, 4.0]
+    assert ledger["balance"].tolist() == [-1.0, -2.0, -6.0, -10.0]
+
+def test_run_backtest_settles_like_settle_portfolio():
+    frame = synthetic_frame(800, 7)
+    features = history_features(frame)
+    direction, confidence = score_features(features)
+    expected = settle_portfolio({"asset": (frame, features["time"], direction, confidence)}, threshold=60, stop_loss=5.0)
+    ledger, summary = run_backtest(frame, threshold=60, stop_loss=5.0, features=features)
+    assert np.array_equal(ledger, expected) and summary["trades"] == len(expected) > 0
+
+def test_run_backtest_trades_several_assets_as_one_account():
+    frames = {f"A{seed}": synthetic_frame(600, seed) for seed in range(3)}
+    _, alone = run_backtest(frames["A0"], threshold=60)
+    ledger, summary = run_backtest(frames, threshold=60, max_positions=1)
+    assert summary["bars"] == 3 * alone["bars"]
+    assert np.all(np.diff(ledger["time"]) >= 120)  # One position at a time across every asset
+
+def test_stakes_must_fit_in_the_balance_left():
+    losing = {asset: signals_on(rising(8), [0, 2, 4, 6], direction=-1) for asset in "AB"}
+    ledger = settle_portfolio(losing, max_positions=2, martingale=2.0, max_steps=5, balance=7.0)
+    # 1 + 1 lost leaves 5: one stake of 4 fits, the second does not; after it loses, 1 left and the stake is 8
+    assert ledger["amount"].tolist() == [1.0, 1.0, 4.0]
+    assert ledger["balance"][-1] == 1.0
+    assert len(settle_portfolio(losing, max_positions=2, martingale=2.0, max_steps=5)) == 8  # No balance, no limit
@@ -0,0 +1,29 @@
+import math
+import asyncio
+from candle_feed import CandleFeed, ReplaySource
+from candle_store import CandleStore
+from synthetic import synthetic_frame
+
+def test_replayed_candles_fill_the_window_and_reach_listeners(tmp_path):
+    frame = synthetic_frame(16)
+    store = CandleStore(str(tmp_path))
+    feed = CandleFeed(ReplaySource({"A": frame}, start_index=10, speed=math.inf), window=20, store=store)
+    calls = []
+
+    def listener(asset, candle, closed):
+        stored = store.tail(asset, 60, 1)
+        calls.append((asset, dict(candle), closed, stored.time[-1] if len(stored) else None))
+    feed.add_listener(listener)
+
+    async def session():
+        await feed.subscribe("A")
+        await feed.run()  # Returns once the replay runs out of ticks
+    asyncio.run(session())
+
+    candles = frame.to_candles()
+    assert feed.frame("A").to_candles() == candles
+    closed = [call for call in calls if call[2]]
+    assert [candle for _, candle, _, _ in closed] == candles[9:15]  # The last history candle closes on the first tick
+    assert all(stored == candle["time"] for _, candle, _, stored in closed)  # Persisted before listeners hear of it
+    assert len(calls) - len(closed) == 4 * 6  # Open, two extremes and close of each replayed candle
+    assert store.read("A", 60).to_candles() == candles[:15]
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pytest
+from candle_store import RECORD_DTYPE, CandleStore
+
+def candles(start, count, close=1.0):
+    return [{"time": 60.0 * (start + i), "open": 1.0, "high": 2.0, "low": 0.5, "close": close + i} for i in range(count)]
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+def test_append_is_idempotent(store):
+    assert store.append("EURUSD", 60, candles(0, 10)) == 10
+    assert store.append("EURUSD", 60, candles(0, 10)) == 0
+    assert store.count("EURUSD", 60) == 10
+    assert store.read("EURUSD", 60).close.tolist() == [1.0 + i for i in range(10)]
+
+def test_overlapping_append_adds_only_new_candles(store):
+    store.append("EURUSD", 60, candles(0, 10))
+    assert store.append("EURUSD", 60, candles(5, 10)) == 5
+    assert np.array_equal(store.read("EURUSD", 60).time, 60.0 * np.arange(15))
+
+def test_newest_candle_is_replaced_by_its_final_values(store):
+    store.append("EURUSD", 60, candles(0, 3))
+    forming = candles(2, 1, close=9.0)
+    assert store.append("EURUSD", 60, forming) == 0
+    assert store.count("EURUSD", 60) == 3
+    assert store.read("EURUSD", 60).close[-1] == 9.0
+
+def test_older_candles_are_never_rewritten(store):
+    store.append("EURUSD", 60, candles(0, 3))
+    store.append("EURUSD", 60, candles(0, 1, close=9.0))
+    assert store.read("EURUSD", 60).close[0] == 1.0
+
+def test_last_duplicate_in_a_batch_wins(store):
+    batch = candles(0, 2) + candles(1, 1, close=7.0)
+    assert store.append("EURUSD", 60, batch) == 2
+    assert store.read("EURUSD", 60).close.tolist() == [1.0, 7.0]
+
+def test_torn_record_is_dropped_before_appending(store):
+    store.append("EURUSD", 60, candles(0, 2))
+    with open(store.path("EURUSD", 60), "ab") as f:
+        f.write(b"\0" * (RECORD_DTYPE.itemsize // 2))
+    assert store.append("EURUSD", 60, candles(2, 1)) == 1
+    assert os.path.getsize(store.path("EURUSD", 60)) == 3 * RECORD_DTYPE.itemsize
+    assert np.array_equal(store.read("EURUSD", 60).time, 60.0 * np.arange(3))
+
+def test_tail_contiguous_stops_at_the_latest_gap(store):
+    store.append("EURUSD", 60, candles(0, 5) + candles(10, 5))
+    assert len(store.tail("EURUSD", 60, 8)) == 8
+    assert np.array_equal(store.tail("EURUSD", 60, 8, contiguous=True).time, 60.0 * np.arange(10, 15))
+
+def test_fetch_count_refetches_the_newest_candle(store):
+    assert store.fetch_count("EURUSD", 60, 600.0, 120) == 120
+    store.append("EURUSD", 60, candles(0, 5))
+    assert store.fetch_count("EURUSD", 60, 4 * 60.0 + 30, 120) == 2
+    assert store.fetch_count("EURUSD", 60, 10 * 60.0, 120) == 8
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from candles import FIELDS, CandleFrame, as_frame
+
+def candle_dicts(count, start=0, time=True):
+    candles = []
+    for i in range(start, start + count):
+        candle = {"open": 1.0 + i, "high": 2.0 + i, "low": 0.5 + i, "close": 1.5 + i}
+        if time:
+            candle["time"] = 60.0 * i
+        candles.append(candle)
+    return candles
+
+@pytest.mark.parametrize("count", [0, 1, 2, 50])
+def test_round_trip_through_candle_dicts(count):
+    candles = candle_dicts(count)
+    frame = CandleFrame.from_candles(candles)
+    assert len(frame) == count and frame.shape == (count,)
+    assert frame.to_candles() == candles
+    assert all(getattr(frame, field).dtype == np.float64 for field in FIELDS)
+
+def test_missing_time_reads_as_zero():
+    frame = CandleFrame.from_candles(candle_dicts(3, time=False))
+    assert frame.time.tolist() == [0.0, 0.0, 0.0]
+    assert frame.to_candles() == [dict(candle, time=0.0) for candle in candle_dicts(3, time=False)]
+
+def test_as_frame_passes_frames_through():
+    frame = CandleFrame.from_candles(candle_dicts(5))
+    assert as_frame(frame) is frame
+    assert as_frame(candle_dicts(5)).to_candles() == frame.to_candles()
+    assert len(as_frame([])) == 0
+
+def test_integer_index_and_slices_match_the_dicts():
+    candles = candle_dicts(10)
+    frame = CandleFrame.from_candles(candles)
+    assert frame[-1] == candles[-1] and frame[3] == candles[3]
+    assert frame[2:7].to_candles() == candles[2:7]
+    assert frame[-3:].to_candles() == candles[-3:]
+    assert len(frame[20:]) == 0
+
+def test_stack_keeps_the_last_window_of_ragged_frames():
+    lists = [candle_dicts(5), candle_dicts(8, start=100), candle_dicts(12, start=200)]
+    stacked = CandleFrame.stack([CandleFrame.from_candles(candles) for candles in lists], 4)
+    assert stacked.shape == (3, 4) and len(stacked) == 4
+    for i, candles in enumerate(lists):
+        assert stacked.row(i).to_candles() == candles[-4:]
+    assert stacked.close[:, -1].tolist() == [candles[-1]["close"] for candles in lists]
+    assert stacked.row(slice(1, 3)).shape == (2, 4)
+
+def test_stack_of_nothing_and_too_short_frames():
+    assert CandleFrame.stack([], 4).shape == (0, 4)
+    with pytest.raises(ValueError):
+        CandleFrame.stack([CandleFrame.from_candles(candle_dicts(3))], 4)
+
+@pytest.mark.parametrize("length, window", [(10, 3), (5, 5), (6, 1)])
+def test_rolling_rows_are_the_trailing_windows(length, window):
+    candles = candle_dicts(length)
+    rolled = CandleFrame.from_candles(candles).rolling(window)
+    assert rolled.shape == (length - window + 1, window)
+    for i in range(length - window + 1):
+        assert rolled.row(i).to_candles() == candles[i:i + window]
+
+def test_rolling_is_a_view_and_rejects_windows_longer_than_the_frame():
+    frame = CandleFrame.from_candles(candle_dicts(6))
+    assert np.shares_memory(frame.rolling(3).close, frame.close)
+    with pytest.raises(ValueError):
+        frame.rolling(7)
@@ -0,0 +1,47 @@
+import json
+import time
+import asyncio
+import threading
+from event_log import EventLog
+
+class SlowLog(EventLog):
+    # Each batch takes a while to reach disk, as on a busy volume
+    def __init__(self, path, delay):
+        super().__init__(path, flush_interval=0)
+        self.delay = delay
+        self.writing = threading.Event()
+
+    def _write(self, events):
+        self.writing.set()
+        time.sleep(self.delay)
+        super()._write(events)
+
+def test_stop_waits_for_the_batch_being_written(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = SlowLog(str(path), 0.2)
+
+    async def session():
+        events.start()
+        for i in range(3):
+            events.emit("scan", index=i)
+        await asyncio.to_thread(events.writing.wait)
+        for i in range(3, 6):
+            events.emit("scan", index=i)
+        await events.stop()
+        return path.read_text().splitlines()
+    lines = asyncio.run(session())
+    assert [json.loads(line)["index"] for line in lines] == list(range(6))
+    assert events.dropped == 0
+
+def test_stop_flushes_events_queued_before_the_writer_ran(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = EventLog(str(path), flush_interval=60)
+
+    async def session():
+        events.start()
+        events.emit("order", asset="A")
+        await asyncio.sleep(0)
+        events.emit("settlement", asset="A")
+        await events.stop()
+    asyncio.run(session())
+    assert [json.loads(line)["kind"] for line in path.read_text().splitlines()] == ["order", "settlement"]
@@ -0,0 +1,117 @@
+import numpy as np
+from candle_store import CandleStore
+from gap_index import GapBook, GapIndex, gap_levels
+from synthetic import synthetic_frame
+
+class NaiveBook:
+    """GapBook's fill rules over a plain list, checked gap by gap."""
+
+    def __init__(self):
+        self.gaps = []  # [direction, bottom, top]
+        self.recent = []
+
+    def add(self, high, low, close, time):
+        for gap in self.gaps:
+            if gap[0] == 1 and gap[2] > low:
+                gap[2] = max(gap[1], low)
+            elif gap[0] == -1 and gap[1] < high:
+                gap[1] = min(gap[2], high)
+        self.gaps = [gap for gap in self.gaps if gap[2] > gap[1]]
+        if len(self.recent) == 2:
+            first_high, first_low = self.recent[0]
+            if first_high < low:
+                self.gaps.append([1, first_high, low])
+            elif first_low > high:
+                self.gaps.append([-1, high, first_low])
+        self.recent = (self.recent + [(high, low)])[-2:]
+
+    def nearest_above(self, price):
+        above = [gap for gap in self.gaps if gap[0] == -1 and gap[1] >= price]
+        return min(above, key=lambda gap: gap[1], default=None)
+
+    def nearest_below(self, price):
+        below = [gap for gap in self.gaps if gap[0] == 1 and gap[2] <= price]
+        return max(below, key=lambda gap: gap[2], default=None)
+
+def edges(gap):
+    return None if gap is None else (gap.direction, gap.bottom, gap.top)
+
+def test_bullish_gap_fills_from_the_top_down():
+    book = GapBook()
+    book.add(10.0, 9.0, 9.5, 60)
+    book.add(12.0, 10.5, 11.5, 120)
+    gap = book.add(13.0, 11.0, 12.5, 180)
+    assert (gap.direction, gap.bottom, gap.top, gap.fvg) == (1, 10.0, 11.0, True)
+    assert book.nearest_below(12.0) is gap and book.nearest_above(12.0) is None
+
+    book.add(12.0, 10.75, 11.0, 240)
+    assert (gap.bottom, gap.top, gap.filled) == (10.0, 10.75, 0.25)
+    assert gap.filled_time is None and len(book) == 1
+
+    book.add(11.0, 9.5, 9.8, 300)
+    assert gap.filled == 1.0 and gap.filled_time == 300
+    assert len(book) == 0 and list(book.filled) == [gap]
+
+def test_bearish_gap_fills_from_the_bottom_up():
+    book = GapBook()
+    book.add(11.0, 10.0, 10.5, 60)
+    book.add(9.5, 8.0, 8.5, 120)
+    gap = book.add(9.0, 7.0, 7.5, 180)
+    assert (gap.direction, gap.bottom, gap.top) == (-1, 9.0, 10.0)
+    assert book.nearest_above(8.0) is gap
+
+    book.add(9.5, 8.5, 9.2, 240)
+    assert (gap.bottom, gap.top) == (9.5, 10.0)
+    assert book.nearest_above(9.6) is None
+
+def test_repeated_candle_time_is_ignored():
+    book = GapBook()
+    book.add(10.0, 9.0, 9.5, 60)
+    book.add(12.0, 10.5, 11.5, 120)
+    book.add(13.0, 11.0, 12.5, 180)
+    assert book.add(13.0, 5.0, 6.0, 180) is None
+    assert len(book) == 1 and book.unfilled()[0].top == 11.0
+
+def test_matches_naive_book_on_a_random_walk():
+    frame = synthetic_frame(3000, seed=3)
+    book, naive = GapBook(), NaiveBook()
+    rng = np.random.default_rng(0)
+    for high, low, close, time in zip(frame.high.tolist(), frame.low.tolist(), frame.close.tolist(), frame.time.tolist()):
+        book.add(high, low, close, time)
+        naive.add(high, low, close, time)
+        assert sorted(edges(gap) for gap in book.unfilled()) == sorted(tuple(gap) for gap in naive.gaps)
+        # Partial fills leave gaps sharing an edge, so compare the edge facing price
+        for price in rng.uniform(low - 1, high + 1, 4):
+            above, below = book.nearest_above(price), book.nearest_below(price)
+            expected_above, expected_below = naive.nearest_above(price), naive.nearest_below(price)
+            assert (above and above.bottom) == (expected_above and expected_above[1])
+            assert (below and below.top) == (expected_below and expected_below[2])
+    assert len(book) and len(book.filled)
+
+def test_index_seeds_from_the_store_and_ignores_forming_candles(tmp_path):
+    frame = synthetic_frame(500, seed=4)
+    store = CandleStore(str(tmp_path))
+    store.append("A", 60, frame[:-1])
+    index = GapIndex(store=store)
+    last = frame.to_candles()[-1]
+    index.on_candle("A", dict(last, high=1e6, low=-1e6), False)
+    assert "A" not in index.books
+    index.on_candle("A", last, True)
+
+    reference = GapBook()
+    for candle in frame.to_candles():
+        reference.add(candle["high"], candle["low"], candle["close"], candle["time"])
+    assert [edges(gap) for gap in index.books["A"].unfilled()] == [edges(gap) for gap in reference.unfilled()]
+    price = frame.close[-1]
+    assert tuple(map(edges, index.nearest("A", price))) == (edges(reference.nearest_above(price)), edges(reference.nearest_below(price)))
+    assert index.nearest("B", price) == (None, None)
+
+def test_history_levels_match_the_live_index_before_each_close():
+    frame = synthetic_frame(1500, seed=5)
+    above, below = gap_levels(frame)
+    index = GapIndex()
+    for i, candle in enumerate(frame.to_candles()):
+        expected = index.levels({"A": candle["close"]}).get("A")
+        np.testing.assert_array_equal((above[i], below[i]), expected)
+        index.on_candle("A", candle, True)
+    assert np.isnan(above[:3]).all() and np.isfinite(above).any() and np.isfinite(below).any()
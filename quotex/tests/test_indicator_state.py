@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from indicator_state import IndicatorState, IndicatorStates
+from indicators import calculate_adx, calculate_atr, calculate_ema, calculate_macd, calculate_rsi
+from synthetic import synthetic_frame
+
+def reference(candles):
+    return {
+        "ema": {10: calculate_ema(candles, 10), 50: calculate_ema(candles, 50)},
+        "rsi": calculate_rsi(candles),
+        "macd": calculate_macd(candles),
+        "atr": calculate_atr(candles),
+        "adx": calculate_adx(candles)
+    }
+
+def assert_matches(values, expected):
+    assert values["ema"].keys() == expected["ema"].keys()
+    actual = [*values["ema"].values(), values["rsi"], *values["macd"], values["atr"], values["adx"]]
+    wanted = [*expected["ema"].values(), expected["rsi"], *expected["macd"], expected["atr"], expected["adx"]]
+    np.testing.assert_allclose(actual, wanted, rtol=1e-9, atol=1e-9)
+
+def flat_stretch(frame, start, stop):
+    # Unchanged prices, so RSI and ADX hit their zero-change branches
+    for field in ("open", "high", "low", "close"):
+        getattr(frame, field)[start:stop] = frame.close[start]
+    return frame
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_every_bar_matches_the_windowed_functions(seed):
+    frame = flat_stretch(synthetic_frame(1500, seed), 700, 760)
+    state = IndicatorState()
+    for i in range(len(frame)):
+        assert_matches(state.update(frame[i]), reference(frame[:i + 1]))
+
+def test_forming_updates_are_rolled_back_and_replaced():
+    frame = synthetic_frame(200, 2)
+    state = IndicatorState()
+    for i in range(len(frame)):
+        candle = frame[i]
+        spike = dict(candle, high=candle["high"] + 1, close=candle["close"] + 0.5)
+        assert_matches(state.update(spike, closed=False), reference(frame[:i].to_candles() + [spike]))
+        assert_matches(state.update(candle, closed=False), reference(frame[:i + 1]))
+        assert_matches(state.update(candle), reference(frame[:i + 1]))
+
+def test_repeated_and_older_candles_are_ignored():
+    frame = synthetic_frame(120, 3)
+    state = IndicatorState()
+    for i in range(100):
+        state.update(frame[i])
+    before = state.snapshot()
+    state.update(dict(frame[99], close=1e6))
+    state.update(frame[50], closed=False)
+    assert state.snapshot() == before
+
+def test_snapshot_and_restore_round_trip_exactly():
+    frame = synthetic_frame(400, 4)
+    state = IndicatorState()
+    for i in range(200):
+        state.update(frame[i])
+    snap = state.snapshot()
+    values = state.values()
+    for i in range(200, 400):
+        state.update(frame[i], closed=i % 3 != 0)
+    state.restore(snap)
+    assert state.snapshot() == snap
+    assert state.values() == values
+
+    # Replaying after the rollback gives the same state as never rolling back
+    other = IndicatorState()
+    for i in range(400):
+        other.update(frame[i])
+    for i in range(200, 400):
+        state.update(frame[i])
+    assert state.snapshot() == other.snapshot()
+
+def test_sync_applies_only_new_candles_and_keeps_the_last_forming():
+    frame = synthetic_frame(300, 5)
+    state = IndicatorState()
+    state.sync(frame[:120])
+    assert state.last_time == frame.time[118]
+    values = state.sync(frame[:200])
+    assert_matches(values, reference(frame[:200]))
+    assert state.last_time == frame.time[198]
+
+def test_states_are_created_per_key():
+    states = IndicatorStates(ema_periods=(5,))
+    assert states[("A", 60)] is states[("A", 60)]
+    assert states[("A", 60)] is not states[("B", 60)]
+    assert list(states[("A", 60)].ema) == [5]
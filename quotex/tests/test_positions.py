@@ -0,0 +1,170 @@
+import asyncio
+from balance_tracker import BalanceTracker
+from positions import PositionManager
+
+def run(manager, outcomes):
+    """Submit one order per (asset, profit) pair, each settled before the next, and return the stakes used."""
+    async def session():
+        manager.start()
+        stakes = []
+        for asset, profit in outcomes:
+            stakes.append(manager.amount)
+            position = manager.submit(asset, "call", settle(profit))
+            await position.future
+        manager.stop()
+        return stakes
+    return asyncio.run(session())
+
+async def settle(profit):
+    return True, {"win": profit > 0, "profit": profit}
+
+class Account:
+    async def get_balance(self):
+        return 100.0
+
+async def account_tracker():
+    tracker = BalanceTracker(Account())
+    await tracker.reconcile()
+    return tracker
+
+def test_martingale_escalates_then_resets_after_max_steps():
+    manager = PositionManager(base_bet=1.0, martingale=2.0, max_steps=3)
+    stakes = run(manager, [("A", -1.0), ("A", -2.0), ("A", -4.0), ("A", -1.0), ("A", 1.6), ("A", -2.0)])
+    assert stakes == [1.0, 2.0, 4.0, 1.0, 2.0, 1.0]
+    assert manager.step == 1
+
+def test_draw_keeps_the_stake():
+    manager = PositionManager(base_bet=1.0, martingale=2.0)
+    assert run(manager, [("A", -1.0), ("A", 0.0), ("A", 1.6)]) == [1.0, 2.0, 2.0]
+
+def test_stop_loss_and_stop_profit():
+    manager = PositionManager(base_bet=1.0, stop_loss=2.0)
+    run(manager, [("A", -1.0), ("A", -1.0)])
+    assert manager.stopped == "loss" and manager.free == 0
+
+    manager = PositionManager(base_bet=1.0, stop_profit=1.5)
+    run(manager, [("A", 0.8), ("A", 0.8)])
+    assert manager.stopped == "profit"
+
+def test_slots_are_shared_and_one_per_asset():
+    async def session():
+        manager = PositionManager(max_positions=2)
+        manager.start()
+        gate = asyncio.Event()
+
+        async def order():
+            await gate.wait()
+            return True, {"profit": 0.8}
+
+        manager.submit("A", "call", order())
+        assert manager.holding("A") and not manager.holding("B")
+        assert manager.free == 1
+        manager.submit("B", "put", order())
+        assert manager.free == 0
+        gate.set()
+        await manager.join()
+        assert manager.free == 2 and not manager.open
+        manager.stop()
+        return manager
+    manager = asyncio.run(session())
+    assert manager.profit == 1.6
+
+def test_tracker_holds_stakes_until_settlement():
+    async def session():
+        tracker = await account_tracker()
+        manager = PositionManager(base_bet=5.0, tracker=tracker)
+        manager.start()
+        gate = asyncio.Event()
+
+        async def order():
+            await gate.wait()
+            return True, {"profit": 4.0}
+
+        manager.submit("A", "call", order())
+        assert tracker.balance == 95.0 and tracker.pnl == 0.0
+        gate.set()
+        await manager.join()
+        manager.stop()
+        return tracker
+    tracker = asyncio.run(session())
+    assert tracker.balance == 104.0 and tracker.pnl == 4.0
+
+def test_failed_order_returns_the_stake():
+    async def session():
+        tracker = await account_tracker()
+        manager = PositionManager(base_bet=5.0, martingale=2.0, tracker=tracker)
+        manager.start()
+
+        async def order():
+            raise ConnectionError("closed")
+
+        status, result = await manager.submit("A", "call", order()).future
+        manager.stop()
+        return manager, tracker, status, result
+    manager, tracker, status, result = asyncio.run(session())
+    assert not status and result == "closed"
+    assert tracker.balance == 100.0 and manager.amount == 5.0 and manager.profit == 0.0
+
+class Broker:
+    # Balance as the broker reports it; `requested`/`answer` hold a get_balance open
+    def __init__(self, balance):
+        self.balance = balance
+        self.requested = asyncio.Event()
+        self.answer = None
+
+    async def get_balance(self):
+        balance = self.balance
+        self.requested.set()
+        if self.answer is not None:
+            await self.answer.wait()
+        return balance
+
+def test_reconcile_waits_for_expired_orders_to_be_booked():
+    now = [0.0]
+
+    async def session():
+        broker = Broker(100.0)
+        tracker = BalanceTracker(broker, clock=lambda: now[0])
+        await tracker.reconcile()
+        manager = PositionManager(base_bet=5.0, tracker=tracker)
+        manager.start()
+        gate = asyncio.Event()
+
+        async def order():
+            await gate.wait()
+            return True, {"profit": 4.0}
+
+        manager.submit("A", "call", order(), expires_at=60.0)
+        broker.balance = 95.0
+        now[0] = 30.0
+        assert await tracker.reconcile() == 95.0 and tracker.drift == 0.0
+
+        # Expired and paid by the broker, but not yet booked here
+        now[0] = 61.0
+        broker.balance = 104.0
+        assert await tracker.reconcile() == 95.0
+        gate.set()
+        await manager.join()
+        assert await tracker.reconcile() == 104.0 and tracker.drift == 0.0
+        manager.stop()
+        return tracker
+    tracker = asyncio.run(session())
+    assert tracker.pnl == 4.0 and not tracker.expiries
+
+def test_reconcile_is_skipped_when_a_booking_lands_during_the_request():
+    async def session():
+        broker = Broker(100.0)
+        tracker = BalanceTracker(broker)
+        await tracker.reconcile()
+        tracker.open_order(5.0, 1)
+        broker.balance = 95.0
+        broker.answer = asyncio.Event()
+        broker.requested.clear()
+        request = asyncio.create_task(tracker.reconcile())
+        await broker.requested.wait()
+        tracker.record_trade(4.0, 5.0, 1)  # Settles while the API still answers with the old balance
+        broker.answer.set()
+        assert await request == 104.0
+        return tracker
+    tracker = asyncio.run(session())
+    assert tracker.balance == 104.0 and tracker.drift == 0.0
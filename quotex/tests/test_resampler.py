@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from candle_psychology import analyze_candle_psychology_batch
+from candles import CandleFrame, FIELDS, period_closes
+from resampler import Resampler, resample
+from synthetic import synthetic_frame
+
+HOUR = 1_699_999_200  # Aligned to every timeframe
+
+def series(length, seed=0, start=HOUR):
+    frame = synthetic_frame(length, seed)
+    return CandleFrame(frame.open, frame.high, frame.low, frame.close, start + 60 * np.arange(length))
+
+def assert_frames_equal(actual, expected):
+    for field in FIELDS:
+        assert np.array_equal(np.asarray(getattr(actual, field)), getattr(expected, field)), field
+
+@pytest.mark.parametrize("timeframe", [300, 900, 3600])
+def test_streamed_bars_match_resample(timeframe):
+    frame = series(600)
+    resampler = Resampler(window=1000)
+    for candle in frame.to_candles():
+        resampler.on_candle("A", candle, True)
+    assert_frames_equal(resampler.frame("A", timeframe), resample(frame, timeframe))
+
+def test_seeded_then_streamed_bars_match_resample():
+    frame = series(600, seed=1)
+    resampler = Resampler(window=1000)
+    resampler.seed("A", frame[:333])
+    for candle in frame[333:].to_candles():
+        resampler.on_candle("A", candle, True)
+    for timeframe in resampler.timeframes:
+        assert_frames_equal(resampler.frame("A", timeframe), resample(frame, timeframe))
+
+def test_forming_updates_are_replaced_by_the_closed_candle():
+    frame = series(120, seed=2)
+    streamed, closed_only = Resampler(window=1000), Resampler(window=1000)
+    for candle in frame.to_candles():
+        spike = dict(candle, high=candle["high"] + 5, low=candle["low"] - 5, close=candle["close"] + 1)
+        streamed.on_candle("A", spike, False)
+        streamed.on_candle("A", candle, False)
+        streamed.on_candle("A", candle, True)
+        closed_only.on_candle("A", candle, True)
+    for timeframe in streamed.timeframes:
+        assert_frames_equal(streamed.frame("A", timeframe), closed_only.frame("A", timeframe))
+
+def test_forming_candle_shows_in_the_current_bar():
+    frame = series(7)
+    resampler = Resampler(timeframes=(300,), window=10)
+    for candle in frame.to_candles()[:-1]:
+        resampler.on_candle("A", candle, True)
+    forming = dict(frame.to_candles()[-1], high=1000.0)
+    resampler.on_candle("A", forming, False)
+    bars = resampler.frame("A", 300)
+    assert len(bars) == 2 and bars.high[-1] == 1000.0 and bars.close[-1] == forming["close"]
+
+def test_late_candle_of_a_finished_bar_is_ignored():
+    frame = series(12)
+    resampler = Resampler(timeframes=(300,), window=10)
+    for candle in frame.to_candles():
+        resampler.on_candle("A", candle, True)
+    before = resampler.frame("A", 300).close.copy()
+    resampler.on_candle("A", dict(frame.to_candles()[2], close=1000.0), True)
+    assert np.array_equal(resampler.frame("A", 300).close, before)
+
+def bar_closes(row, timeframe):
+    # Last close per wall-clock bar, the last bar only once its final minute is in
+    closes = {}
+    for time, close in zip(row.time.tolist(), row.close.tolist()):
+        closes[time // timeframe] = close
+    if row.time[-1] % timeframe != timeframe - 60:
+        closes.popitem()
+    return list(closes.values())
+
+def assert_right_aligned(actual, expected):
+    padding = len(actual) - len(expected)
+    assert padding >= 0 and np.isnan(actual[:padding]).all()
+    assert actual[padding:].tolist() == expected
+
+@pytest.mark.parametrize("timeframe", [300, 900])
+def test_period_closes_are_the_closes_of_complete_bars(timeframe):
+    # Rows start at different offsets into their bars
+    rows = [series(97, seed, HOUR + 60 * seed) for seed in range(8)]
+    closes = period_closes(CandleFrame.stack(rows, 97), timeframe)
+    assert not np.isnan(closes[:, -1]).any()
+    for row, actual in zip(rows, closes):
+        assert_right_aligned(actual, bar_closes(row, timeframe))
+
+def test_period_closes_group_by_time_across_missing_candles():
+    full = series(60, 1)
+    keep = np.ones(60, dtype=bool)
+    keep[[3, 4, 12, 13, 14, 15, 16, 17, 18, 33, 59]] = False  # Inside a bar, whole bars and a bar's last minute
+    gappy = full[np.flatnonzero(keep)]
+    closes = period_closes(CandleFrame.stack([gappy, full], len(gappy)), 300)
+    assert_right_aligned(closes[0], bar_closes(gappy, 300))
+    assert_right_aligned(closes[1], bar_closes(full[-len(gappy):], 300))
+
+def test_mtf_correlation_of_a_row_does_not_depend_on_its_batch():
+    full = series(80, 2)
+    gappy = series(90, 3)[np.r_[0:42, 50:90]]
+    stacked = CandleFrame.stack([gappy, full], 60)
+    assert np.isnan(period_closes(stacked, 300)).any()  # The rows have different bar counts
+    both = analyze_candle_psychology_batch(stacked)
+    for i, row in enumerate((gappy, full)):
+        alone = analyze_candle_psychology_batch(CandleFrame.stack([row], 60))
+        assert both["mtf_correlation"][i] == pytest.approx(alone["mtf_correlation"][0], rel=1e-12)  # Padding regroups the sums
+    assert np.all(both["mtf_correlation"] != 0)
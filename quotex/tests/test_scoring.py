@@ -0,0 +1,57 @@
+import os
+import json
+import pytest
+from batch import WINDOW, analyze_batch
+from scoring import Scorer, override_rules
+from synthetic import synthetic_frame
+
+# (direction, confidence) per window from the original if/elif chain in
+# analyze_single_asset and the original scalar analyzers, with only the
+# documented fixes applied: the MACD signal line, ATR true range, ADX
+# previous closes and wall-clock 5-minute bars in the MTF correlation
+BASELINE_SCORES = os.path.join(os.path.dirname(__file__), "baseline_scores.json")
+
+@pytest.fixture(scope="module")
+def windows():
+    # Windows of seeded histories at staggered offsets, so times cover every kill zone
+    windows = {}
+    for seed in range(20):
+        frame = synthetic_frame(WINDOW + 600, seed)
+        for offset in range(0, 600, 40):
+            windows[f"{seed}:{offset}"] = frame[offset:offset + WINDOW]
+    return windows
+
+def test_default_rules_match_the_if_elif_chain(windows):
+    with open(BASELINE_SCORES) as f:
+        expected = json.load(f)
+    assert expected.keys() == windows.keys()
+    results = analyze_batch(windows, Scorer())
+    for asset, (direction, confidence) in expected.items():
+        assert results[asset]["direction"] == direction, asset
+        assert results[asset]["confidence"] == confidence, asset
+
+def test_rules_fire_on_the_fixture(windows):
+    # The comparison above only means something if both directions and a spread of scores occur
+    results = analyze_batch(windows, Scorer())
+    directions = {result["direction"] for result in results.values()}
+    confidences = {round(float(result["confidence"])) for result in results.values()}
+    assert {"call", "put", None} <= directions
+    assert len(confidences) > 20
+
+def test_overrides_change_only_the_named_rule(windows):
+    scorer = Scorer(override_rules({"rsi": {"cap": 40}}))
+    default = analyze_batch(windows, Scorer())
+    changed = analyze_batch(windows, scorer)
+    differences = {float(changed[asset]["confidence"] - default[asset]["confidence"]) for asset in windows if changed[asset]["confidence"] < 100}
+    assert differences == {0.0, 32.0}
+
+def test_unfilled_gap_behind_the_trade_adds_its_points(windows):
+    default = analyze_batch(windows, Scorer())
+    # A gap just behind the close on each side: below supports a call, above caps a put
+    gaps = {asset: (candles.close[-1] + 1e-9, candles.close[-1] - 1e-9) for asset, candles in windows.items()}
+    with_gaps = analyze_batch(windows, Scorer(), gaps)
+    far = analyze_batch(windows, Scorer(), {asset: (above + 1e6, below - 1e6) for asset, (above, below) in gaps.items()})
+    for asset in windows:
+        expected = default[asset]["confidence"] + (10 if default[asset]["direction"] else 0)
+        assert with_gaps[asset]["confidence"] == min(100, expected), asset
+        assert far[asset]["confidence"] == default[asset]["confidence"], asset
@@ -0,0 +1,45 @@
+import asyncio
+from session_log import RecordingClient, ReplayClient, VirtualTimeLoop
+
+class Broker:
+    # Settles each order after its duration, reporting what was placed
+    async def buy_and_check_win(self, amount, asset, direction, duration):
+        await asyncio.sleep(duration)
+        return True, {"asset": asset, "direction": direction, "amount": amount, "profit": 0.8 * amount}
+
+def run_virtual(coroutine):
+    loop = VirtualTimeLoop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def place_both(client):
+    # The 300s order is placed first and settles last
+    return asyncio.gather(
+        client.buy_and_check_win(2.0, "EURUSD", "call", 300),
+        client.buy_and_check_win(1.0, "GBPUSD", "put", 60)
+    )
+
+def test_orders_settling_out_of_order_replay_to_their_own_requests(tmp_path):
+    path = str(tmp_path / "session.qxs")
+
+    async def record():
+        client = RecordingClient(Broker(), path, clock=asyncio.get_running_loop().time)
+        try:
+            return await place_both(client)
+        finally:
+            client.close()
+    recorded = run_virtual(record())
+
+    client = ReplayClient(path)
+
+    async def replay():
+        loop = asyncio.get_running_loop()
+        results = await place_both(client)
+        return results, loop.time()
+    replayed, finished = run_virtual(replay())
+    assert replayed == recorded
+    assert [result["asset"] for _, result in replayed] == ["EURUSD", "GBPUSD"]
+    assert finished == 300 and client.misses == 0
+    assert [order[1][1] for order in client.recorded_orders] == ["EURUSD", "GBPUSD"]
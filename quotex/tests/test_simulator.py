@@ -0,0 +1,69 @@
+import json
+import asyncio
+import numpy as np
+import pytest
+from candle_store import CandleStore
+from gap_index import GapBook
+from event_log import EventLog
+from scheduler import CandleClock
+from simulator import SimulatedQuotex
+from synthetic import synthetic_frame
+
+def test_candles_and_orders_follow_the_price_path():
+    client = SimulatedQuotex({"A": synthetic_frame(200)}, start_index=120, speed=600)
+
+    async def session():
+        candles = await client.get_candle("A", 60, 30)
+        status, order = await client.buy_and_check_win(5.0, "A", "call", 60)
+        return candles, status, order
+    candles, status, order = asyncio.run(session())
+    frame = client.frames["A"]
+    forming = int(np.searchsorted(frame.time, candles[-1]["time"]))
+    assert len(candles) == 30 and [candle["close"] for candle in candles[:-1]] == frame.close[forming - 29:forming].tolist()
+    assert status and order["close_price"] == client.price("A", order["open_time"] + 60)
+    assert client.balance == 10000.0 + order["profit"]
+
+def test_session_writes_events_only_where_it_is_told(tmp_path, monkeypatch):
+    bot = pytest.importorskip("main")
+    workdir = tmp_path / "cwd"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    client = SimulatedQuotex(assets=10, speed=600, closed=0)
+    path = tmp_path / "events.jsonl"
+    runtime = bot.Runtime(store=CandleStore(str(tmp_path / "candles")), events=EventLog(str(path)),
+                          clock=CandleClock(bot.CANDLE_PERIOD, client.clock.time, client.clock.sleep))
+    asyncio.run(bot.smart_martingale_trade(client, (1.0, 1.0, 2.0, 2.0), 3, runtime))
+
+    kinds = {json.loads(line)["kind"] for line in path.read_text().splitlines()}
+    assert "settlement" in kinds
+    assert not list(workdir.iterdir())
+
+def test_session_keeps_gap_books_of_the_fed_assets(tmp_path):
+    bot = pytest.importorskip("main")
+    client = SimulatedQuotex(assets=10, speed=600, closed=0)
+    store = CandleStore(str(tmp_path / "candles"))
+    runtime = bot.Runtime(store=store, events=EventLog(str(tmp_path / "events.jsonl")),
+                          clock=CandleClock(bot.CANDLE_PERIOD, client.clock.time, client.clock.sleep))
+    asyncio.run(bot.smart_martingale_trade(client, (1.0, 1.0, 2.0, 2.0), 3, runtime))
+
+    assert runtime.gaps.books
+    for asset, book in runtime.gaps.books.items():
+        reference = GapBook()
+        for candle in store.read(asset, 60).to_candles():
+            reference.add(candle["high"], candle["low"], candle["close"], candle["time"])
+        assert [(gap.bottom, gap.top) for gap in book.unfilled()] == [(gap.bottom, gap.top) for gap in reference.unfilled()]
+
+def test_order_latency_is_split_at_the_entry_time(tmp_path, monkeypatch):
+    bot = pytest.importorskip("main")
+    monkeypatch.setattr(bot.latency, "enabled", True)
+    bot.latency.reset()
+    client = SimulatedQuotex(assets=10, speed=600, closed=0)
+    runtime = bot.Runtime(store=CandleStore(str(tmp_path / "candles")), events=EventLog(str(tmp_path / "events.jsonl")),
+                          clock=CandleClock(bot.CANDLE_PERIOD, client.clock.time, client.clock.sleep))
+    try:
+        asyncio.run(bot.smart_martingale_trade(client, (1.0, 1.0, 2.0, 2.0), 3, runtime))
+        stages = {stage for stage, _ in bot.latency.samples}
+    finally:
+        bot.latency.reset()
+    assert {"signal_to_scheduled", "fire_to_order", "order_settlement"} <= stages
+    assert "signal_to_order" not in stages